@@ -0,0 +1,52 @@
+import random
+from statistics import pstdev
+from typing import Iterable
+
+from srtglot.sentence import batch_counted_sentences
+
+SENTENCES = 100_000
+MAX_TOKENS = 100
+
+
+def greedy(sentences: Iterable[tuple[int, int]], max_tokens: int):
+    batch: list[int] = []
+    count = 0
+    for sentence, tokens in sentences:
+        if count + tokens > max_tokens:
+            yield batch
+            batch = [sentence]
+            count = tokens
+        else:
+            batch.append(sentence)
+            count += tokens
+
+    if batch:
+        yield batch
+
+
+def report(label: str, batches: list[list[int]], tokens: list[int]):
+    sizes = [sum(tokens[i] for i in batch) for batch in batches]
+    print(
+        f"{label:<10} {len(batches):>8} requests "
+        f"{sum(sizes) / (len(batches) * MAX_TOKENS):>7.1%} fill "
+        f"{min(sizes):>5} min {max(sizes):>5} max {pstdev(sizes):>7.1f} stdev "
+        f"{sizes.count(0):>3} empty"
+    )
+
+
+def main():
+    rng = random.Random(0)
+    # mostly short dialogue lines, a few long monologues above the cap
+    tokens = [
+        rng.randint(120, 200)
+        if rng.random() < 0.001
+        else int(rng.lognormvariate(2.5, 0.6)) + 1
+        for _ in range(SENTENCES)
+    ]
+    counted = list(enumerate(tokens))
+    report("greedy", list(greedy(counted, MAX_TOKENS)), tokens)
+    report("balanced", list(batch_counted_sentences(counted, MAX_TOKENS)), tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.formats import get_reader
+
+from synthetic import write_ass, write_srt, write_vtt
+
+CUES = 100_000
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        for markup in (False, True):
+            label = "markup" if markup else "plain"
+            for write, suffix in (
+                (write_srt, "srt"),
+                (write_vtt, "vtt"),
+                (write_ass, "ass"),
+            ):
+                input = write(Path(tmpdir) / f"{label}.{suffix}", CUES, markup=markup)
+                started = time.perf_counter()
+                subtitles = [*get_reader(input).parse(input)]
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{label} {suffix:<8} {len(subtitles):>8} cues "
+                    f"{elapsed:>8.3f}s {len(subtitles) / elapsed:>10.0f} cues/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
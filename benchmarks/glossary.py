@@ -0,0 +1,50 @@
+import random
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.formats import get_reader
+from srtglot.glossary import Glossary
+from srtglot.sentence import collect_sentences
+from srtglot.tokens import estimate_tokens
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "hod.srt"
+TERMS = 5_000
+BATCH = 20
+
+
+def encode(texts: list[str]) -> list[int]:
+    return [estimate_tokens(text) for text in texts]
+
+
+def main():
+    rng = random.Random(0)
+    sentences = [str(s) for s in collect_sentences(get_reader(FIXTURE).parse(FIXTURE))]
+    words = sorted(
+        {word.strip(".,!?").lower() for s in sentences for word in s.split()}
+    )
+    terms = {" ".join(rng.sample(words, rng.choice((1, 1, 2)))) for _ in range(TERMS)}
+
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "glossary.tsv"
+        path.write_text("".join(f"{term}\t{term.upper()}\n" for term in terms))
+        started = time.perf_counter()
+        glossary = Glossary.create([path], encode)
+    print(f"compile    {time.perf_counter() - started:>8.3f}s  {len(terms)} terms")
+
+    batches = [sentences[i : i + BATCH] for i in range(0, len(sentences), BATCH)]
+    started = time.perf_counter()
+    for batch in batches:
+        [term for term in terms if any(term in s.lower() for s in batch)]
+    print(f"naive      {time.perf_counter() - started:>8.3f}s")
+
+    for batch in batches:
+        glossary.match(batch)
+    print(f"automaton  {glossary.stats.match_seconds:>8.3f}s")
+
+    whole = sum(encode(f"{term} => {term.upper()}" for term in terms))
+    print(f"tokens     {whole} for the whole glossary, {glossary.stats}")
+
+
+if __name__ == "__main__":
+    main()
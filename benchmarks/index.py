@@ -0,0 +1,56 @@
+import time
+from itertools import islice
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.index import SubtitleIndex
+from srtglot.parser import parse
+
+from synthetic import write_srt
+
+CUES = 1_000_000
+RANGE = 1_000
+
+
+def timed(name: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{name:<32} {time.perf_counter() - started:>8.3f}s")
+    return result
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        input = write_srt(Path(tmpdir) / "large.srt", CUES)
+        index = timed("build index", lambda: SubtitleIndex.create(input))
+        timed("load index", lambda: SubtitleIndex.create(input))
+
+        start = len(index) - RANGE
+        full = timed(
+            f"full parse, last {RANGE} cues",
+            lambda: [*islice(parse(input), start, None)],
+        )
+        indexed = timed(
+            f"indexed read, last {RANGE} cues",
+            lambda: [*parse(input, start, index=index)],
+        )
+        assert full == indexed
+
+        chunks = timed(
+            "indexed read, 8 sentence chunks",
+            lambda: [
+                [*parse(input, cues.start, cues.stop, index=index)]
+                for chunk in range(8)
+                for cues in [
+                    index.sentence_range(
+                        chunk * len(index.sentences) // 8,
+                        (chunk + 1) * len(index.sentences) // 8,
+                    )
+                ]
+            ],
+        )
+        assert sum(len(chunk) for chunk in chunks) == len(index)
+
+
+if __name__ == "__main__":
+    main()
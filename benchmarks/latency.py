@@ -0,0 +1,72 @@
+import asyncio
+import random
+import time
+from itertools import islice
+
+from srtglot.cli import _translate_batches
+from srtglot.sentence import batch_counted_sentences
+
+SENTENCES = 4_000
+MAX_TOKENS = 200
+PARALLELISM = 8
+EXPANSION = 1.6
+# seconds per request and per generated token, scaled down to keep the run short
+OVERHEAD = 0.002
+PER_OUTPUT_TOKEN = 0.0002
+
+
+def predict_output_tokens(tokens: int) -> int:
+    return round(tokens * EXPANSION) + 5
+
+
+def work(batch: list[int], tokens: list[int]) -> float:
+    output_tokens = sum(predict_output_tokens(tokens[i]) for i in batch)
+    return OVERHEAD + output_tokens * PER_OUTPUT_TOKEN
+
+
+async def lockstep(batches, translate):
+    # dispatch before latency balancing: groups of PARALLELISM awaited together
+    remaining = iter(batches)
+    while group := list(islice(remaining, PARALLELISM)):
+        await asyncio.gather(*(translate(batch) for batch in group))
+
+
+async def pooled(batches, translate, priority):
+    async for _ in _translate_batches(
+        translate, iter(batches), PARALLELISM, lambda _: None, priority
+    ):
+        pass
+
+
+def main():
+    rng = random.Random(0)
+    tokens = [int(rng.lognormvariate(2.5, 0.8)) + 1 for _ in range(SENTENCES)]
+    counted = list(enumerate(tokens))
+
+    async def translate(batch: list[int]) -> list[list[int]]:
+        await asyncio.sleep(work(batch, tokens))
+        return [[i] for i in batch]
+
+    by_tokens = list(batch_counted_sentences(counted, MAX_TOKENS))
+    by_latency = list(
+        batch_counted_sentences(counted, MAX_TOKENS, weight=predict_output_tokens)
+    )
+    ideal = sum(work(batch, tokens) for batch in by_latency) / PARALLELISM
+
+    def priority(batch: list[int]) -> float:
+        return work(batch, tokens)
+
+    runs = [
+        ("lockstep", lockstep(by_tokens, translate)),
+        ("tokens", pooled(by_tokens, translate, None)),
+        ("latency", pooled(by_latency, translate, priority)),
+    ]
+    print(f"{'ideal':<10} {ideal:>8.3f}s")
+    for label, run in runs:
+        started = time.perf_counter()
+        asyncio.run(run)
+        print(f"{label:<10} {time.perf_counter() - started:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
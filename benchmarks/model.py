@@ -0,0 +1,91 @@
+import datetime
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.model import Multiline, TranslatedSubtitle, format_timestamp
+from srtglot.parser import _IGNORED_INDEX, detect_encoding, parse, read_cues
+
+from synthetic import write_srt
+
+CUES = 1_000_000
+
+
+@dataclass(frozen=True)
+class LegacySubtitle:
+    start: datetime.time
+    end: datetime.time
+    text: list[Multiline]
+
+
+@dataclass(frozen=True)
+class LegacyTranslatedSubtitle:
+    start: str
+    end: str
+    text: str
+
+
+def _to_time(millis: int) -> datetime.time:
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return datetime.time(hours, minutes, seconds, millis * 1000)
+
+
+def parse_legacy(input: Path) -> list[LegacySubtitle]:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        return [
+            LegacySubtitle(
+                start=_to_time(cue.start),
+                end=_to_time(cue.end),
+                text=[Multiline(cue.text.strip().split("\n"))],
+            )
+            for cue in read_cues(stream)
+            if cue.number != _IGNORED_INDEX
+        ]
+
+
+def render_legacy(sub: LegacySubtitle) -> str:
+    translated = LegacyTranslatedSubtitle(
+        start=sub.start.strftime("%H:%M:%S,%f")[:-3],
+        end=sub.end.strftime("%H:%M:%S,%f")[:-3],
+        text="\n".join(sub.text[0].lines),
+    )
+    return f"{translated.start} --> {translated.end}\n{translated.text}"
+
+
+def render(sub) -> str:
+    translated = TranslatedSubtitle(sub.start, sub.end, "\n".join(sub.text_lines))
+    return (
+        f"{format_timestamp(translated.start)} --> "
+        f"{format_timestamp(translated.end)}\n{translated.text}"
+    )
+
+
+def measure(name: str, input: Path, parser, renderer) -> None:
+    tracemalloc.start()
+    subtitles = parser(input)
+    resident, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for sub in subtitles:
+        renderer(sub)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<8} {len(subtitles):>8} cues "
+        f"{resident / len(subtitles):>10.0f} B/cue {elapsed:>8.3f}s render"
+    )
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        input = write_srt(Path(tmpdir) / "plain.srt", CUES)
+        measure("legacy", input, parse_legacy, render_legacy)
+        measure("slotted", input, lambda i: [*parse(i)], render)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import json
+import random
+import time
+from pathlib import Path
+from typing import Callable
+
+from srtglot.completions import parse_completions, parse_structured_completions
+from srtglot.context import TranslatorError
+from srtglot.parser import parse
+from srtglot.prompt import delimiter, sentence_lines
+from srtglot.sentence import collect_sentences, sentences_batcher
+from srtglot.tokens import Tokenizer, encoder
+
+MODEL = "gpt-4o"
+MAX_TOKENS = 200
+SEED = 42
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "hod.srt"
+
+Translation = list[list[str]]
+Mistake = Callable[[Translation, random.Random], Translation]
+Malformation = Callable[[Translation, random.Random], tuple[str, str]]
+
+
+def text(translation: Translation) -> str:
+    return "\n".join(
+        line
+        for i, fragments in enumerate(translation)
+        for line in [delimiter(i + 1), *fragments]
+    )
+
+
+def structured(translation: Translation) -> str:
+    return json.dumps(
+        {
+            "sentences": [
+                {"number": i + 1, "fragments": fragments}
+                for i, fragments in enumerate(translation)
+            ]
+        },
+        ensure_ascii=False,
+    )
+
+
+def rewrapped(translation: Translation, rng: random.Random) -> Translation:
+    # the model breaks the lines of a sentence differently
+    i = rng.randrange(len(translation))
+    fragments = [
+        fragment.replace(" ", "\n", 1) if " " in fragment else fragment
+        for fragment in translation[i]
+    ]
+    return translation[:i] + [fragments] + translation[i + 1 :]
+
+
+def merged(translation: Translation, rng: random.Random) -> Translation:
+    # the model joins the fragments of a sentence into one
+    i = rng.randrange(len(translation))
+    return translation[:i] + [[" ".join(translation[i])]] + translation[i + 1 :]
+
+
+def dropped(translation: Translation, rng: random.Random) -> Translation:
+    # the model skips a sentence
+    i = rng.randrange(len(translation))
+    return translation[:i] + translation[i + 1 :]
+
+
+def both(mistake: Mistake) -> Malformation:
+    def render(translation: Translation, rng: random.Random) -> tuple[str, str]:
+        malformed = mistake(translation, rng)
+        return text(malformed), structured(malformed)
+
+    return render
+
+
+def truncated(translation: Translation, rng: random.Random) -> tuple[str, str]:
+    # the completion stops short, at the token limit or a dropped connection
+    text_content, json_content = text(translation), structured(translation)
+    return (
+        text_content[: len(text_content) * 9 // 10],
+        json_content[: len(json_content) * 9 // 10],
+    )
+
+
+# each mistake rendered as the model would make it in either format, the
+# delimiter and preamble mistakes can't happen under a strict JSON schema
+MALFORMATIONS: dict[str, Malformation] = {
+    "none": lambda t, rng: (text(t), structured(t)),
+    "lines rewrapped": both(rewrapped),
+    "fragments merged": both(merged),
+    "sentence dropped": both(dropped),
+    "delimiter restyled": lambda t, rng: (
+        text(t).replace("[sentence ", "[Sentence "),
+        structured(t),
+    ),
+    "preamble": lambda t, rng: (
+        "Here is the translation:\n" + text(t),
+        structured(t),
+    ),
+    "truncated": truncated,
+}
+
+
+def rejected(parser, batch, content: str) -> bool:
+    try:
+        parser(batch, content)
+    except TranslatorError:
+        return True
+
+    return False
+
+
+def main():
+    # the source text stands in for its translation, both formats carry the same
+    sentences = list(collect_sentences(parse(FIXTURE)))
+    batches = list(
+        sentences_batcher(MODEL, MAX_TOKENS, tokenizer=Tokenizer.HEURISTIC)(sentences)
+    )
+    translations = [
+        [list(sentence_lines(sentence)) for sentence in batch] for batch in batches
+    ]
+    completions = {
+        "text": [text(translation) for translation in translations],
+        "json": [structured(translation) for translation in translations],
+    }
+    parsers = {"text": parse_completions, "json": parse_structured_completions}
+
+    encode = encoder(MODEL, Tokenizer.TIKTOKEN)
+    text_tokens = sum(encode(completions["text"]))
+    for label, contents in completions.items():
+        tokens = sum(encode(contents))
+        started = time.perf_counter()
+        for batch, content in zip(batches, contents):
+            parsers[label](batch, content)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label:<5} {tokens:>7} completion tokens "
+            f"({tokens / text_tokens - 1:+.1%}), parsed in {elapsed * 1000:.1f} ms"
+        )
+
+    # every batch with each injected mistake, then one mistake drawn per batch
+    print(f"\n{'rejected batches':<20} {'text':>6} {'json':>6}")
+    rng = random.Random(SEED)
+    for name, malformation in MALFORMATIONS.items():
+        failures = {"text": 0, "json": 0}
+        for batch, translation in zip(batches, translations):
+            for label, content in zip(parsers, malformation(translation, rng)):
+                failures[label] += rejected(parsers[label], batch, content)
+
+        print(
+            f"{name:<20} {failures['text'] / len(batches):>6.1%} "
+            f"{failures['json'] / len(batches):>6.1%}"
+        )
+
+    failures = {"text": 0, "json": 0}
+    for batch, translation in zip(batches, translations):
+        malformation = MALFORMATIONS[rng.choice(list(MALFORMATIONS))]
+        for label, content in zip(parsers, malformation(translation, rng)):
+            failures[label] += rejected(parsers[label], batch, content)
+
+    print(
+        f"{'any, one per batch':<20} {failures['text'] / len(batches):>6.1%} "
+        f"{failures['json'] / len(batches):>6.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
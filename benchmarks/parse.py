@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from bs4 import BeautifulSoup
+from srtglot.model import Multiline
+from srtglot.parser import _IGNORED_INDEX, detect_encoding, parse, read_cues
+
+from synthetic import write_srt
+
+CUES = 20_000
+
+
+def parse_with_soup(input: Path) -> list[tuple]:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        subtitles = []
+        for cue in read_cues(stream):
+            if cue.number == _IGNORED_INDEX:
+                continue
+
+            soup = BeautifulSoup(cue.text, "html.parser")
+            subtitles.append(
+                (
+                    cue.start,
+                    cue.end,
+                    soup,
+                    [
+                        Multiline(block.strip().split("\n"))
+                        for block in soup.find_all(string=True)
+                    ],
+                )
+            )
+
+        return subtitles
+
+
+def measure(name: str, input: Path, parser) -> None:
+    started = time.perf_counter()
+    subtitles = parser(input)
+    elapsed = time.perf_counter() - started
+    del subtitles
+
+    tracemalloc.start()
+    subtitles = parser(input)
+    resident, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<24} {len(subtitles):>8} cues "
+        f"{elapsed:>8.3f}s {resident / len(subtitles):>10.0f} B/cue"
+    )
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        for markup in (False, True):
+            input = write_srt(Path(tmpdir) / f"{markup}.srt", CUES, markup=markup)
+            label = "markup" if markup else "plain"
+            measure(f"{label} (soup)", input, parse_with_soup)
+            measure(f"{label} (fast path)", input, lambda i: [*parse(i)])
+
+
+if __name__ == "__main__":
+    main()
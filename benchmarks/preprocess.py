@@ -0,0 +1,30 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.formats import get_reader
+from srtglot.preprocess import Preprocessed
+
+from synthetic import write_srt
+
+CUES = 100_000
+MODEL = "gpt-4o"
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        input = write_srt(Path(tmpdir) / "input.srt", CUES, markup=True)
+        reader = get_reader(input)
+        for label in ("first run", "repeat run"):
+            started = time.perf_counter()
+            preprocessed = Preprocessed.create(
+                input, reader=reader, model=MODEL, cache_dir=Path(tmpdir)
+            )
+            print(
+                f"{label:<12} {len(preprocessed.sentences):>8} sentences "
+                f"{time.perf_counter() - started:>8.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+import random
+
+from srtglot.adaptive import Bisection, adaptive_map
+
+BATCHES = 2_000
+SENTENCES = 40
+# chance that the model gets the fragment count of a sentence wrong
+ERROR_RATE = 0.01
+SYSTEM_TOKENS = 400
+SENTENCE_TOKENS = 30
+OUTPUT_TOKENS = 40
+
+
+class Rejected(Exception):
+    pass
+
+
+def run(repair: bool) -> tuple[int, int, int]:
+    rng = random.Random(0)
+    requests = tokens = failing = 0
+
+    async def mapper(batch: list[int]) -> list[int]:
+        nonlocal requests, tokens
+        requests += 1
+        tokens += SYSTEM_TOKENS + len(batch) * (SENTENCE_TOKENS + OUTPUT_TOKENS)
+        offending = [s for s in batch if rng.random() < ERROR_RATE]
+        if offending and repair:
+            # the follow-up resends the conversation and asks for the offending ones
+            requests += 1
+            tokens += (
+                SYSTEM_TOKENS
+                + len(batch) * (SENTENCE_TOKENS + OUTPUT_TOKENS)
+                + len(offending) * OUTPUT_TOKENS
+            )
+            offending = [s for s in offending if rng.random() < ERROR_RATE]
+
+        if offending:
+            raise Rejected()
+        return batch
+
+    async def fallback(item: int, e: Rejected) -> int:
+        return item
+
+    def on_complete(bisection: Bisection) -> None:
+        nonlocal failing
+        failing += bisection.depth > 0
+
+    async def main():
+        for _ in range(BATCHES):
+            await adaptive_map(
+                list(range(SENTENCES)), mapper, fallback, Rejected, on_complete
+            )
+
+    asyncio.run(main())
+    return requests, tokens, failing
+
+
+def main():
+    baseline_requests, baseline_tokens, _ = run(repair=False)
+    for label, repair in (("bisection", False), ("repair", True)):
+        requests, tokens, failing = run(repair)
+        print(
+            f"{label:<10} {requests:>6} requests {tokens:>10} tokens "
+            f"({requests / baseline_requests:.1%} and {tokens / baseline_tokens:.1%}), "
+            f"{failing} batches bisected"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import random
+from pathlib import Path
+
+WORDS = (
+    "the king dragon realm council heir throne city watch lord lady prince "
+    "princess maester sword fire blood winter night house grace son daughter"
+).split()
+
+
+def _timestamp(millis: int, separator: str = ",") -> str:
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def _ass_timestamp(millis: int) -> str:
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{millis // 10:02d}"
+
+
+def _line(rng: random.Random, markup: bool) -> str:
+    line = " ".join(rng.choices(WORDS, k=rng.randint(3, 7)))
+    return f"<i>{line}</i>" if markup else line
+
+
+def _cues(cues: int, markup: bool, seed: int):
+    rng = random.Random(seed)
+    for i in range(cues):
+        start = (i * 1500) % (23 * 3_600_000)
+        lines = [_line(rng, markup) for _ in range(rng.randint(1, 2))]
+        if rng.random() < 0.4:
+            lines[-1] += "."
+        yield i, start, lines
+
+
+def write_srt(path: Path, cues: int, markup: bool = False, seed: int = 0) -> Path:
+    with open(path, "w") as stream:
+        for i, start, lines in _cues(cues, markup, seed):
+            stream.write(f"{i + 1}\n")
+            stream.write(f"{_timestamp(start)} --> {_timestamp(start + 2000)}\n")
+            stream.write("\n".join(lines))
+            stream.write("\n\n")
+
+    return path
+
+
+def write_vtt(path: Path, cues: int, markup: bool = False, seed: int = 0) -> Path:
+    with open(path, "w") as stream:
+        stream.write("WEBVTT\n\n")
+        for _, start, lines in _cues(cues, markup, seed):
+            stream.write(
+                f"{_timestamp(start, '.')} --> {_timestamp(start + 2000, '.')}\n"
+            )
+            stream.write("\n".join(lines))
+            stream.write("\n\n")
+
+    return path
+
+
+def write_ass(path: Path, cues: int, markup: bool = False, seed: int = 0) -> Path:
+    with open(path, "w") as stream:
+        stream.write("[Script Info]\nScriptType: v4.00+\n\n[Events]\n")
+        stream.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, ")
+        stream.write("MarginV, Effect, Text\n")
+        for _, start, lines in _cues(cues, markup, seed):
+            text = "\\N".join(lines).replace("<i>", "{\\i1}").replace("</i>", "{\\i0}")
+            stream.write(
+                f"Dialogue: 0,{_ass_timestamp(start)},{_ass_timestamp(start + 2000)},"
+                f"Default,,0,0,0,,{text}\n"
+            )
+
+    return path
@@ -0,0 +1,53 @@
+import time
+from dataclasses import replace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from srtglot.parser import parse
+from srtglot.table import SubtitleTable
+
+from synthetic import write_srt
+
+CUES = 1_000_000
+
+
+def retime_loop(subtitles, factor: float, offset: int):
+    return [
+        replace(
+            sub,
+            start=round(sub.start * factor) + offset,
+            end=round(sub.end * factor) + offset,
+        )
+        for sub in subtitles
+    ]
+
+
+def timed(name: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{name:<28} {time.perf_counter() - started:>8.3f}s")
+    return result
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        subtitles = [*parse(write_srt(Path(tmpdir) / "large.srt", CUES))]
+
+    factor = 25 / (24000 / 1001)
+    looped = timed("python loop", lambda: retime_loop(subtitles, factor, -500))
+    table = timed("build table", lambda: SubtitleTable.create(subtitles))
+    retimed = timed(
+        "vectorized retime",
+        lambda: (
+            table.convert_frame_rate(25, 24000 / 1001)
+            .shift(-500)
+            .clamp()
+            .fix_overlaps()
+        ),
+    )
+    timed("back to subtitles", retimed.to_cues)
+    assert table.convert_frame_rate(25, 24000 / 1001).shift(-500).to_cues() == looped
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import fmean
+
+from srtglot.parser import parse
+from srtglot.sentence import collect_sentences
+from srtglot.tokens import Tokenizer, encoder
+
+MODEL = "gpt-4o"
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "hod.srt"
+STARTUP = """
+import time
+started = time.perf_counter()
+from srtglot.tokens import Tokenizer, encoder
+encoder({model!r}, Tokenizer({tokenizer!r}))(["Hello there."])
+print(time.perf_counter() - started)
+"""
+
+
+def startup(tokenizer: Tokenizer) -> float:
+    # a fresh interpreter per run, so imports and vocabulary loading are measured
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP.format(model=MODEL, tokenizer=tokenizer.value)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return float(output)
+
+
+def main():
+    for tokenizer in Tokenizer:
+        print(f"startup {tokenizer.value:<10} {startup(tokenizer):>8.3f}s")
+
+    texts = [str(sentence) for sentence in collect_sentences(parse(FIXTURE))]
+    results = {}
+    for tokenizer in Tokenizer:
+        encode = encoder(MODEL, tokenizer)
+        started = time.perf_counter()
+        results[tokenizer] = encode(texts)
+        print(
+            f"count   {tokenizer.value:<10} {time.perf_counter() - started:>8.3f}s "
+            f"{sum(results[tokenizer]):>8} tokens"
+        )
+
+    errors = [
+        (estimate - exact) / exact
+        for estimate, exact in zip(
+            results[Tokenizer.HEURISTIC], results[Tokenizer.TIKTOKEN]
+        )
+        if exact
+    ]
+    print(
+        f"heuristic error: mean {fmean(abs(e) for e in errors):.1%}, "
+        f"bias {fmean(errors):+.1%}, worst {max(errors, key=abs):+.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import tiktoken
+
+from srtglot.formats import get_reader
+from srtglot.sentence import collect_sentences
+from srtglot.tokens import TokenMemo, batch_token_counter
+
+from synthetic import write_srt
+
+CUES = 200_000
+MODEL = "gpt-4o"
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        input = write_srt(Path(tmpdir) / "input.srt", CUES)
+        sentences = list(collect_sentences(get_reader(input).parse(input)))
+        encoding = tiktoken.encoding_for_model(MODEL)
+
+        started = time.perf_counter()
+        for sentence in sentences:
+            len(encoding.encode(str(sentence)))
+        print(f"{'sequential':<16} {time.perf_counter() - started:>8.3f}s")
+
+        memo = TokenMemo.create(Path(tmpdir), MODEL)
+        for label in ("threaded batch", "memoized"):
+            started = time.perf_counter()
+            batch_token_counter(MODEL, memo)(sentences)
+            print(f"{label:<16} {time.perf_counter() - started:>8.3f}s")
+
+        started = time.perf_counter()
+        batch_token_counter(MODEL, TokenMemo.create(Path(tmpdir), MODEL))(sentences)
+        print(f"{'memo from disk':<16} {time.perf_counter() - started:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
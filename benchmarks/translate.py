@@ -0,0 +1,51 @@
+import copy
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from bs4 import BeautifulSoup
+from srtglot.model import Subtitle, TranslatedSubtitle
+from srtglot.parser import parse
+
+from synthetic import write_srt
+
+CUES = 20_000
+
+
+def translate_with_soup(
+    sub: Subtitle, soup: BeautifulSoup, translated_text: list[str]
+) -> TranslatedSubtitle:
+    soup = copy.deepcopy(soup)
+    for t, element in zip(translated_text, soup.find_all(string=True)):
+        element.replace_with(t if t else "\n")
+
+    return TranslatedSubtitle(start=sub.start, end=sub.end, text=str(soup))
+
+
+def main():
+    with TemporaryDirectory() as tmpdir:
+        input = write_srt(Path(tmpdir) / "markup.srt", CUES, markup=True)
+        subtitles = [*parse(input)]
+        soups = [
+            BeautifulSoup(sub.markup.render(sub.text_lines), "html.parser")
+            for sub in subtitles
+            if sub.markup is not None
+        ]
+        translations = [[line.upper() for line in sub.text_lines] for sub in subtitles]
+
+        started = time.perf_counter()
+        legacy = [
+            translate_with_soup(sub, soup, lines)
+            for sub, soup, lines in zip(subtitles, soups, translations)
+        ]
+        print(f"deepcopy(soup)    {time.perf_counter() - started:>8.3f}s")
+
+        started = time.perf_counter()
+        compiled = [sub.translate(lines) for sub, lines in zip(subtitles, translations)]
+        print(f"compiled markup   {time.perf_counter() - started:>8.3f}s")
+
+        assert legacy == compiled
+
+
+if __name__ == "__main__":
+    main()
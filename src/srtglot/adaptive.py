@@ -1,6 +1,6 @@
-from functools import reduce
-from typing import TypeVar, Callable, Awaitable
-from operator import add
+import asyncio
+from dataclasses import dataclass
+from typing import TypeVar, Callable, Awaitable, cast
 
 
 T = TypeVar("T")
@@ -9,6 +9,49 @@ E = TypeVar("E", bound=BaseException)
 
 Mapper = Callable[[list[T]], Awaitable[list[U]]]
 FallbackMapper = Callable[[T, E], Awaitable[U]]
+# results of a failed call that are kept anyway, by position in its chunk
+Salvage = Callable[[E], dict[int, U]]
+
+
+@dataclass(frozen=True)
+class Bisection:
+    depth: int
+    calls: int
+    failed_calls: int
+    failed_items: int = 0
+    salvaged: int = 0
+
+
+@dataclass
+class BisectionStats:
+    batches: int = 0
+    bisected: int = 0
+    max_depth: int = 0
+    calls: int = 0
+    wasted_calls: int = 0
+    failed_items: int = 0
+    salvaged: int = 0
+
+    def record(self, bisection: Bisection) -> None:
+        self.batches += 1
+        self.bisected += bisection.depth > 0
+        self.max_depth = max(self.max_depth, bisection.depth)
+        self.calls += bisection.calls
+        self.wasted_calls += bisection.failed_calls
+        self.failed_items += bisection.failed_items
+        self.salvaged += bisection.salvaged
+
+    @property
+    def salvage_rate(self) -> float:
+        return self.salvaged / self.failed_items if self.failed_items else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.bisected} of {self.batches} batches bisected, max depth "
+            f"{self.max_depth}, {self.wasted_calls} of {self.calls} calls failed, "
+            f"{self.salvaged} of their {self.failed_items} sentences salvaged "
+            f"({self.salvage_rate:.1%})"
+        )
 
 
 async def adaptive_map(
@@ -16,20 +59,59 @@ async def adaptive_map(
     mapper: Mapper[T, U],
     fallback: FallbackMapper[T, E, U],
     exception_type: type[E],
+    on_complete: Callable[[Bisection], None] | None = None,
+    salvage: Salvage[E, U] | None = None,
 ) -> list[U]:
-    state = [input]
-    output: list[U] = []
-    while state:
+    output: list[U | None] = [None] * len(input)
+    depth = calls = failed_calls = failed_items = salvaged = 0
+
+    async def bisect(positions: list[int], level: int) -> None:
+        nonlocal depth, calls, failed_calls, failed_items, salvaged
+        depth = max(depth, level)
+        calls += 1
         try:
-            head = state.pop(0)
-            output.extend(await mapper(head))
+            results = await mapper([input[i] for i in positions])
         except exception_type as e:
-            if len(head) == 1:
-                output.append(await fallback(head[0], e))
-                state = [reduce(add, state)] if state else []
-                continue
+            failed_calls += 1
+            failed_items += len(positions)
+            kept = salvage(e) if salvage is not None else {}
+            for i, result in kept.items():
+                output[positions[i]] = result
+
+            salvaged += len(kept)
+            if kept:
+                # retry only what was lost, in one call
+                remaining = [p for i, p in enumerate(positions) if i not in kept]
+                if remaining:
+                    await bisect(remaining, level + 1)
+                return
+
+            if len(positions) == 1:
+                output[positions[0]] = await fallback(input[positions[0]], e)
+                return
+
+            # sibling halves are mapped concurrently, each fills its own slots
+            mid = len(positions) // 2
+            await asyncio.gather(
+                bisect(positions[:mid], level + 1), bisect(positions[mid:], level + 1)
+            )
+            return
+
+        for position, result in zip(positions, results):
+            output[position] = result
+
+    if input:
+        await bisect(list(range(len(input))), 0)
 
-            mid = len(head) // 2
-            state = [head[:mid], head[mid:]] + state
+    if on_complete is not None:
+        on_complete(
+            Bisection(
+                depth=depth,
+                calls=calls,
+                failed_calls=failed_calls,
+                failed_items=failed_items,
+                salvaged=salvaged,
+            )
+        )
 
-    return output
+    return cast(list[U], output)
@@ -0,0 +1,112 @@
+import html
+import re
+from pathlib import Path
+from typing import Generator, Iterable
+
+from .model import Subtitle
+from .parser import Cue, detect_encoding
+
+
+_EVENTS = "[events]"
+_DIALOGUE = "Dialogue:"
+_FORMAT = "Format:"
+_DEFAULT_FORMAT = [
+    "layer",
+    "start",
+    "end",
+    "style",
+    "name",
+    "marginl",
+    "marginr",
+    "marginv",
+    "effect",
+    "text",
+]
+_TIMESTAMP = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})[.:](\d{1,3})")
+_OVERRIDE = re.compile(r"\{([^}]*)\}")
+_STYLE_TAG = re.compile(r"\\([ibus])(\d*)(?=\\|$)|\\(r)[^\\]*")
+_DRAWING = re.compile(r"\\p[1-9]")
+_ESCAPES = {"\\N": "\n", "\\n": " ", "\\h": "\u00a0"}
+_ESCAPE = re.compile(r"\\[Nnh]")
+
+
+def parse_timestamp(value: str) -> int:
+    match = _TIMESTAMP.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid timestamp: {value}")
+
+    hours, minutes, seconds, fraction = match.groups()
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(
+        fraction.ljust(3, "0")
+    )
+
+
+def _to_markup(text: str) -> str | None:
+    parts = []
+    opened: list[str] = []
+    for i, part in enumerate(_OVERRIDE.split(text)):
+        if i % 2 == 0:
+            part = _ESCAPE.sub(lambda m: _ESCAPES[m.group()], part)
+            parts.append(html.escape(part, quote=False))
+            continue
+
+        if _DRAWING.search(part):
+            return None
+
+        for tag, value, reset in _STYLE_TAG.findall(part):
+            if reset:
+                parts.extend(f"</{t}>" for t in reversed(opened))
+                opened.clear()
+            elif value not in ("", "0") and tag not in opened:
+                parts.append(f"<{tag}>")
+                opened.append(tag)
+            elif value in ("", "0") and tag in opened:
+                parts.append(f"</{tag}>")
+                opened.remove(tag)
+
+    parts.extend(f"</{t}>" for t in reversed(opened))
+    return "".join(parts)
+
+
+def read_cues(lines: Iterable[str]) -> Generator[Cue, None, None]:
+    in_events = False
+    fields = _DEFAULT_FORMAT
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            in_events = line.lower() == _EVENTS
+            continue
+
+        if not in_events:
+            continue
+
+        if line.startswith(_FORMAT):
+            fields = [f.strip().lower() for f in line[len(_FORMAT) :].split(",")]
+            continue
+
+        if not line.startswith(_DIALOGUE):
+            continue
+
+        values = dict(
+            zip(fields, line[len(_DIALOGUE) :].lstrip().split(",", len(fields) - 1))
+        )
+        try:
+            start = parse_timestamp(values.get("start", ""))
+            end = parse_timestamp(values.get("end", ""))
+        except ValueError:
+            continue
+
+        text = _to_markup(values.get("text", ""))
+        if text and text.strip():
+            yield Cue(number=None, start=start, end=end, text=text)
+
+
+def count_subtitles(input: Path) -> int:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        return sum(1 for _ in read_cues(stream))
+
+
+def parse(input: Path) -> Generator[Subtitle, None, None]:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        for cue in read_cues(stream):
+            yield Subtitle.create(start=cue.start, end=cue.end, text=cue.text)
@@ -1,5 +1,7 @@
+import time
+
 import openai
-from openai.types.chat import ChatCompletion
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -8,9 +10,20 @@ from tenacity import (
 )
 
 from .model import Sentence, TranslatedSubtitle
-from .translator import Context, TranslatorError
-from .prompt import UserPrompt
-from .completions import map_to_translated_subtitle, parse_completions
+from .translator import Context, SentenceListener, TranslatorError
+from .prompt import UserPrompt, get_glossary_prompt, get_repair_messages
+from .completions import (
+    completion_lines,
+    expand_references,
+    fits_completion,
+    map_to_translated_subtitle,
+    parse_completions,
+    parse_structured_completions,
+    salvage_completions,
+    salvage_structured_completions,
+)
+from .structured import CompletionFormat, response_format
+from .streaming import CompletionStream
 from .fallback import fit_fragments_count
 
 
@@ -18,11 +31,215 @@ async def batch_mapper(
     *,
     context: Context,
     batch: list[Sentence],
+    on_sentence: SentenceListener | None = None,
 ) -> list[list[TranslatedSubtitle]]:
+    def emit(sentences: list[Sentence], translated: list[list[TranslatedSubtitle]]):
+        if on_sentence is not None:
+            for sentence, subtitles in zip(sentences, translated):
+                on_sentence(sentence, subtitles)
+
     cached = await context.cache.get(batch)
     if cached is not None:
+        emit(batch, cached)
         return cached
 
+    prompt = UserPrompt.create_prompt(batch, context.config.compact_prompts)
+    messages: list[ChatCompletionMessageParam] = [
+        context.system_message,
+        prompt.user_message,
+    ]
+    if context.glossary is not None:
+        terms = context.glossary.match(str(sentence) for sentence in prompt.batch)
+        if terms:
+            messages.insert(1, get_glossary_prompt(terms))
+
+    structured = context.config.output_format is CompletionFormat.JSON
+    format_option = response_format() if structured else openai.omit
+    parse = parse_structured_completions if structured else parse_completions
+
+    def validated(content: str) -> dict[int, list[str]]:
+        if structured:
+            return salvage_structured_completions(prompt.batch, content)
+
+        return salvage_completions(prompt.batch, completion_lines(content))
+
+    def translate_completions(
+        sentences: list[Sentence],
+        parsed_completions: list[list[str]],
+        attempt_number: int,
+    ) -> list[list[TranslatedSubtitle]]:
+        tokenization = context.config.target_language.value.tokenization
+        parsed_completions = [
+            fit_fragments_count(
+                tokenization,
+                sentence.non_empty_text_lines_count,
+                parsed_completion,
+            )
+            for sentence, parsed_completion in zip(sentences, parsed_completions)
+        ]
+
+        return map_to_translated_subtitle(sentences, parsed_completions, attempt_number)
+
+    async def repair(
+        content: str, completion: ChatCompletion, error: TranslatorError
+    ) -> list[list[str]] | None:
+        # one follow-up asking for the offending sentences alone, before the
+        # batch is bisected
+        kept = validated(content)
+        offending = [i for i in range(len(prompt.batch)) if i not in kept]
+        references = prompt.references or range(len(prompt.batch))
+        if not offending:
+            # rejected for its layout alone, a preamble or stray lines, while
+            # every sentence validated: there is nothing to ask for again
+            tokens = completion.usage.total_tokens if completion.usage else 0
+            context.repairs.record(True, tokens, requests=1)
+            return [kept[i] for i in references]
+
+        async with context.requests:
+            repair_completion: ChatCompletion = (
+                await context.client.chat.completions.create(
+                    model=context.config.model,
+                    messages=[
+                        *messages,
+                        *get_repair_messages(
+                            content, str(error), [i + 1 for i in offending]
+                        ),
+                    ],
+                    response_format=format_option,
+                )
+            )
+
+        repaired_content = repair_completion.choices[0].message.content or ""
+        context.llm_logger(prompt, repaired_content)
+        fixed = validated(repaired_content)
+        kept.update((i, fixed[i]) for i in offending if i in fixed)
+        context.repairs.record(
+            len(kept) == len(prompt.batch),
+            sum(
+                c.usage.total_tokens
+                for c in (completion, repair_completion)
+                if c.usage is not None
+            ),
+        )
+        if len(kept) < len(prompt.batch):
+            if context.config.salvage:
+                error.parsed = expand_references(kept, prompt.references)
+            return None
+
+        return [kept[i] for i in references]
+
+    def record_savings() -> None:
+        if prompt.references is None or len(prompt.batch) == len(batch):
+            return
+
+        predict_output_tokens = context.expansion.predictor(
+            context.config.model, context.config.target_language
+        )
+        repeated = [
+            sentence
+            for sentence, i in zip(batch, prompt.references)
+            if prompt.batch[i] is not sentence
+        ]
+        for tokens in context.count_tokens(repeated):
+            context.prompt_savings.record(tokens, predict_output_tokens(tokens))
+
+    async def stream_batch(attempt_number: int) -> list[list[TranslatedSubtitle]]:
+        # each sentence is validated as soon as its block is received, with
+        # --salvage it is handed on at once and kept if the completion fails
+        references = prompt.references or list(range(len(prompt.batch)))
+        stream = CompletionStream()
+        content: list[str] = []
+        translated: dict[int, list[TranslatedSubtitle]] = {}
+        received: list[tuple[list[Sentence], list[list[TranslatedSubtitle]]]] = []
+        kept: set[int] = set()
+        usage = None
+        started = time.perf_counter()
+        first_sentence = None
+
+        def complete(sentences: list[tuple[int, list[str]]]) -> None:
+            nonlocal first_sentence
+            for i, lines in sentences:
+                if not 0 <= i < len(prompt.batch) or i in kept:
+                    continue
+                if not fits_completion(prompt.batch[i], lines):
+                    continue
+
+                kept.add(i)
+                positions = [j for j, r in enumerate(references) if r == i]
+                sentences_kept = [batch[j] for j in positions]
+                subtitles = translate_completions(
+                    sentences_kept, [lines] * len(positions), attempt_number
+                )
+                translated.update(zip(positions, subtitles))
+                received.append((sentences_kept, subtitles))
+                if context.config.salvage:
+                    emit(sentences_kept, subtitles)
+                if first_sentence is None:
+                    first_sentence = time.perf_counter() - started
+
+        error = None
+        try:
+            async with context.requests:
+                chunks = await context.client.chat.completions.create(
+                    model=context.config.model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in chunks:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content.append(chunk.choices[0].delta.content)
+                        complete(stream.feed(content[-1]))
+
+            complete(stream.close())
+        except (openai.APITimeoutError, openai.APIConnectionError) as e:
+            if not (context.config.salvage and translated):
+                raise
+
+            error = TranslatorError(
+                batch, completion_lines("".join(content)), f"Stream interrupted: {e}"
+            )
+
+        context.llm_logger(prompt, "".join(content))
+        context.streams.record(first_sentence, time.perf_counter() - started)
+        if usage is not None:
+            context.expansion.observe(
+                context.config.model,
+                context.config.target_language,
+                sum(context.count_tokens(prompt.batch)),
+                usage.completion_tokens,
+                len(prompt.batch),
+            )
+
+        if error is None and len(translated) < len(batch):
+            error = TranslatorError(
+                batch,
+                completion_lines("".join(content)),
+                f"Sentences missing or with fragment counts differing by more "
+                f"than 2. Prompt: {len(prompt.batch)}, Valid: {len(kept)}",
+            )
+
+        if error is not None and not context.config.salvage:
+            raise error
+
+        # cached once the request slot is released
+        for sentences_kept, subtitles in received:
+            await context.cache.put(sentences_kept, subtitles)
+
+        if error is not None:
+            context.streams.kept += len(translated)
+            error.salvaged = translated
+            raise error
+
+        record_savings()
+        translated_batch = [translated[j] for j in range(len(batch))]
+        if not context.config.salvage:
+            emit(batch, translated_batch)
+
+        return translated_batch
+
     def inject_retry_count(retry_state: RetryCallState):
         retry_state.kwargs["attempt_number"] = retry_state.attempt_number
 
@@ -34,34 +251,63 @@ async def batch_mapper(
         ),
     )
     async def _translate_batch(attempt_number=None) -> list[list[TranslatedSubtitle]]:
-        prompt = UserPrompt.create_prompt(batch)
-        completion: ChatCompletion = await context.client.chat.completions.create(
-            model=context.config.model,
-            messages=[
-                context.system_message,
-                prompt.user_message,
-            ],
-        )
+        if context.config.stream:
+            return await stream_batch(attempt_number)
+
+        async with context.requests:
+            completion: ChatCompletion = await context.client.chat.completions.create(
+                model=context.config.model,
+                messages=messages,
+                response_format=format_option,
+            )
 
         content = completion.choices[0].message.content
         context.llm_logger(prompt, content)
+        if completion.usage is not None:
+            context.expansion.observe(
+                context.config.model,
+                context.config.target_language,
+                sum(context.count_tokens(prompt.batch)),
+                completion.usage.completion_tokens,
+                len(prompt.batch),
+            )
 
-        parsed_completions = parse_completions(batch, content or "")
-        tokenization = context.config.target_language.value.tokenization
-        parsed_completions = [
-            fit_fragments_count(
-                tokenization,
-                sentence.non_empty_text_lines_count,
-                parsed_completion,
+        try:
+            parsed_completions = parse(
+                prompt.batch, content or "", prompt.references, context.config.salvage
             )
-            for sentence, parsed_completion in zip(batch, parsed_completions)
-        ]
+        except TranslatorError as e:
+            repaired = (
+                await repair(content or "", completion, e)
+                if context.config.repair
+                else None
+            )
+            if repaired is None:
+                if not e.parsed:
+                    raise
+
+                # the sentences that validated are kept, only the others are retried
+                sentences = [batch[i] for i in e.parsed]
+                translated = translate_completions(
+                    sentences, list(e.parsed.values()), attempt_number
+                )
+                await context.cache.put(sentences, translated)
+                raise TranslatorError(
+                    batch,
+                    e.completions,
+                    str(e),
+                    salvaged=dict(zip(e.parsed, translated)),
+                ) from e
 
-        translated_batch = map_to_translated_subtitle(
+            parsed_completions = repaired
+
+        record_savings()
+        translated_batch = translate_completions(
             batch, parsed_completions, attempt_number
         )
 
         await context.cache.put(batch, translated_batch)
+        emit(batch, translated_batch)
 
         return translated_batch
 
@@ -69,6 +315,12 @@ async def batch_mapper(
 
 
 async def batch_fallback_mapper(
-    *, context: Context, sentence: Sentence, exception: TranslatorError
+    *,
+    context: Context,
+    sentence: Sentence,
+    exception: TranslatorError,
+    on_sentence: SentenceListener | None = None,
 ) -> list[TranslatedSubtitle]:
-    return (await batch_mapper(context=context, batch=[sentence]))[0]
+    return (
+        await batch_mapper(context=context, batch=[sentence], on_sentence=on_sentence)
+    )[0]
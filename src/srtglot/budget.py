@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from .glossary import Glossary
+from .model import Sentence
+from .prompt import delimiter, get_glossary_prompt
+from .tokens import Encoder
+
+
+# chat completion framing: role and separators around each message, and the
+# tokens priming the assistant reply
+_MESSAGE_TOKENS = 3
+_REPLY_TOKENS = 3
+# sentence numbers below 1000 take as many tokens as this one
+_WIDEST_DELIMITER = delimiter(999) + "\n"
+
+
+@dataclass(frozen=True)
+class RequestBudget:
+    max_request_tokens: int
+    fixed_tokens: int
+    delimiter_tokens: int
+    predict_output_tokens: Callable[[int], int]
+    glossary: Glossary | None = None
+
+    @property
+    def max_batch_tokens(self) -> int:
+        return self.max_request_tokens - self.fixed_tokens
+
+    def glossary_tokens(self, sentence: Sentence) -> int:
+        # terms repeated across a batch are sent once, counting them for every
+        # sentence keeps the request within the budget
+        if self.glossary is None:
+            return 0
+
+        return self.glossary.entry_tokens(str(sentence))
+
+    def sentence_tokens(self, prompt_tokens: int, glossary_tokens: int = 0) -> int:
+        return (
+            prompt_tokens
+            + self.delimiter_tokens
+            + self.predict_output_tokens(prompt_tokens)
+            + glossary_tokens
+        )
+
+    def request_tokens(
+        self, prompt_tokens: list[int], glossary_tokens: list[int] | None = None
+    ) -> int:
+        glossary_tokens = glossary_tokens or [0] * len(prompt_tokens)
+        return self.fixed_tokens + sum(
+            map(self.sentence_tokens, prompt_tokens, glossary_tokens)
+        )
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        max_request_tokens: int,
+        system_prompt: str,
+        encode: Encoder,
+        predict_output_tokens: Callable[[int], int],
+        glossary: Glossary | None = None,
+    ) -> "RequestBudget":
+        system_tokens, delimiter_tokens, glossary_tokens = encode(
+            [system_prompt, _WIDEST_DELIMITER, str(get_glossary_prompt([])["content"])]
+        )
+        fixed_tokens = system_tokens + 2 * _MESSAGE_TOKENS + _REPLY_TOKENS
+        if glossary is not None:
+            # the glossary goes in a system message of its own
+            fixed_tokens += glossary_tokens + _MESSAGE_TOKENS
+        if max_request_tokens <= fixed_tokens:
+            raise ValueError(
+                f"A request budget of {max_request_tokens} tokens does not fit the "
+                f"{fixed_tokens} tokens of the system prompt"
+            )
+
+        return cls(
+            max_request_tokens=max_request_tokens,
+            fixed_tokens=fixed_tokens,
+            delimiter_tokens=delimiter_tokens,
+            predict_output_tokens=predict_output_tokens,
+            glossary=glossary,
+        )
@@ -6,11 +6,23 @@ import aiofiles
 
 from .model import Sentence, TranslatedSubtitle
 from .languages import Language
+from .parser import parse_timestamp
+
+
+def _to_translated_subtitle(item: dict) -> TranslatedSubtitle:
+    # entries written before timings were stored as milliseconds hold SRT strings
+    start, end = (
+        parse_timestamp(t) if isinstance(t, str) else t
+        for t in (item["start"], item["end"])
+    )
+    return TranslatedSubtitle(start=start, end=end, text=item["text"])
 
 
 @dataclass(frozen=True)
 class Cache:
     cache_dir: Path | None
+    # mixed into every key, for options that change the translations
+    salt: bytes = b""
 
     async def get(self, key: list[Sentence]) -> list[list[TranslatedSubtitle]] | None:
         if self.cache_dir is None:
@@ -24,7 +36,10 @@ class Cache:
 
             async with aiofiles.open(entry_path, "r") as f:
                 cached.append(
-                    [TranslatedSubtitle(**item) for item in json.loads(await f.read())]
+                    [
+                        _to_translated_subtitle(item)
+                        for item in json.loads(await f.read())
+                    ]
                 )
 
         return cached
@@ -42,7 +57,7 @@ class Cache:
         if self.cache_dir is None:
             raise ValueError("Cache directory is not set")
 
-        sha1 = hashlib.sha1()
+        sha1 = hashlib.sha1(self.salt)
         for block in sentence.blocks:
             for multiline in block.text:
                 for line in multiline.lines:
@@ -51,7 +66,9 @@ class Cache:
         return self.cache_dir / (sha1.hexdigest() + ".json")
 
     @classmethod
-    def create(cls, cache_dir: Path | None, language: Language) -> "Cache":
+    def create(
+        cls, cache_dir: Path | None, language: Language, salt: bytes = b""
+    ) -> "Cache":
         if cache_dir is not None:
             cache_dir = cache_dir.expanduser().resolve() / language.name
             if not cache_dir.exists():
@@ -60,4 +77,4 @@ class Cache:
             if not cache_dir.is_dir():
                 raise ValueError(f"{cache_dir} is not a directory")
 
-        return cls(cache_dir=cache_dir)
+        return cls(cache_dir=cache_dir, salt=salt)
@@ -1,36 +1,346 @@
 import os
-from functools import reduce
-from itertools import islice
-from operator import add
+from collections import Counter
+from itertools import compress, islice
 import asyncio
 from pathlib import Path
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Awaitable, Callable, Iterable, Iterator
 import aiofiles
 import openai
 import rich_click as click
 from rich.progress import Progress
 import textwrap
 
-from .parser import parse
+from .formats import get_reader
 from .translator import Context, translator
-from .sentence import collect_sentences
+from .sentence import (
+    SentenceStats,
+    batch_counted_sentences,
+    collect_sentences,
+    count_blocks,
+)
+from .preprocess import Preprocessed
+from .incremental import Revision
+from .series import Series, SeriesStats, list_episodes, output_paths
+from .tokens import Tokenizer
+from .latency import Batching
+from .structured import CompletionFormat
 from .languages import Language
 from .renderer import render_srt
 from .model import Sentence, TranslatedSubtitle
 from .config import Config
 
+_DISPATCH_WINDOW = 4
+# batches formed ahead of their results are sized before any feedback from
+# them, a tuned batch size needs a short lookahead to take effect
+_TUNED_DISPATCH_WINDOW = 1
+
+
+def _translation_options(command: Callable) -> Callable:
+    options = [
+        click.option(
+            "--target-language",
+            "-t",
+            required=True,
+            help="The target language to translate the subtitle text into.",
+            type=click.Choice([lang.name.lower() for lang in Language]),
+        ),
+        click.option(
+            "--source-language",
+            "-s",
+            help="The language of the subtitle text. Selects the punctuation that "
+            "ends a sentence; all known sentence terminators are used when omitted.",
+            default=os.environ.get("SOURCE_LANGUAGE"),
+            type=click.Choice([lang.name.lower() for lang in Language]),
+        ),
+        click.option(
+            "--max-gap",
+            help="Pause between two cues, in milliseconds, that always ends a "
+            "sentence. 0 disables the check.",
+            default=os.environ.get("MAX_GAP", 2000),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--max-sentence-cues",
+            help="Max number of cues merged into a single sentence. 0 disables the "
+            "check.",
+            default=os.environ.get("MAX_SENTENCE_CUES", 10),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--model",
+            "-m",
+            help="The model to use for translation.",
+            default=os.environ.get("OPENAI_MODEL", "gpt-4o"),
+            show_default=True,
+        ),
+        click.option(
+            "--max-tokens",
+            "-x",
+            help="Sentence batch max size in tokens.",
+            default=os.environ.get("MAX_TOKENS", 100),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--max-request-tokens",
+            help="Total token budget of a request: system prompt, sentences as "
+            "rendered in the user prompt, and their predicted translation. "
+            "Replaces --max-tokens for batching when set; 0 disables it.",
+            default=os.environ.get("MAX_REQUEST_TOKENS", 0),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--tune-batch-size/--no-tune-batch-size",
+            help="Grow the batch size while batches translate at once and shrink "
+            "it when they have to be bisected, within --min-batch-tokens and "
+            "--max-batch-tokens. Starts from --max-tokens or --max-request-tokens.",
+            default=False,
+            show_default=True,
+        ),
+        click.option(
+            "--min-batch-tokens",
+            help="Lower bound of the tuned batch size.",
+            default=os.environ.get("MIN_BATCH_TOKENS", 20),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--max-batch-tokens",
+            help="Upper bound of the tuned batch size.",
+            default=os.environ.get("MAX_BATCH_TOKENS", 4000),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--compact-prompts/--no-compact-prompts",
+            help="Send sentences repeated within a batch once and copy their "
+            "translation to every occurrence.",
+            default=False,
+            show_default=True,
+        ),
+        click.option(
+            "--salvage/--no-salvage",
+            help="Keep the sentences of a rejected completion that are well "
+            "formed and retry only the others.",
+            default=False,
+            show_default=True,
+        ),
+        click.option(
+            "--repair/--no-repair",
+            help="Send a rejected completion back with the validation error and "
+            "ask for the offending sentences again before bisecting the batch.",
+            default=False,
+            show_default=True,
+        ),
+        click.option(
+            "--output-format",
+            help="Wire format of the completions: `text` delimits sentences with "
+            "[sentence N] lines, `json` requests a JSON schema response with the "
+            "fragments of each sentence as an array.",
+            default=os.environ.get("OUTPUT_FORMAT", CompletionFormat.TEXT.value),
+            show_default=True,
+            type=click.Choice([f.value for f in CompletionFormat]),
+        ),
+        click.option(
+            "--stream/--no-stream",
+            help="Stream completions and validate each sentence as soon as it is "
+            "received. With --salvage it is written out at once and kept even if "
+            "the completion fails later. Requires the text output format; "
+            "completions are not repaired.",
+            default=False,
+            show_default=True,
+        ),
+        click.option(
+            "--glossary",
+            help="Tab separated file of terms and their translations. Only the "
+            "terms found in a batch are sent with it. Can be repeated.",
+            multiple=True,
+            type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        ),
+        click.option(
+            "--tokenizer",
+            help="How sentence tokens are counted. tiktoken is exact but loads, and "
+            "may download, its vocabulary on startup; heuristic estimates counts "
+            "from character classes and works offline.",
+            default=os.environ.get("TOKENIZER", Tokenizer.TIKTOKEN.value),
+            show_default=True,
+            type=click.Choice([tokenizer.value for tokenizer in Tokenizer]),
+        ),
+        click.option(
+            "--batching",
+            help="How sentences are grouped into requests. tokens balances input "
+            "tokens; latency balances the output tokens predicted from past runs "
+            "for the target language and starts the longest requests first.",
+            default=os.environ.get("BATCHING", Batching.TOKENS.value),
+            show_default=True,
+            type=click.Choice([batching.value for batching in Batching]),
+        ),
+        click.option(
+            "--cache-dir",
+            "-c",
+            help="Cache directory for storing language completions. Ignored when --no-cache is set.",
+            default=os.environ.get("CACHE_DIR", "~/.cache/srtglot"),
+            show_default=True,
+            type=click.Path(
+                exists=False, dir_okay=True, file_okay=False, path_type=Path
+            ),
+        ),
+        click.option(
+            "--no-cache",
+            "-n",
+            help="Disable caching of translated subtitles.",
+            is_flag=True,
+        ),
+        click.option(
+            "--max-attempts",
+            "-a",
+            help="Max number of attempts when translating a sentence batch.",
+            default=os.environ.get("MAX_ATTEMPTS", 3),
+            show_default=True,
+            type=int,
+        ),
+        click.option(
+            "--llm-log-dir",
+            "-d",
+            help="Log directory for storing llm logs.",
+            default=os.environ.get("LLM_LOG_DIR"),
+            show_default=True,
+            type=click.Path(
+                exists=False, dir_okay=True, file_okay=False, path_type=Path
+            ),
+        ),
+        click.option(
+            "--parallelism",
+            "-p",
+            help="Number of sentence bacthes to translate in parallel.",
+            default=os.environ.get("PARALLELISM", 20),
+            show_default=True,
+            type=int,
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+
+    return command
+
+
+def _predicted_latency(context: Context) -> Callable[[list[Sentence]], int] | None:
+    predictor = context.output_predictor
+    if predictor is None:
+        return None
+
+    def predicted_output_tokens(batch: list[Sentence]) -> int:
+        return sum(map(predictor, context.count_tokens(batch)))
+
+    return predicted_output_tokens
+
+
+def _dispatch_lookahead(context: Context) -> int:
+    return (
+        _TUNED_DISPATCH_WINDOW if context.batch_size is not None else _DISPATCH_WINDOW
+    )
+
+
+def _save_expansion(context: Context) -> None:
+    # saved while an exception may be propagating, which must not be replaced
+    try:
+        context.expansion.save()
+    except OSError as e:
+        click.echo(f"Could not save the observed output expansion: {e}", err=True)
+
+
+class _Arrivals:
+    # streamed translations kept by sentence until the output takes them in order
+    def __init__(self) -> None:
+        self.translated: dict[int, list[TranslatedSubtitle]] = {}
+        self.changed = asyncio.Event()
+
+    def put(self, sentence: Sentence, subtitles: list[TranslatedSubtitle]) -> None:
+        self.translated[id(sentence)] = subtitles
+        self.changed.set()
+
+    async def take(
+        self, batch: list[Sentence], task: asyncio.Task[list[list[TranslatedSubtitle]]]
+    ) -> AsyncGenerator[list[TranslatedSubtitle], None]:
+        # the leading sentences of a batch are yielded as they arrive, the rest
+        # from the batch result, which also raises its error
+        for i, sentence in enumerate(batch):
+            while id(sentence) not in self.translated and not task.done():
+                self.changed.clear()
+                changed = asyncio.ensure_future(self.changed.wait())
+                await asyncio.wait([task, changed], return_when=asyncio.FIRST_COMPLETED)
+                changed.cancel()
+
+            if id(sentence) not in self.translated:
+                for remaining in batch[i:]:
+                    self.translated.pop(id(remaining), None)
+                for subtitles in (await task)[i:]:
+                    yield subtitles
+                return
+
+            yield self.translated.pop(id(sentence))
+
+        await task
+
+
+async def _translate_batches(
+    translate: Callable[[list[Sentence]], Awaitable[list[list[TranslatedSubtitle]]]],
+    batches: Iterator[list[Sentence]],
+    parallelism: int,
+    advance: Callable[[int], None],
+    priority: Callable[[list[Sentence]], int] | None = None,
+    lookahead: int = _DISPATCH_WINDOW,
+    arrivals: _Arrivals | None = None,
+) -> AsyncGenerator[list[TranslatedSubtitle], None]:
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def translate_batch(
+        batch: list[Sentence],
+    ) -> list[list[TranslatedSubtitle]]:
+        async with semaphore:
+            result = await translate(batch)
+        advance(sum(len(b) for b in result))
+        return result
+
+    def schedule() -> list[
+        tuple[list[Sentence], asyncio.Task[list[list[TranslatedSubtitle]]]]
+    ]:
+        # up to lookahead batches per worker are formed at once
+        window = list(islice(batches, parallelism * lookahead))
+        order = list(range(len(window)))
+        if priority is not None:
+            # the longest batches start first so they don't finish the window late
+            order.sort(key=lambda i: priority(window[i]), reverse=True)
+
+        tasks = {i: asyncio.create_task(translate_batch(window[i])) for i in order}
+        return [(window[i], tasks[i]) for i in range(len(window))]
+
+    # a slot freed by a finished batch goes to the next one right away, including
+    # the next window's, results are still yielded in input order
+    pending = schedule()
+    while pending:
+        following = schedule()
+        for batch, task in pending:
+            if arrivals is not None:
+                async for subtitles_list in arrivals.take(batch, task):
+                    yield subtitles_list
+                continue
+
+            for subtitles_list in await task:
+                yield subtitles_list
+
+        pending = following
+
+
 @click.command()
-@click.option(
-    "--target-language",
-    "-t",
-    required=True,
-    help="The target language to translate the subtitle text into.",
-    type=click.Choice([lang.name.lower() for lang in Language]),
-)
+@_translation_options
 @click.option(
     "--input",
     "-i",
-    help="The srt input file to translate.",
+    help="The srt, vtt, ass or ssa input file to translate.",
     required=True,
     type=click.Path(
         exists=True, dir_okay=False, file_okay=True, readable=True, path_type=Path
@@ -54,126 +364,365 @@ from .config import Config
     help="Only translate the first N sentences.",
 )
 @click.option(
-    "--model",
-    "-m",
-    help="The model to use for translation.",
-    default=os.environ.get("OPENAI_MODEL", "gpt-4o"),
-    show_default=True,
-)
-@click.option(
-    "--max-tokens",
-    "-x",
-    help="Sentence batch max size in tokens.",
-    default=os.environ.get("MAX_TOKENS", 100),
-    show_default=True,
-    type=int,
-)
-@click.option(
-    "--cache-dir",
-    "-c",
-    help="Cache directory for storing language completions. Ignored when --no-cache is set.",
-    default=os.environ.get("CACHE_DIR", "~/.cache/srtglot"),
-    show_default=True,
-    type=click.Path(exists=False, dir_okay=True, file_okay=False, path_type=Path),
-)
-@click.option(
-    "--no-cache",
-    "-n",
-    help="Disable caching of translated subtitles.",
-    is_flag=True,
-)
-@click.option(
-    "--max-attempts",
-    "-a",
-    help="Max number of attempts when translating a sentence batch.",
-    default=os.environ.get("MAX_ATTEMPTS", 3),
-    show_default=True,
-    type=int,
-)
-@click.option(
-    "--llm-log-dir",
-    "-d",
-    help="Log directory for storing llm logs.",
-    default=os.environ.get("LLM_LOG_DIR"),
-    show_default=True,
-    type=click.Path(exists=False, dir_okay=True, file_okay=False, path_type=Path),
+    "--previous-input",
+    "-I",
+    help="A previous revision of the input file. Sentences unchanged since then "
+    "are carried over from --previous-output instead of being translated again.",
+    type=click.Path(
+        exists=True, dir_okay=False, file_okay=True, readable=True, path_type=Path
+    ),
 )
 @click.option(
-    "--parallelism",
-    "-p",
-    help="Number of sentence bacthes to translate in parallel.",
-    default=os.environ.get("PARALLELISM", 20),
-    show_default=True,
-    type=int,
+    "--previous-output",
+    "-O",
+    help="The translated srt output file of --previous-input.",
+    type=click.Path(
+        exists=True, dir_okay=False, file_okay=True, readable=True, path_type=Path
+    ),
 )
 def main(
     input: Path,
     output: Path,
     target_language: str,
+    source_language: str | None,
+    max_gap: int,
+    max_sentence_cues: int,
     model: str,
     max_tokens: int,
+    max_request_tokens: int,
+    tune_batch_size: bool,
+    min_batch_tokens: int,
+    max_batch_tokens: int,
+    compact_prompts: bool,
+    glossary: tuple[Path, ...],
+    salvage: bool,
+    repair: bool,
+    output_format: str,
+    stream: bool,
+    tokenizer: str,
+    batching: str,
     cache_dir: Path,
     llm_log_dir: Path,
     max_attempts: int,
     limit: int,
     parallelism: int,
     no_cache: bool,
+    previous_input: Path | None,
+    previous_output: Path | None,
 ):
     config = Config.create_config(
         input=input,
         output=output,
         target_language=target_language,
+        source_language=source_language,
+        max_gap=max_gap,
+        max_sentence_cues=max_sentence_cues,
         model=model,
         max_tokens=max_tokens,
+        max_request_tokens=max_request_tokens,
+        tune_batch_size=tune_batch_size,
+        min_batch_tokens=min_batch_tokens,
+        max_batch_tokens=max_batch_tokens,
+        compact_prompts=compact_prompts,
+        glossary=glossary,
+        salvage=salvage,
+        repair=repair,
+        output_format=output_format,
+        stream=stream,
+        tokenizer=tokenizer,
+        batching=batching,
         cache_dir=cache_dir if not no_cache else None,
         llm_log_dir=llm_log_dir,
         max_attempts=max_attempts,
         limit=limit,
         parallelism=parallelism,
+        previous_input=previous_input,
+        previous_output=previous_output,
     )
 
-    context = Context.create(config=config)
-    translate = translator(context)
+    try:
+        context = Context.create(config=config)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    arrivals = _Arrivals()
+    sizes: Counter[int] = Counter()
+
+    # streamed sentences move the progress, and with --salvage the output file,
+    # as they arrive instead of per batch
+    def on_sentence(sentence: Sentence, subtitles: list[TranslatedSubtitle]) -> None:
+        progress.update(task, advance=len(subtitles))
+        arrivals.put(sentence, subtitles)
+
+    translate = translator(context, on_sentence if config.stream else None)
+
+    reader = get_reader(input)
+    if config.cache_dir is not None:
+        preprocessed = Preprocessed.create(
+            input,
+            reader=reader,
+            model=config.model,
+            cache_dir=config.cache_dir,
+            segmenter=context.segmenter,
+            memo=context.token_memo,
+            tokenizer=config.tokenizer,
+        )
+        subtitles_count = preprocessed.subtitles_count
+        sentences: Iterable[Sentence] = preprocessed.sentences
+        tokens: list[int] | None = preprocessed.tokens
+        click.echo(SentenceStats.create(sentences, tokens))
+    else:
+        # sentences stream into the batcher, their stats are printed after the run
+        subtitles_count = reader.count_subtitles(input)
+        sentences = count_blocks(
+            collect_sentences(reader.parse(input), context.segmenter), sizes
+        )
+        tokens = None
+
+    revision = None
+    if config.previous_input is not None and config.previous_output is not None:
+        try:
+            revision = Revision.create(
+                list(sentences),
+                previous_input=config.previous_input,
+                previous_output=config.previous_output,
+                segmenter=context.segmenter,
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e)) from e
+        pending = [translated is None for translated in revision.translations]
+        sentences = list(compress(revision.sentences, pending))
+        tokens = list(compress(tokens, pending)) if tokens is not None else None
+        click.echo(
+            f"Carrying over {revision.carried_count} of "
+            f"{len(revision.sentences)} sentences from {config.previous_output}"
+        )
+
+    batches = (
+        batch_counted_sentences(
+            zip(sentences, tokens),
+            config.max_tokens,
+            weight=context.output_predictor,
+        )
+        if tokens is not None and context.budget is None and context.batch_size is None
+        else context.batcher(sentences)
+    )
 
-    subtitles = [*parse(input)]
-    sentences = collect_sentences(iter(subtitles))
-    batches = context.batcher(sentences)
     if config.limit > 0:
         batches = islice(batches, config.limit)
 
     async def mainloop():
         async with aiofiles.open(output, "w") as output_stream:
 
-            def batched() -> Generator[list[list[Sentence]], None, None]:
-                while batch := list(islice(batches, parallelism)):
-                    yield batch
+            def sentences_iter() -> AsyncGenerator[list[TranslatedSubtitle], None]:
+                return _translate_batches(
+                    translate,
+                    iter(batches),
+                    parallelism,
+                    (lambda _: None)
+                    if config.stream
+                    else lambda advance: progress.update(task, advance=advance),
+                    _predicted_latency(context),
+                    _dispatch_lookahead(context),
+                    arrivals if config.stream else None,
+                )
 
-            async def translate_batch(
-                batch: list[Sentence],
-            ) -> list[list[TranslatedSubtitle]]:
-                result = await translate(batch)
-                advance = reduce(add, [len(b) for b in result])
-                progress.update(task, advance=advance)
-                return result
+            async def revised_sentences_iter(
+                revision: Revision,
+            ) -> AsyncGenerator[list[TranslatedSubtitle], None]:
+                translated = sentences_iter()
+                for carried in revision.translations:
+                    if carried is not None:
+                        progress.update(task, advance=len(carried))
+                        yield carried
+                        continue
+
+                    try:
+                        yield await anext(translated)
+                    except StopAsyncIteration:
+                        return
 
             async def subtitles_iter() -> AsyncGenerator[TranslatedSubtitle, None]:
-                for batch in batched():
-                    tasks = [asyncio.create_task(translate_batch(b)) for b in batch]
-                    results = await asyncio.gather(*tasks)
-                    for result in results:
-                        for subtitles_list in result:
-                            for sentence in subtitles_list:
-                                yield sentence
+                async for subtitles_list in (
+                    sentences_iter()
+                    if revision is None
+                    else revised_sentences_iter(revision)
+                ):
+                    for sentence in subtitles_list:
+                        yield sentence
 
             await render_srt(input=subtitles_iter(), output=output_stream)
 
     try:
         with Progress() as progress:
-            message = f"Translating {textwrap.shorten(str(input.name), width=40, placeholder="...")} to {target_language} "
-            task = progress.add_task(message, total=len(subtitles))
+            message = f"Translating {textwrap.shorten(str(input.name), width=40, placeholder='...')} to {target_language} "
+            task = progress.add_task(message, total=subtitles_count)
+            asyncio.run(mainloop())
+    except openai.RateLimitError as e:
+        raise click.ClickException(f"OpenAI API rate limit exceeded. {e}") from e
+    finally:
+        _save_expansion(context)
+        if sizes:
+            click.echo(SentenceStats.from_sizes(sizes))
+        if context.batch_size is not None:
+            click.echo(f"Batch size settled at {context.batch_size()} tokens")
+        if config.compact_prompts:
+            click.echo(str(context.prompt_savings))
+        if context.glossary is not None:
+            click.echo(str(context.glossary.stats))
+        if context.bisections.batches:
+            click.echo(str(context.bisections))
+        if context.repairs.failed:
+            click.echo(str(context.repairs))
+        if context.streams.completions:
+            click.echo(str(context.streams))
+
+
+@click.command()
+@_translation_options
+@click.option(
+    "--input",
+    "-i",
+    help="The directory holding the srt, vtt, ass or ssa episode files to translate.",
+    required=True,
+    type=click.Path(
+        exists=True, dir_okay=True, file_okay=False, readable=True, path_type=Path
+    ),
+)
+@click.option(
+    "--output",
+    "-o",
+    help="The directory to write the translated srt episode files to.",
+    required=True,
+    type=click.Path(exists=False, dir_okay=True, file_okay=False, path_type=Path),
+)
+def series(
+    input: Path,
+    output: Path,
+    target_language: str,
+    source_language: str | None,
+    max_gap: int,
+    max_sentence_cues: int,
+    model: str,
+    max_tokens: int,
+    max_request_tokens: int,
+    tune_batch_size: bool,
+    min_batch_tokens: int,
+    max_batch_tokens: int,
+    compact_prompts: bool,
+    glossary: tuple[Path, ...],
+    salvage: bool,
+    repair: bool,
+    output_format: str,
+    stream: bool,
+    tokenizer: str,
+    batching: str,
+    cache_dir: Path,
+    llm_log_dir: Path,
+    max_attempts: int,
+    parallelism: int,
+    no_cache: bool,
+):
+    config = Config.create_config(
+        input=input,
+        output=output,
+        target_language=target_language,
+        source_language=source_language,
+        max_gap=max_gap,
+        max_sentence_cues=max_sentence_cues,
+        model=model,
+        max_tokens=max_tokens,
+        max_request_tokens=max_request_tokens,
+        tune_batch_size=tune_batch_size,
+        min_batch_tokens=min_batch_tokens,
+        max_batch_tokens=max_batch_tokens,
+        compact_prompts=compact_prompts,
+        glossary=glossary,
+        salvage=salvage,
+        repair=repair,
+        output_format=output_format,
+        stream=stream,
+        tokenizer=tokenizer,
+        batching=batching,
+        cache_dir=cache_dir if not no_cache else None,
+        llm_log_dir=llm_log_dir,
+        max_attempts=max_attempts,
+        parallelism=parallelism,
+    )
+
+    try:
+        context = Context.create(config=config)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    # streamed sentences move the progress as they arrive instead of per batch
+    translate = translator(
+        context,
+        (lambda _, subtitles: progress.update(task, advance=len(subtitles)))
+        if config.stream
+        else None,
+    )
+
+    episodes = list_episodes(input)
+    if not episodes:
+        raise click.ClickException(f"No subtitle files found in {input}")
+
+    try:
+        outputs = output_paths(output, episodes)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    series = Series.read(episodes, context.segmenter)
+    click.echo(str(SeriesStats.create(series, context.batcher)))
+
+    async def mainloop():
+        translated = [
+            subtitles
+            async for subtitles in _translate_batches(
+                translate,
+                iter(context.batcher(series.distinct)),
+                parallelism,
+                (lambda _: None)
+                if config.stream
+                else lambda advance: progress.update(task, advance=advance),
+                _predicted_latency(context),
+                _dispatch_lookahead(context),
+            )
+        ]
+
+        output.mkdir(parents=True, exist_ok=True)
+
+        async def subtitles_iter(
+            subtitles: list[TranslatedSubtitle],
+        ) -> AsyncGenerator[TranslatedSubtitle, None]:
+            for subtitle in subtitles:
+                yield subtitle
+
+        for path, subtitles in zip(outputs, series.render(translated)):
+            async with aiofiles.open(path, "w") as file:
+                await render_srt(input=subtitles_iter(subtitles), output=file)
+
+    try:
+        with Progress() as progress:
+            message = f"Translating {len(episodes)} episodes to {target_language} "
+            task = progress.add_task(
+                message, total=sum(len(s.blocks) for s in series.distinct)
+            )
             asyncio.run(mainloop())
     except openai.RateLimitError as e:
         raise click.ClickException(f"OpenAI API rate limit exceeded. {e}") from e
+    finally:
+        _save_expansion(context)
+        if context.batch_size is not None:
+            click.echo(f"Batch size settled at {context.batch_size()} tokens")
+        if config.compact_prompts:
+            click.echo(str(context.prompt_savings))
+        if context.glossary is not None:
+            click.echo(str(context.glossary.stats))
+        if context.bisections.batches:
+            click.echo(str(context.bisections))
+        if context.repairs.failed:
+            click.echo(str(context.repairs))
+        if context.streams.completions:
+            click.echo(str(context.streams))
 
 
 if __name__ == "__main__":
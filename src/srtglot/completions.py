@@ -4,11 +4,120 @@ from typing import Iterable
 
 from .model import Sentence, TranslatedSubtitle
 from .context import TranslatorError
+from .structured import read_translation
+
+
+_DELIMITER = re.compile(r"\[sentence (\d+)\]")
+
+
+def fits_completion(sentence: Sentence, completion: list[str]) -> bool:
+    return (
+        len(completion) > 0
+        and abs(sentence.non_empty_text_lines_count - len(completion)) <= 2
+    )
+
+
+def completion_lines(content: str) -> list[str]:
+    return [c.strip() for c in content.split("\n") if c.strip()] if content else []
+
+
+def expand_references(
+    parsed: dict[int, list[str]], references: list[int] | None
+) -> dict[int, list[str]]:
+    if references is None:
+        return parsed
+
+    return {j: parsed[i] for j, i in enumerate(references) if i in parsed}
+
+
+def salvage_completions(
+    batch: list[Sentence], lines: list[str]
+) -> dict[int, list[str]]:
+    # sentences found by their delimiter number, a number repeated or out of
+    # range, or a fragment count off by more than 2, only discards that sentence
+    found: dict[int, list[str]] = {}
+    repeated: set[int] = set()
+    number = None
+    for line in lines:
+        if match := _DELIMITER.fullmatch(line):
+            number = int(match.group(1)) - 1
+            if number in found:
+                repeated.add(number)
+            found[number] = []
+        elif number is not None:
+            found[number].append(line)
+
+    return {
+        i: completion
+        for i, completion in sorted(found.items())
+        if 0 <= i < len(batch)
+        and i not in repeated
+        and fits_completion(batch[i], completion)
+    }
+
+
+def parse_completions(
+    batch: list[Sentence],
+    content: str,
+    references: list[int] | None = None,
+    salvage: bool = False,
+) -> list[list[str]]:
+    lines = completion_lines(content)
+    try:
+        completions = _parse_completions(batch, lines)
+    except TranslatorError as e:
+        if salvage:
+            e.parsed = expand_references(salvage_completions(batch, lines), references)
+        raise
+
+    if references is not None:
+        return [completions[i] for i in references]
 
+    return completions
+
+
+def salvage_structured_completions(
+    batch: list[Sentence], content: str
+) -> dict[int, list[str]]:
+    found = read_translation(content) or {}
+    return {
+        i: completion
+        for i, completion in sorted(found.items())
+        if 0 <= i < len(batch) and fits_completion(batch[i], completion)
+    }
+
+
+def parse_structured_completions(
+    batch: list[Sentence],
+    content: str,
+    references: list[int] | None = None,
+    salvage: bool = False,
+) -> list[list[str]]:
+    if read_translation(content) is None:
+        raise TranslatorError(
+            batch, [content], "Completion does not match the translation schema"
+        )
+
+    valid = salvage_structured_completions(batch, content)
+    if len(valid) < len(batch):
+        error = TranslatorError(
+            batch,
+            [content],
+            f"Sentences missing or with fragment counts differing by more than 2. "
+            f"Prompt: {len(batch)}, Valid: {len(valid)}",
+        )
+        if salvage:
+            error.parsed = expand_references(valid, references)
+        raise error
+
+    completions = [valid[i] for i in range(len(batch))]
+    if references is not None:
+        return [completions[i] for i in references]
+
+    return completions
 
-def parse_completions(batch: list[Sentence], content: str) -> list[list[str]]:
-    lines = [c.strip() for c in content.split("\n") if c.strip()] if content else []
 
+def _parse_completions(batch: list[Sentence], lines: list[str]) -> list[list[str]]:
     def is_delimiter(line: str) -> bool:
         return bool(re.match(r"\[sentence \d+\]", line))
 
@@ -5,6 +5,9 @@ from dataclasses import dataclass
 import click
 
 from srtglot.languages import Language
+from srtglot.latency import Batching
+from srtglot.structured import CompletionFormat
+from srtglot.tokens import Tokenizer
 
 
 @dataclass
@@ -16,10 +19,27 @@ class Config:
     api_key: str
     parallelism: int = 20
     max_tokens: int = 100
+    max_request_tokens: int = 0
+    tune_batch_size: bool = False
+    min_batch_tokens: int = 20
+    max_batch_tokens: int = 4000
+    compact_prompts: bool = False
+    glossary: tuple[Path, ...] = ()
+    salvage: bool = False
+    repair: bool = False
+    stream: bool = False
     cache_dir: Path | None = None
     llm_log_dir: Path | None = None
     max_attempts: int = 3
     limit: int = 0
+    previous_input: Path | None = None
+    previous_output: Path | None = None
+    source_language: Language | None = None
+    max_gap: int = 2000
+    max_sentence_cues: int = 10
+    tokenizer: Tokenizer = Tokenizer.TIKTOKEN
+    batching: Batching = Batching.TOKENS
+    output_format: CompletionFormat = CompletionFormat.TEXT
 
     @classmethod
     def create_config(
@@ -31,10 +51,27 @@ class Config:
         model: str = "gpt-4o",
         parallelism: int = 20,
         max_tokens: int = 100,
+        max_request_tokens: int = 0,
+        tune_batch_size: bool = False,
+        min_batch_tokens: int = 20,
+        max_batch_tokens: int = 4000,
+        compact_prompts: bool = False,
+        glossary: tuple[Path, ...] = (),
+        salvage: bool = False,
+        repair: bool = False,
+        stream: bool = False,
         cache_dir: Path | None = None,
         llm_log_dir: Path | None = None,
         max_attempts: int = 3,
         limit: int = 0,
+        previous_input: Path | None = None,
+        previous_output: Path | None = None,
+        source_language: str | None = None,
+        max_gap: int = 2000,
+        max_sentence_cues: int = 10,
+        tokenizer: str = Tokenizer.TIKTOKEN.value,
+        batching: str = Batching.TOKENS.value,
+        output_format: str = CompletionFormat.TEXT.value,
     ) -> "Config":
         api_key = os.environ["OPENAI_API_KEY"]
         if not api_key:
@@ -51,6 +88,22 @@ class Config:
         if not target_language:
             raise click.ClickException("Please provide a valid target language.")
 
+        if (previous_input is None) != (previous_output is None):
+            raise click.ClickException(
+                "Please provide both the previous input and output files, or neither."
+            )
+
+        if tune_batch_size and not 0 < min_batch_tokens <= max_batch_tokens:
+            raise click.ClickException(
+                "The minimum batch size must be positive and at most the maximum "
+                f"batch size, got {min_batch_tokens} to {max_batch_tokens} tokens."
+            )
+
+        if stream and output_format != CompletionFormat.TEXT.value:
+            raise click.ClickException(
+                "Streaming completions is only supported with the text output format."
+            )
+
         return cls(
             input=input,
             output=output,
@@ -59,8 +112,27 @@ class Config:
             parallelism=parallelism,
             target_language=Language[target_language.upper()],
             max_tokens=max_tokens,
+            max_request_tokens=max_request_tokens,
+            tune_batch_size=tune_batch_size,
+            min_batch_tokens=min_batch_tokens,
+            max_batch_tokens=max_batch_tokens,
+            compact_prompts=compact_prompts,
+            glossary=glossary,
+            salvage=salvage,
+            repair=repair,
+            stream=stream,
             cache_dir=cache_dir.expanduser().resolve() if cache_dir else None,
             llm_log_dir=llm_log_dir.expanduser().resolve() if llm_log_dir else None,
             max_attempts=max_attempts,
             limit=limit,
+            previous_input=previous_input,
+            previous_output=previous_output,
+            source_language=(
+                Language[source_language.upper()] if source_language else None
+            ),
+            max_gap=max_gap,
+            max_sentence_cues=max_sentence_cues,
+            tokenizer=Tokenizer(tokenizer),
+            batching=Batching(batching),
+            output_format=CompletionFormat(output_format),
         )
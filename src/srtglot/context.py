@@ -1,24 +1,45 @@
+import asyncio
 from dataclasses import dataclass
 from typing import Callable
 
 import openai
 
-from .model import Sentence
-from .sentence import sentences_batcher, Batcher
+from .model import Sentence, TranslatedSubtitle
+from .sentence import sentences_batcher, Batcher, Segmenter
+from .tokens import BatchTokenCounter, TokenMemo, batch_token_counter, encoder
+from .budget import RequestBudget
+from .tuning import BatchSizeController
+from .adaptive import BisectionStats
+from .streaming import StreamStats
+from .glossary import Glossary
+from .latency import Batching, Expansion
 from .cache import Cache
 from .config import Config
-from .prompt import get_system_prompt, UserPrompt
-from .logging import setup_llm_logging
+from .prompt import PromptSavings, RepairStats, get_system_prompt, UserPrompt
+from .logging import setup_llm_logging, setup_tuning_logging
 
 
 class TranslatorError(ValueError):
     batch: list[Sentence]
     completions: list[str]
+    # completions of the sentences that validated, by position in the batch
+    parsed: dict[int, list[str]]
+    # and their translations, for the failed sentences alone to be retried
+    salvaged: dict[int, list[TranslatedSubtitle]]
 
-    def __init__(self, batch: list[Sentence], completions: list[str], *args, **kwargs):
+    def __init__(
+        self,
+        batch: list[Sentence],
+        completions: list[str],
+        *args,
+        salvaged: dict[int, list[TranslatedSubtitle]] | None = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.batch = batch
         self.completions = completions
+        self.parsed = {}
+        self.salvaged = salvaged or {}
 
 
 def _create_openai_client(*, api_key) -> openai.AsyncClient:
@@ -30,6 +51,20 @@ class Context:
     config: Config
     cache: Cache
     batcher: Batcher
+    segmenter: Segmenter
+    token_memo: TokenMemo
+    count_tokens: BatchTokenCounter
+    expansion: Expansion
+    output_predictor: Callable[[int], int] | None
+    budget: RequestBudget | None
+    batch_size: BatchSizeController | None
+    prompt_savings: PromptSavings
+    glossary: Glossary | None
+    bisections: BisectionStats
+    repairs: RepairStats
+    streams: StreamStats
+    # bounds the requests in flight, bisected halves of a batch included
+    requests: asyncio.Semaphore
     client: openai.AsyncClient
     system_message: openai.types.chat.ChatCompletionSystemMessageParam
     llm_logger: Callable[[UserPrompt, str | None], None]
@@ -40,13 +75,100 @@ class Context:
         *,
         config: Config,
     ):
+        token_memo = TokenMemo.create(config.cache_dir, config.model, config.tokenizer)
+        expansion = Expansion.create(config.cache_dir)
+        output_predictor = (
+            expansion.predictor(config.model, config.target_language)
+            if config.batching is Batching.LATENCY
+            else None
+        )
+        system_message = get_system_prompt(config)
+        glossary = (
+            Glossary.create(config.glossary, encoder(config.model, config.tokenizer))
+            if config.glossary
+            else None
+        )
+        budget = (
+            RequestBudget.create(
+                max_request_tokens=config.max_request_tokens,
+                system_prompt=str(system_message["content"]),
+                encode=encoder(config.model, config.tokenizer),
+                predict_output_tokens=expansion.predictor(
+                    config.model, config.target_language
+                ),
+                glossary=glossary,
+            )
+            if config.max_request_tokens
+            else None
+        )
+        if (
+            config.tune_batch_size
+            and budget is not None
+            and budget.max_batch_tokens < config.min_batch_tokens
+        ):
+            raise ValueError(
+                f"A request budget of {config.max_request_tokens} tokens leaves "
+                f"{budget.max_batch_tokens} tokens per batch, below the minimum "
+                f"batch size of {config.min_batch_tokens} tokens"
+            )
+        if config.tune_batch_size:
+            setup_tuning_logging()
+        batch_size = (
+            BatchSizeController.create(
+                initial=(
+                    budget.max_batch_tokens if budget is not None else config.max_tokens
+                ),
+                min_tokens=config.min_batch_tokens,
+                # grown batches still have to fit the request budget
+                max_tokens=(
+                    min(config.max_batch_tokens, budget.max_batch_tokens)
+                    if budget is not None
+                    else config.max_batch_tokens
+                ),
+            )
+            if config.tune_batch_size
+            else None
+        )
         return cls(
             config=config,
             client=_create_openai_client(api_key=config.api_key),
-            system_message=get_system_prompt(config),
-            batcher=sentences_batcher(config.model, config.max_tokens),
+            system_message=system_message,
+            batcher=sentences_batcher(
+                config.model,
+                config.max_tokens,
+                token_memo,
+                config.tokenizer,
+                output_predictor,
+                budget,
+                batch_size,
+            ),
+            token_memo=token_memo,
+            count_tokens=batch_token_counter(
+                config.model, token_memo, config.tokenizer
+            ),
+            expansion=expansion,
+            output_predictor=output_predictor,
+            budget=budget,
+            batch_size=batch_size,
+            prompt_savings=PromptSavings(),
+            bisections=BisectionStats(),
+            repairs=RepairStats(),
+            streams=StreamStats(),
+            requests=asyncio.Semaphore(config.parallelism),
+            glossary=glossary,
+            segmenter=Segmenter.create(
+                language=config.source_language,
+                max_gap=config.max_gap or None,
+                max_blocks=config.max_sentence_cues or None,
+                max_tokens=config.max_tokens,
+                model=config.model,
+                tokenizer=config.tokenizer,
+                memo=token_memo,
+            ),
             llm_logger=setup_llm_logging(config),
             cache=Cache.create(
-                cache_dir=config.cache_dir, language=config.target_language
+                cache_dir=config.cache_dir,
+                language=config.target_language,
+                salt=glossary.digest if glossary is not None else b"",
             ),
         )
@@ -0,0 +1,23 @@
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from . import ass, parser, vtt
+from .model import Subtitle
+
+
+class Reader(NamedTuple):
+    parse: Callable[[Path], Iterable[Subtitle]]
+    count_subtitles: Callable[[Path], int]
+
+
+_SRT = Reader(parser.parse, parser.count_subtitles)
+_READERS = {
+    ".srt": _SRT,
+    ".vtt": Reader(vtt.parse, vtt.count_subtitles),
+    ".ass": Reader(ass.parse, ass.count_subtitles),
+    ".ssa": Reader(ass.parse, ass.count_subtitles),
+}
+
+
+def get_reader(input: Path) -> Reader:
+    return _READERS.get(input.suffix.lower(), _SRT)
@@ -0,0 +1,167 @@
+import hashlib
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .tokens import Encoder
+
+
+# scripts written without spaces between words, terms match inside words there
+_SPACELESS = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def entry_line(term: str, translation: str) -> str:
+    return f"{term} => {translation}"
+
+
+def read_glossary(path: Path) -> list[tuple[str, str]]:
+    entries = []
+    with open(path, "r", encoding="utf-8-sig") as stream:
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            term, separator, translation = line.partition("\t")
+            if not separator or not term.strip() or not translation.strip():
+                raise ValueError(
+                    f"{path}:{number}: expected a term and its translation "
+                    "separated by a tab"
+                )
+
+            entries.append((term.strip(), translation.strip()))
+
+    return entries
+
+
+@dataclass(frozen=True)
+class Automaton:
+    # trie transitions, failure links, and the keys recognized in each state
+    goto: list[dict[str, int]]
+    fail: list[int]
+    output: list[list[int]]
+    lengths: list[int]
+
+    def find(self, text: str) -> Iterable[tuple[int, int]]:
+        # yields the start and key index of every occurrence in a single pass
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for key in self.output[state]:
+                yield end - self.lengths[key], key
+
+    @classmethod
+    def create(cls, keys: list[str]) -> "Automaton":
+        goto: list[dict[str, int]] = [{}]
+        output: list[list[int]] = [[]]
+        for index, key in enumerate(keys):
+            state = 0
+            for char in key:
+                if char not in goto[state]:
+                    goto[state][char] = len(goto)
+                    goto.append({})
+                    output.append([])
+                state = goto[state][char]
+            output[state].append(index)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                if state:
+                    link = fail[state]
+                    while link and char not in goto[link]:
+                        link = fail[link]
+                    fail[child] = goto[link].get(char, 0)
+                output[child] = output[child] + output[fail[child]]
+
+        return cls(
+            goto=goto, fail=fail, output=output, lengths=[len(key) for key in keys]
+        )
+
+
+@dataclass
+class GlossaryStats:
+    requests: int = 0
+    match_seconds: float = 0.0
+    injected_tokens: int = 0
+
+    def __str__(self) -> str:
+        average = self.injected_tokens / self.requests if self.requests else 0.0
+        return (
+            f"Glossary matched against {self.requests} requests in "
+            f"{self.match_seconds * 1000:.1f} ms, {average:.1f} tokens injected "
+            "per request"
+        )
+
+
+@dataclass(frozen=True)
+class Glossary:
+    entries: list[tuple[str, str]]
+    tokens: list[int]
+    automaton: Automaton
+    # identifies the entries, translations cached with others are not reused
+    digest: bytes = b""
+    stats: GlossaryStats = field(default_factory=GlossaryStats)
+
+    def _bounded(self, text: str, start: int, end: int) -> bool:
+        # terms of spaced scripts only match whole words
+        def joined(inner: str, outer: str) -> bool:
+            return (
+                inner.isalnum()
+                and outer.isalnum()
+                and not _SPACELESS.match(inner)
+                and not _SPACELESS.match(outer)
+            )
+
+        return not (start > 0 and joined(text[start], text[start - 1])) and not (
+            end < len(text) and joined(text[end - 1], text[end])
+        )
+
+    def _find(self, texts: Iterable[str]) -> list[int]:
+        found: dict[int, None] = {}
+        for text in texts:
+            text = text.lower()
+            for start, key in self.automaton.find(text):
+                end = start + self.automaton.lengths[key]
+                if key not in found and self._bounded(text, start, end):
+                    found[key] = None
+
+        return list(found)
+
+    def entry_tokens(self, text: str) -> int:
+        # tokens of the entries the text would add to a glossary prompt, with
+        # the line break after each
+        return sum(self.tokens[key] + 1 for key in self._find([text]))
+
+    def match(self, texts: Iterable[str]) -> list[tuple[str, str]]:
+        started = time.perf_counter()
+        found = self._find(texts)
+        self.stats.requests += 1
+        self.stats.match_seconds += time.perf_counter() - started
+        self.stats.injected_tokens += sum(self.tokens[key] for key in found)
+        return [self.entries[key] for key in found]
+
+    @classmethod
+    def create(cls, paths: Iterable[Path], encode: Encoder) -> "Glossary":
+        # later files override the translation of terms they repeat
+        merged: dict[str, tuple[str, str]] = {}
+        for path in paths:
+            for term, translation in read_glossary(path):
+                merged[term.lower()] = (term, translation)
+
+        entries = list(merged.values())
+        lines = [entry_line(*entry) for entry in entries]
+        return cls(
+            entries=entries,
+            tokens=encode(lines),
+            automaton=Automaton.create(list(merged)),
+            digest=hashlib.sha1("\n".join(lines).encode()).digest(),
+        )
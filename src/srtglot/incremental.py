@@ -0,0 +1,110 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from .formats import get_reader
+from .model import Markup, Sentence, TranslatedSubtitle
+from .parser import detect_encoding, read_cues
+from .sentence import DEFAULT_SEGMENTER, Segmenter, collect_sentences
+
+
+Fingerprint = tuple[tuple[tuple[str, ...], Markup | None], ...]
+
+
+def fingerprint(sentence: Sentence) -> Fingerprint:
+    return tuple((tuple(sub.text_lines), sub.markup) for sub in sentence.blocks)
+
+
+def read_translated(output: Path) -> list[TranslatedSubtitle]:
+    with open(output, "r", encoding=detect_encoding(output)) as stream:
+        return [
+            TranslatedSubtitle(start=cue.start, end=cue.end, text=cue.text)
+            for cue in read_cues(stream)
+        ]
+
+
+def retime(
+    sentence: Sentence, translated: list[TranslatedSubtitle]
+) -> list[TranslatedSubtitle]:
+    return [
+        TranslatedSubtitle(start=sub.start, end=sub.end, text=previous.text)
+        for sub, previous in zip(sentence.blocks, translated)
+    ]
+
+
+@dataclass(frozen=True)
+class Revision:
+    sentences: list[Sentence]
+    translations: list[list[TranslatedSubtitle] | None]
+
+    @property
+    def carried_count(self) -> int:
+        return sum(1 for translated in self.translations if translated is not None)
+
+    @classmethod
+    def align(
+        cls,
+        sentences: list[Sentence],
+        previous: list[Sentence],
+        translated: list[list[TranslatedSubtitle]],
+    ) -> "Revision":
+        fingerprints = [fingerprint(s) for s in sentences]
+        previous_fingerprints = [fingerprint(s) for s in previous]
+        translations: list[list[TranslatedSubtitle] | None] = [None] * len(sentences)
+        used: set[int] = set()
+
+        matcher = SequenceMatcher(
+            None, previous_fingerprints, fingerprints, autojunk=False
+        )
+        for i, j, size in matcher.get_matching_blocks():
+            for k in range(size):
+                translations[j + k] = retime(sentences[j + k], translated[i + k])
+                used.add(i + k)
+
+        # sentences moved out of sequence, or repeated elsewhere in the file, are
+        # paired with the unused previous occurrence closest in time
+        unused = defaultdict(list)
+        for i, fp in enumerate(previous_fingerprints):
+            if i not in used:
+                unused[fp].append(i)
+
+        for j, fp in enumerate(fingerprints):
+            if translations[j] is not None or not unused[fp]:
+                continue
+
+            start = sentences[j].blocks[0].start
+            i = min(unused[fp], key=lambda i: abs(previous[i].blocks[0].start - start))
+            unused[fp].remove(i)
+            translations[j] = retime(sentences[j], translated[i])
+
+        return cls(sentences=sentences, translations=translations)
+
+    @classmethod
+    def create(
+        cls,
+        sentences: list[Sentence],
+        *,
+        previous_input: Path,
+        previous_output: Path,
+        segmenter: Segmenter = DEFAULT_SEGMENTER,
+    ) -> "Revision":
+        previous = list(
+            collect_sentences(
+                get_reader(previous_input).parse(previous_input), segmenter
+            )
+        )
+        subtitles = read_translated(previous_output)
+        if len(subtitles) != sum(len(s.blocks) for s in previous):
+            raise ValueError(
+                f"{previous_output} is not a translation of {previous_input}. "
+                f"Input subtitles: {sum(len(s.blocks) for s in previous)}, "
+                f"Output subtitles: {len(subtitles)}"
+            )
+
+        translated = []
+        remaining = iter(subtitles)
+        for sentence in previous:
+            translated.append([next(remaining) for _ in sentence.blocks])
+
+        return cls.align(sentences, previous, translated)
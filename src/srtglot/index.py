@@ -0,0 +1,178 @@
+import hashlib
+import mmap
+import re
+import struct
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from .parser import _IGNORED_INDEX, Cue, _to_cue, detect_encoding
+from .sentence import DEFAULT_SEGMENTER, Segmenter
+
+
+_MAGIC = b"SRTI"
+_VERSION = 3
+_HEADER = struct.Struct("<4sHQQ16sQQ")
+_BOM = b"\xef\xbb\xbf"
+_TAG = re.compile(r"<[^>]*>")
+
+
+def _plain_text(cue: Cue) -> str:
+    return _TAG.sub("", cue.text)
+
+
+def index_path(input: Path) -> Path:
+    return input.with_name(input.name + ".idx")
+
+
+def _segmenter_digest(segmenter: Segmenter) -> bytes:
+    return hashlib.blake2b(segmenter.key.encode(), digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class SubtitleIndex:
+    size: int
+    mtime_ns: int
+    # sentence starts are only valid for the segmenter that split them
+    segmenter: bytes
+    cues: array
+    sentences: array
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def is_stale(self, input: Path, segmenter: Segmenter = DEFAULT_SEGMENTER) -> bool:
+        stat = input.stat()
+        return (
+            stat.st_size != self.size
+            or stat.st_mtime_ns != self.mtime_ns
+            or self.segmenter != _segmenter_digest(segmenter)
+        )
+
+    def sentence_range(self, start: int, stop: int | None = None) -> range:
+        stop = len(self.sentences) if stop is None else min(stop, len(self.sentences))
+        if start >= stop:
+            return range(0)
+
+        end = self.sentences[stop] if stop < len(self.sentences) else len(self.cues)
+        return range(self.sentences[start], end)
+
+    def save(self, path: Path) -> None:
+        with open(path, "wb") as stream:
+            stream.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    self.size,
+                    self.mtime_ns,
+                    self.segmenter,
+                    len(self.cues),
+                    len(self.sentences),
+                )
+            )
+            self.cues.tofile(stream)
+            self.sentences.tofile(stream)
+
+    @classmethod
+    def load(cls, path: Path) -> "SubtitleIndex":
+        with open(path, "rb") as stream:
+            (
+                magic,
+                version,
+                size,
+                mtime_ns,
+                segmenter,
+                cues_count,
+                sentences_count,
+            ) = _HEADER.unpack(stream.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a subtitle index")
+
+            cues, sentences = array("Q"), array("Q")
+            cues.fromfile(stream, cues_count)
+            sentences.fromfile(stream, sentences_count)
+
+        return cls(
+            size=size,
+            mtime_ns=mtime_ns,
+            segmenter=segmenter,
+            cues=cues,
+            sentences=sentences,
+        )
+
+    @classmethod
+    def build(
+        cls, input: Path, segmenter: Segmenter = DEFAULT_SEGMENTER
+    ) -> "SubtitleIndex":
+        if detect_encoding(input) != "utf-8-sig":
+            raise ValueError(f"{input} must be UTF-8 encoded to be indexed")
+
+        stat = input.stat()
+        cues, sentences = array("Q"), array("Q")
+        parsed: list[Cue] = []
+        with open(input, "rb") as stream:
+            buffer = (
+                mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+                if stat.st_size
+                else b""
+            )
+            position = len(_BOM) if buffer[: len(_BOM)] == _BOM else 0
+            offset = position
+            block: list[str] = []
+            while position <= len(buffer):
+                end = buffer.find(b"\n", position)
+                end = len(buffer) if end < 0 else end
+                line = buffer[position:end].decode("utf-8").rstrip()
+                if line:
+                    if not block:
+                        offset = position
+                    block.append(line)
+
+                if (not line or end == len(buffer)) and block:
+                    cue = _to_cue(block) if len(block) >= 2 else None
+                    if cue is not None and cue.number != _IGNORED_INDEX:
+                        cues.append(offset)
+                        parsed.append(cue)
+
+                    block = []
+
+                position = end + 1
+
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+        start = 0
+        for sentence in segmenter.split(parsed, _plain_text):
+            sentences.append(start)
+            start += len(sentence)
+
+        return cls(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            segmenter=_segmenter_digest(segmenter),
+            cues=cues,
+            sentences=sentences,
+        )
+
+    @classmethod
+    def create(
+        cls, input: Path, segmenter: Segmenter = DEFAULT_SEGMENTER
+    ) -> "SubtitleIndex":
+        # loads the sidecar index, or builds it and saves it next to the input
+        path = index_path(input)
+        if path.exists():
+            try:
+                index = cls.load(path)
+                if not index.is_stale(input, segmenter):
+                    return index
+            except (ValueError, EOFError, struct.error):
+                pass
+
+        index = cls.build(input, segmenter)
+        try:
+            index.save(path)
+        except OSError:
+            # a read-only directory only costs the next run a rebuild
+            pass
+
+        return index
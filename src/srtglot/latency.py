@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable
+
+from .languages import Language
+
+
+# tokens spent on the [sentence N] delimiter echoed back for every sentence
+_DELIMITER_TOKENS = 5
+_DEFAULT_EXPANSION = 1.0
+
+
+class Batching(Enum):
+    TOKENS = "tokens"
+    LATENCY = "latency"
+
+
+@dataclass(frozen=True)
+class Expansion:
+    # model and language to the input and output tokens observed so far
+    observed: dict[str, list[int]] = field(default_factory=dict)
+    path: Path | None = None
+
+    @staticmethod
+    def _key(model: str, language: Language) -> str:
+        return f"{model}:{language.name}"
+
+    def factor(self, model: str, language: Language) -> float:
+        input_tokens, output_tokens = self.observed.get(
+            self._key(model, language), (0, 0)
+        )
+        return output_tokens / input_tokens if input_tokens else _DEFAULT_EXPANSION
+
+    def predictor(self, model: str, language: Language) -> Callable[[int], int]:
+        factor = self.factor(model, language)
+
+        def predict_output_tokens(input_tokens: int) -> int:
+            return round(input_tokens * factor) + _DELIMITER_TOKENS
+
+        return predict_output_tokens
+
+    def observe(
+        self,
+        model: str,
+        language: Language,
+        input_tokens: int,
+        output_tokens: int,
+        sentences: int = 0,
+    ) -> None:
+        # the predictor adds the delimiters back, they don't scale with the input
+        observed = self.observed.setdefault(self._key(model, language), [0, 0])
+        observed[0] += input_tokens
+        observed[1] += output_tokens - sentences * _DELIMITER_TOKENS
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # concurrent runs share the file, each writes its own before the rename
+        partial = tempfile.NamedTemporaryFile(
+            "w",
+            dir=self.path.parent,
+            prefix=self.path.name,
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with partial:
+                partial.write(json.dumps(self.observed))
+            os.replace(partial.name, self.path)
+        except BaseException:
+            os.unlink(partial.name)
+            raise
+
+    @classmethod
+    def create(cls, cache_dir: Path | None) -> "Expansion":
+        if cache_dir is None:
+            return cls()
+
+        path = cache_dir / "expansion.json"
+        try:
+            return cls(observed=json.loads(path.read_text()), path=path)
+        except (FileNotFoundError, ValueError):
+            return cls(path=path)
@@ -1,6 +1,8 @@
 from collections.abc import Callable
 from logging import FileHandler, NullHandler, getLogger
 
+from rich.logging import RichHandler
+
 from .config import Config
 from .prompt import UserPrompt
 
@@ -24,3 +26,13 @@ def setup_llm_logging(config: Config) -> Callable[[UserPrompt, str | None], None
         llm_logger.debug("========================================")
 
     return logger
+
+
+def setup_tuning_logging() -> None:
+    # batch size decisions are printed above the progress bar, once per process
+    tuning_logger = getLogger("srtglot.tuning")
+    if not tuning_logger.handlers:
+        tuning_logger.addHandler(
+            RichHandler(show_time=False, show_level=False, show_path=False)
+        )
+    tuning_logger.setLevel("INFO")
@@ -1,9 +1,33 @@
-import datetime
-import copy
+import re
+import sys
 from enum import Enum
 from dataclasses import dataclass
 from functools import cached_property
+from itertools import islice
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+from bs4.formatter import HTMLFormatter
+
+
+_MARKUP = re.compile(r"[<&]")
+_SLOT = "\x00"
+_VERBATIM_TAGS = HTMLFormatter.REGISTRY["minimal"].cdata_containing_tags
+
+
+def _escape(block: str, verbatim: bool = False) -> str:
+    block = block if block else "\n"
+    return block if verbatim else EntitySubstitution.substitute_xml(block)
+
+
+def _lines(text: str) -> list[str]:
+    return [sys.intern(line) for line in text.strip().split("\n")]
+
+
+def format_timestamp(millis: int) -> str:
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "%02d:%02d:%02d,%03d" % (hours, minutes, seconds, millis)
 
 
 class OutputFormat(Enum):
@@ -11,7 +35,7 @@ class OutputFormat(Enum):
     srt = ("srt",)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Multiline:
     lines: list[str]
 
@@ -19,12 +43,42 @@ class Multiline:
         return len(self.lines)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class Markup:
+    segments: tuple[str, ...]
+    verbatim: frozenset[int] = frozenset()
+
+    def render(self, blocks: list[str]) -> str:
+        parts = [self.segments[0]]
+        for i, (block, segment) in enumerate(zip(blocks, self.segments[1:])):
+            parts.append(_escape(block, i in self.verbatim))
+            parts.append(segment)
+
+        return "".join(parts)
+
+    @classmethod
+    def compile(cls, text: str) -> tuple["Markup", list[str]]:
+        soup = BeautifulSoup(text, "html.parser")
+        elements = soup.find_all(string=True)
+        strings = [str(element) for element in elements]
+        verbatim = frozenset(
+            i
+            for i, element in enumerate(elements)
+            if element.parent is not None and element.parent.name in _VERBATIM_TAGS
+        )
+        for element in elements:
+            element.replace_with(_SLOT)
+
+        segments = tuple(sys.intern(s) for s in str(soup).split(_SLOT))
+        return cls(segments=segments, verbatim=verbatim), strings
+
+
+@dataclass(frozen=True, slots=True)
 class Subtitle:
-    start: datetime.time
-    end: datetime.time
+    start: int
+    end: int
     text: list[Multiline]
-    soup: BeautifulSoup
+    markup: Markup | None = None
 
     def translate(self, translated_text: list[str]) -> "TranslatedSubtitle":
         lines_count = sum([len(block.lines) for block in self.text])
@@ -34,17 +88,36 @@ class Subtitle:
                 f"Original: {len(self.text)}, Translated: {len(translated_text)}"
             )
 
-        soup = copy.deepcopy(self.soup)
-        for t, element in zip(translated_text, soup.find_all(string=True)):
-            element.replace_with(t if t else "\n")
-
-        return TranslatedSubtitle.create(
+        lines = iter(translated_text)
+        blocks = ["\n".join(islice(lines, len(block))) for block in self.text]
+        return TranslatedSubtitle(
             start=self.start,
             end=self.end,
-            text=str(soup),
+            text=(
+                self.markup.render(blocks)
+                if self.markup is not None
+                else "".join(_escape(block) for block in blocks)
+            ),
         )
 
-    @cached_property
+    @classmethod
+    def create(cls, start: int, end: int, text: str) -> "Subtitle":
+        if not _MARKUP.search(text):
+            return Subtitle(
+                start=start,
+                end=end,
+                text=[Multiline(_lines(text))] if text else [],
+            )
+
+        markup, strings = Markup.compile(text)
+        return Subtitle(
+            start=start,
+            end=end,
+            markup=markup,
+            text=[Multiline(_lines(block)) for block in strings],
+        )
+
+    @property
     def text_lines(self) -> list[str]:
         return [line for block in self.text for line in block.lines]
 
@@ -70,18 +143,8 @@ class Sentence:
         return [line for block in self.blocks for line in block.text_lines]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TranslatedSubtitle:
-    start: str
-    end: str
+    start: int
+    end: int
     text: str
-
-    @classmethod
-    def create(
-        cls, start: datetime.time, end: datetime.time, text: str
-    ) -> "TranslatedSubtitle":
-        return TranslatedSubtitle(
-            start=start.strftime("%H:%M:%S,%f")[:-3],
-            end=end.strftime("%H:%M:%S,%f")[:-3],
-            text=text,
-        )
@@ -1,22 +1,139 @@
+import codecs
+import io
+import re
+from itertools import chain, islice
 from pathlib import Path
-from typing import Generator, Iterable
-from pysrt import open as open_srt
-from pysrt.srtitem import SubRipItem
-from bs4 import BeautifulSoup
-from .model import Subtitle, Multiline
-
-
-def parse(input: Path) -> Generator[Subtitle, None, None]:
-    subs: Iterable[SubRipItem] = open_srt(input)
-    subs = filter(lambda sub: sub.index != 9999, subs)
-    for sub in subs:
-        soup = BeautifulSoup(sub.text, "html.parser")
-        yield Subtitle(
-            start=sub.start.to_time(),
-            end=sub.end.to_time(),
-            soup=soup,
-            text=[
-                Multiline(block.strip().split("\n"))
-                for block in soup.find_all(string=True)
-            ],
+from typing import TYPE_CHECKING, Generator, Iterable, NamedTuple
+from .model import Subtitle
+
+if TYPE_CHECKING:
+    from .index import SubtitleIndex
+
+
+_TIMESTAMP_SEPARATOR = "-->"
+_TIME_SEPARATOR = re.compile(r"[:.,]")
+_LEADING_DIGITS = re.compile(r"^\d+")
+_TIMESTAMP = re.compile(r"(\d+)[:.,](\d+)[:.,](\d+)[:.,](\d+)")
+_IGNORED_INDEX = 9999
+
+
+class Cue(NamedTuple):
+    number: int | None
+    start: int
+    end: int
+    text: str
+
+
+def detect_encoding(input: Path) -> str:
+    with open(input, "rb") as stream:
+        head = stream.read(4)
+
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return "utf-32"
+
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    return "utf-8-sig"
+
+
+def parse_timestamp(value: str) -> int:
+    if match := _TIMESTAMP.fullmatch(value.strip()):
+        hours, minutes, seconds, millis = map(int, match.groups())
+        return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+    parts = _TIME_SEPARATOR.split(value.strip())
+    if len(parts) != 4:
+        raise ValueError(f"Invalid timestamp: {value}")
+
+    def to_int(digits: str) -> int:
+        match = _LEADING_DIGITS.match(digits)
+        return int(match.group()) if match else 0
+
+    hours, minutes, seconds, millis = map(to_int, parts)
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+
+def _to_cue(block: list[str]) -> Cue | None:
+    index = None
+    if _TIMESTAMP_SEPARATOR not in block[0]:
+        index, *block = block
+
+    if not block:
+        return None
+
+    timestamps = block[0].split(_TIMESTAMP_SEPARATOR)
+    if len(timestamps) != 2:
+        return None
+
+    start, end = timestamps
+    try:
+        return Cue(
+            number=int(index) if index and index.strip().isdigit() else None,
+            start=parse_timestamp(start),
+            end=parse_timestamp(end.lstrip().split(" ", 1)[0]),
+            text="\n".join(block[1:]),
         )
+    except ValueError:
+        return None
+
+
+def read_cues(lines: Iterable[str]) -> Generator[Cue, None, None]:
+    block: list[str] = []
+    for line in chain(lines, [""]):
+        line = line.rstrip()
+        if line:
+            block.append(line)
+            continue
+
+        if len(block) >= 2 and (cue := _to_cue(block)) is not None:
+            yield cue
+
+        block = []
+
+
+def count_subtitles(input: Path) -> int:
+    count = 0
+    previous = ""
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        for line in stream:
+            if _TIMESTAMP_SEPARATOR in line and previous != str(_IGNORED_INDEX):
+                count += 1
+            previous = line.strip()
+
+    return count
+
+
+def _to_subtitles(cues: Iterable[Cue]) -> Generator[Subtitle, None, None]:
+    for cue in cues:
+        if cue.number == _IGNORED_INDEX:
+            continue
+
+        yield Subtitle.create(start=cue.start, end=cue.end, text=cue.text)
+
+
+def parse(
+    input: Path,
+    start: int = 0,
+    stop: int | None = None,
+    index: "SubtitleIndex | None" = None,
+) -> Generator[Subtitle, None, None]:
+    if start == 0 and stop is None:
+        with open(input, "r", encoding=detect_encoding(input)) as stream:
+            yield from _to_subtitles(read_cues(stream))
+
+        return
+
+    if index is None:
+        from .index import SubtitleIndex
+
+        # built in memory, SubtitleIndex.create persists it for repeated reads
+        index = SubtitleIndex.build(input)
+
+    stop = len(index) if stop is None else min(stop, len(index))
+    if start >= stop:
+        return
+
+    with open(input, "rb") as raw, io.TextIOWrapper(raw, encoding="utf-8") as stream:
+        raw.seek(index.cues[start])
+        yield from islice(_to_subtitles(read_cues(stream)), stop - start)
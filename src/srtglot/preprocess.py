@@ -0,0 +1,174 @@
+import gc
+import hashlib
+import marshal
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+from .formats import Reader
+from .model import Markup, Multiline, Sentence, Subtitle
+from .sentence import DEFAULT_SEGMENTER, Segmenter, collect_sentences
+from .tokens import TokenMemo, Tokenizer, batch_token_counter
+
+
+logger = getLogger(__name__)
+
+_VERSION = b"2"
+_CHUNK_SIZE = 1 << 20
+
+
+def artifact_path(
+    cache_dir: Path,
+    input: Path,
+    model: str,
+    segmenter: Segmenter = DEFAULT_SEGMENTER,
+    tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+) -> Path:
+    sha256 = hashlib.sha256(_VERSION)
+    sha256.update(input.suffix.lower().encode())
+    sha256.update(b"\0" + model.encode() + b"\0" + tokenizer.value.encode() + b"\0")
+    sha256.update(segmenter.key.encode() + b"\0")
+    with open(input, "rb") as stream:
+        while chunk := stream.read(_CHUNK_SIZE):
+            sha256.update(chunk)
+
+    return cache_dir / "preprocessed" / (sha256.hexdigest() + ".bin")
+
+
+@contextmanager
+def _gc_paused():
+    # loading allocates only acyclic objects, collection passes are pure overhead
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _dump_subtitle(sub: Subtitle) -> tuple:
+    markup = sub.markup
+    return (
+        sub.start,
+        sub.end,
+        [block.lines for block in sub.text],
+        markup.segments if markup is not None else None,
+        tuple(markup.verbatim) if markup is not None else (),
+    )
+
+
+def _load_subtitle(item: tuple) -> Subtitle:
+    start, end, text, segments, verbatim = item
+    return Subtitle(
+        start=start,
+        end=end,
+        text=[Multiline(lines) for lines in text],
+        markup=(
+            Markup(segments=segments, verbatim=frozenset(verbatim))
+            if segments is not None
+            else None
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class Preprocessed:
+    sentences: list[Sentence]
+    tokens: list[int]
+
+    @property
+    def subtitles_count(self) -> int:
+        return sum(len(sentence.blocks) for sentence in self.sentences)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = (
+            [len(sentence.blocks) for sentence in self.sentences],
+            [
+                _dump_subtitle(sub)
+                for sentence in self.sentences
+                for sub in sentence.blocks
+            ],
+            self.tokens,
+        )
+        # runs for other target languages may save the same artifact at once,
+        # each writes its own file and the last rename wins
+        partial = tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=path.name, suffix=".tmp", delete=False
+        )
+        try:
+            with partial:
+                partial.write(marshal.dumps(data))
+            os.replace(partial.name, path)
+        except BaseException:
+            os.unlink(partial.name)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "Preprocessed":
+        with _gc_paused():
+            lengths, subtitles, tokens = marshal.loads(path.read_bytes())
+            subs = iter(subtitles)
+            return cls(
+                sentences=[
+                    Sentence([_load_subtitle(next(subs)) for _ in range(length)])
+                    for length in lengths
+                ],
+                tokens=tokens,
+            )
+
+    @classmethod
+    def compute(
+        cls,
+        input: Path,
+        *,
+        reader: Reader,
+        model: str,
+        segmenter: Segmenter = DEFAULT_SEGMENTER,
+        memo: TokenMemo | None = None,
+        tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+    ) -> "Preprocessed":
+        sentences = list(collect_sentences(reader.parse(input), segmenter))
+        return cls(
+            sentences=sentences,
+            tokens=batch_token_counter(model, memo, tokenizer)(sentences),
+        )
+
+    @classmethod
+    def create(
+        cls,
+        input: Path,
+        *,
+        reader: Reader,
+        model: str,
+        cache_dir: Path,
+        segmenter: Segmenter = DEFAULT_SEGMENTER,
+        memo: TokenMemo | None = None,
+        tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+    ) -> "Preprocessed":
+        path = artifact_path(cache_dir, input, model, segmenter, tokenizer)
+        if path.exists():
+            try:
+                return cls.load(path)
+            except (ValueError, EOFError, TypeError):
+                pass
+
+        preprocessed = cls.compute(
+            input,
+            reader=reader,
+            model=model,
+            segmenter=segmenter,
+            memo=memo,
+            tokenizer=tokenizer,
+        )
+        try:
+            preprocessed.save(path)
+        except OSError as e:
+            # the artifact only speeds up the next run
+            logger.warning("Could not save the preprocessed input: %s", e)
+
+        return preprocessed
@@ -4,13 +4,17 @@ from pathlib import Path
 from typing import Iterable
 
 from openai.types.chat import (
+    ChatCompletionAssistantMessageParam,
+    ChatCompletionMessageParam,
     ChatCompletionSystemMessageParam,
     ChatCompletionUserMessageParam,
 )
 from jinja2 import Template
 
+from .glossary import entry_line
 from .model import Sentence
 from .config import Config
+from .structured import CompletionFormat
 
 
 @lru_cache
@@ -18,19 +22,122 @@ def _get_system_prompt_template() -> Template:
     return Template((Path(__file__).parent / "prompt.jinja").read_text())
 
 
+def delimiter(number: int) -> str:
+    return f"[sentence {number}]"
+
+
 def get_system_prompt(config: Config) -> ChatCompletionSystemMessageParam:
     language = config.target_language
-    content = _get_system_prompt_template().render(language=language.value.name)
+    content = _get_system_prompt_template().render(
+        language=language.value.name,
+        structured=config.output_format is CompletionFormat.JSON,
+    )
     return ChatCompletionSystemMessageParam(
         role="system",
         content=content,
     )
 
 
+def get_glossary_prompt(
+    terms: list[tuple[str, str]],
+) -> ChatCompletionSystemMessageParam:
+    lines = [entry_line(term, translation) for term, translation in terms]
+    return ChatCompletionSystemMessageParam(
+        role="system",
+        content="# GLOSSARY\nTranslate these terms as follows:\n" + "\n".join(lines),
+    )
+
+
+def get_repair_messages(
+    content: str, error: str, numbers: list[int]
+) -> list[ChatCompletionMessageParam]:
+    sentences = ", ".join(delimiter(number) for number in numbers)
+    return [
+        ChatCompletionAssistantMessageParam(role="assistant", content=content),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"Your translation was rejected: {error}\n"
+            f"Translate again only {sentences}, with exactly as many fragments "
+            "as in the input.",
+        ),
+    ]
+
+
+def sentence_lines(sentence: Sentence) -> Iterable[str]:
+    for block in sentence.blocks:
+        for multiline in block.text:
+            for line in multiline.lines:
+                if line.strip():
+                    yield line
+
+
+def sentence_prompt(sentence: Sentence) -> str:
+    return "\n".join(sentence_lines(sentence))
+
+
+def compact(batch: list[Sentence]) -> tuple[list[Sentence], list[int]]:
+    # sentences with the same text are sent once, references map each sentence
+    # of the batch to the distinct sentence translated in its place
+    index: dict[tuple[str, ...], int] = {}
+    distinct: list[Sentence] = []
+    references = []
+    for sentence in batch:
+        key = tuple(sentence_lines(sentence))
+        if key not in index:
+            index[key] = len(distinct)
+            distinct.append(sentence)
+        references.append(index[key])
+
+    return distinct, references
+
+
+@dataclass
+class PromptSavings:
+    sentences: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def record(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.sentences += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def __str__(self) -> str:
+        return (
+            f"{self.sentences} repeated sentences sent once, about "
+            f"{self.prompt_tokens} prompt and {self.completion_tokens} completion "
+            "tokens saved"
+        )
+
+
+@dataclass
+class RepairStats:
+    # rejected completions, and the requests and tokens they took with repairs
+    failed: int = 0
+    repaired: int = 0
+    requests: int = 0
+    tokens: int = 0
+
+    def record(self, repaired: bool, tokens: int, requests: int = 2) -> None:
+        self.failed += 1
+        self.repaired += repaired
+        self.requests += requests
+        self.tokens += tokens
+
+    def __str__(self) -> str:
+        failed = self.failed or 1
+        return (
+            f"{self.repaired} of {self.failed} rejected completions repaired, "
+            f"{self.requests / failed:.1f} requests and {self.tokens / failed:.0f} "
+            "tokens per rejected batch before bisection"
+        )
+
+
 @dataclass(frozen=True)
 class UserPrompt:
     batch: list[Sentence]
     batch_text: list[str]
+    references: list[int] | None = None
 
     def __len__(self) -> int:
         return len(self.batch_text)
@@ -43,17 +150,16 @@ class UserPrompt:
         )
 
     @classmethod
-    def create_prompt(cls, batch: list[Sentence]) -> "UserPrompt":
-        def lines(sentence: Sentence) -> Iterable[str]:
-            for block in sentence.blocks:
-                for multiline in block.text:
-                    for line in multiline.lines:
-                        if line.strip():
-                            yield line
+    def create_prompt(
+        cls, batch: list[Sentence], compacted: bool = False
+    ) -> "UserPrompt":
+        references = None
+        if compacted:
+            batch, references = compact(batch)
 
         def batch_lines() -> Iterable[str]:
             for i, sentence in enumerate(batch):
-                yield f"[sentence {i + 1}]"
-                yield from lines(sentence)
+                yield delimiter(i + 1)
+                yield from sentence_lines(sentence)
 
-        return cls(batch, [*batch_lines()])
+        return cls(batch, [*batch_lines()], references)
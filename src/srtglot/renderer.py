@@ -1,6 +1,6 @@
 from collections.abc import AsyncGenerator
 from aiofiles.threadpool.text import AsyncTextIOWrapper
-from .model import TranslatedSubtitle
+from .model import TranslatedSubtitle, format_timestamp
 
 
 async def render_srt(
@@ -10,7 +10,9 @@ async def render_srt(
     async for subtitle in input:
         await output.write(str(index := index + 1))
         await output.write("\n")
-        await output.write(f"{subtitle.start} --> {subtitle.end}")
+        await output.write(
+            f"{format_timestamp(subtitle.start)} --> {format_timestamp(subtitle.end)}"
+        )
         await output.write("\n")
         await output.write(subtitle.text)
         await output.write("\n\n")
@@ -1,51 +1,371 @@
-from typing import Callable, Iterable, List
-import tiktoken
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Protocol, TypeVar
+from .languages import Language
 from .model import Subtitle, Sentence
+from .budget import RequestBudget
+from .prompt import sentence_prompt
+from .tokens import (
+    Encoder,
+    TokenMemo,
+    Tokenizer,
+    batch_token_counter,
+    encoder,
+    text_token_counter,
+)
 
 
-def collect_sentences(subtitles: Iterable[Subtitle]) -> Iterable[Sentence]:
-    blocks = []
-    for sub in subtitles:
-        if sub.text[-1].lines[-1].strip().endswith("."):
-            blocks.append(sub)
-            yield Sentence(blocks)
-            blocks = []
-        else:
-            blocks.append(sub)
+_DEFAULT_TERMINATORS = ".?!\u2026"
+_CJK_TERMINATORS = "\u3002\uff1f\uff01\uff0e" + _DEFAULT_TERMINATORS
+_INDIC_TERMINATORS = "\u0964\u0965" + _DEFAULT_TERMINATORS
+TERMINATORS: dict[Language, str] = {
+    Language.ZH: _CJK_TERMINATORS,
+    Language.JA: _CJK_TERMINATORS,
+    Language.KO: _CJK_TERMINATORS,
+    Language.AR: ".\u061f!\u2026",
+    Language.FA: ".\u061f!\u2026",
+    Language.UR: "\u06d4\u061f" + _DEFAULT_TERMINATORS,
+    Language.HI: _INDIC_TERMINATORS,
+    Language.MR: _INDIC_TERMINATORS,
+    Language.NE: _INDIC_TERMINATORS,
+    Language.BN: _INDIC_TERMINATORS,
+    Language.PA: _INDIC_TERMINATORS,
+    Language.EL: ".;!\u2026",
+    Language.HY: "\u0589" + _DEFAULT_TERMINATORS,
+    Language.AM: "\u1362\u1367" + _DEFAULT_TERMINATORS,
+    Language.MY: "\u104b" + _DEFAULT_TERMINATORS,
+}
+# quotes and brackets closing a sentence don't hide its terminator: `"Fire."`
+_CLOSERS = "\"')]\u00bb\u201d\u2019\u300d\u300f\uff09"
+_TOKENIZE_CHUNK = 1024
+
+
+def terminators(language: Language | None) -> str:
+    if language is None:
+        # the Greek question mark is a semicolon everywhere else
+        return "".join(
+            dict.fromkeys(
+                _DEFAULT_TERMINATORS
+                + "".join(
+                    chars
+                    for other, chars in TERMINATORS.items()
+                    if other is not Language.EL
+                )
+            )
+        )
+
+    return TERMINATORS.get(language, _DEFAULT_TERMINATORS)
+
+
+class _Timed(Protocol):
+    @property
+    def start(self) -> int: ...
+
+    @property
+    def end(self) -> int: ...
+
+
+T = TypeVar("T", bound=_Timed)
+
+
+@dataclass(frozen=True)
+class Segmenter:
+    terminators: str = terminators(None)
+    closers: str = _CLOSERS
+    max_gap: int | None = 2000
+    max_blocks: int | None = 10
+    max_tokens: int | None = None
+    # counts a chunk of cue texts at once, tokenizing cue by cue is too slow
+    count_tokens: Encoder | None = None
+
+    @property
+    def key(self) -> str:
+        return repr(
+            (
+                self.terminators,
+                self.closers,
+                self.max_gap,
+                self.max_blocks,
+                self.max_tokens if self.count_tokens is not None else None,
+            )
+        )
+
+    def ends_sentence(self, text: str) -> bool:
+        last = text.rstrip().rstrip(self.closers)[-1:]
+        return bool(last) and last in self.terminators
 
-    if blocks:
+    def _counted(
+        self, items: Iterable[T], text: Callable[[T], str]
+    ) -> Iterator[tuple[T, str, int]]:
+        count_tokens = self.count_tokens if self.max_tokens else None
+        remaining = iter(items)
+        while chunk := list(islice(remaining, _TOKENIZE_CHUNK)):
+            texts = [text(item) for item in chunk]
+            counts = count_tokens(texts) if count_tokens else [0] * len(texts)
+            yield from zip(chunk, texts, counts)
+
+    def split(self, items: Iterable[T], text: Callable[[T], str]) -> Iterator[list[T]]:
+        max_tokens = self.max_tokens if self.count_tokens is not None else None
+        block: list[T] = []
+        tokens = 0
+        for item, item_text, item_tokens in self._counted(items, text):
+            if block and (
+                (self.max_gap is not None and item.start - block[-1].end > self.max_gap)
+                or (max_tokens and tokens + item_tokens > max_tokens)
+            ):
+                yield block
+                block, tokens = [], 0
+
+            block.append(item)
+            tokens += item_tokens
+            if self.ends_sentence(item_text) or (
+                self.max_blocks and len(block) >= self.max_blocks
+            ):
+                yield block
+                block, tokens = [], 0
+
+        if block:
+            yield block
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        language: Language | None = None,
+        max_gap: int | None = 2000,
+        max_blocks: int | None = 10,
+        max_tokens: int | None = None,
+        model: str | None = None,
+        tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+        memo: TokenMemo | None = None,
+    ) -> "Segmenter":
+        return cls(
+            terminators=terminators(language),
+            max_gap=max_gap,
+            max_blocks=max_blocks,
+            max_tokens=max_tokens,
+            count_tokens=(
+                text_token_counter(model, memo, tokenizer)
+                if max_tokens and model is not None
+                else None
+            ),
+        )
+
+
+DEFAULT_SEGMENTER = Segmenter()
+
+
+def _subtitle_text(sub: Subtitle) -> str:
+    return " ".join(line for line in sub.text_lines if line.strip())
+
+
+def collect_sentences(
+    subtitles: Iterable[Subtitle], segmenter: Segmenter = DEFAULT_SEGMENTER
+) -> Iterable[Sentence]:
+    for blocks in segmenter.split(subtitles, _subtitle_text):
         yield Sentence(blocks)
 
 
-def token_counter(model: str) -> Callable[[Sentence], int]:
-    encoding = tiktoken.encoding_for_model(model)
+def _percentile(sizes: Counter[int], percent: int) -> int:
+    rank = min(sizes.total() - 1, sizes.total() * percent // 100)
+    for size in sorted(sizes):
+        rank -= sizes[size]
+        if rank < 0:
+            return size
+
+    return 0
+
+
+def count_blocks(
+    sentences: Iterable[Sentence], sizes: Counter[int]
+) -> Iterator[Sentence]:
+    # counts the cues per sentence as they are consumed, for SentenceStats
+    for sentence in sentences:
+        sizes[len(sentence.blocks)] += 1
+        yield sentence
+
+
+@dataclass(frozen=True)
+class SentenceStats:
+    count: int
+    mean_blocks: float
+    median_blocks: int
+    p95_blocks: int
+    max_blocks: int
+    max_tokens: int | None = None
+
+    def __str__(self) -> str:
+        stats = (
+            f"{self.count} sentences, cues per sentence: mean {self.mean_blocks:.1f}, "
+            f"median {self.median_blocks}, p95 {self.p95_blocks}, max {self.max_blocks}"
+        )
+        if self.max_tokens is not None:
+            stats += f", largest sentence {self.max_tokens} tokens"
+
+        return stats
+
+    @classmethod
+    def create(
+        cls, sentences: Iterable[Sentence], tokens: list[int] | None = None
+    ) -> "SentenceStats":
+        sizes = Counter(len(sentence.blocks) for sentence in sentences)
+        return cls.from_sizes(
+            sizes, max(tokens, default=0) if tokens is not None else None
+        )
+
+    @classmethod
+    def from_sizes(
+        cls, sizes: Counter[int], max_tokens: int | None = None
+    ) -> "SentenceStats":
+        count = sizes.total()
+        return cls(
+            count=count,
+            mean_blocks=sum(size * n for size, n in sizes.items()) / count
+            if count
+            else 0.0,
+            median_blocks=_percentile(sizes, 50),
+            p95_blocks=_percentile(sizes, 95),
+            max_blocks=max(sizes, default=0),
+            max_tokens=max_tokens,
+        )
+
+
+def token_counter(
+    model: str, tokenizer: Tokenizer = Tokenizer.TIKTOKEN
+) -> Callable[[Sentence], int]:
+    encode = encoder(model, tokenizer)
 
     def count_tokens(sentence: Sentence) -> int:
-        return len(encoding.encode(str(sentence)))
+        return encode([str(sentence)])[0]
 
     return count_tokens
 
 
+_PACKING_WINDOW = 1024
+# a batch size tuned during the run applies sooner with smaller windows
+_TUNED_PACKING_WINDOW = 64
+
 Batcher = Callable[[Iterable[Sentence]], Iterable[List[Sentence]]]
 
 
-def sentences_batcher(model: str, max_tokens: int) -> Batcher:
-    counter = token_counter(model)
+def _greedy_sizes(tokens: list[int], max_tokens: int) -> list[int]:
+    sizes: list[int] = []
+    size = count = 0
+    for count_tokens in tokens:
+        if size and count + count_tokens > max_tokens:
+            sizes.append(size)
+            size = count = 0
+
+        size += 1
+        count += count_tokens
+
+    if size:
+        sizes.append(size)
+
+    return sizes
+
 
+def _packed_sizes(
+    tokens: list[int], max_tokens: int, weights: list[int] | None = None
+) -> list[int]:
+    # shortest path over prefix sums: fewest batches first, then the smallest sum
+    # of squared batch weights, which spreads the weight evenly across batches.
+    # Weights default to the tokens themselves.
+    weights = tokens if weights is None else weights
+    best: list[tuple[int, int]] = [(0, 0)]
+    previous: list[int] = [0]
+    for end in range(1, len(tokens) + 1):
+        best.append((end + 1, 0))
+        previous.append(end - 1)
+        load = weight = 0
+        for start in range(end - 1, -1, -1):
+            load += tokens[start]
+            weight += weights[start]
+            # a sentence larger than max_tokens gets a batch of its own
+            if load > max_tokens and start < end - 1:
+                break
+
+            batches, cost = best[start]
+            candidate = (batches + 1, cost + weight * weight)
+            if candidate < best[end]:
+                best[end] = candidate
+                previous[end] = start
+
+    sizes = []
+    end = len(tokens)
+    while end:
+        sizes.append(end - previous[end])
+        end = previous[end]
+
+    return sizes[::-1]
+
+
+def batch_counted_sentences(
+    sentences: Iterable[tuple[Sentence, int]],
+    max_tokens: int | Callable[[], int],
+    window: int = _PACKING_WINDOW,
+    weight: Callable[[int], int] | None = None,
+) -> Iterable[List[Sentence]]:
+    remaining = iter(sentences)
+    pending: list[tuple[Sentence, int]] = []
+    chunk = list(islice(remaining, window))
+    while chunk:
+        pending += chunk
+        chunk = list(islice(remaining, window))
+        tokens = [count for _, count in pending]
+        cap = max_tokens() if callable(max_tokens) else max_tokens
+        # greedy packing starts its last batch as late as possible, carrying it to
+        # the next window keeps the total as low as packing the whole input at once
+        packed = sum(_greedy_sizes(tokens, cap)[:-1]) if chunk else len(tokens)
+        start = 0
+        weights = [weight(count) for count in tokens[:packed]] if weight else None
+        for size in _packed_sizes(tokens[:packed], cap, weights):
+            yield [sentence for sentence, _ in pending[start : start + size]]
+            start += size
+
+        pending = pending[packed:]
+
+
+def sentences_batcher(
+    model: str,
+    max_tokens: int,
+    memo: TokenMemo | None = None,
+    tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+    weight: Callable[[int], int] | None = None,
+    budget: RequestBudget | None = None,
+    target: Callable[[], int] | None = None,
+) -> Batcher:
     def batch_sentences(sentences: Iterable[Sentence]) -> Iterable[List[Sentence]]:
-        batch: list[Sentence] = []
-        count = 0
-        for sentence in sentences:
-            tokens = counter(sentence)
-            if count + tokens > max_tokens:
-                yield batch
-                batch = [sentence]
-                count = tokens
-            else:
-                batch.append(sentence)
-                count += tokens
-
-        if batch:
-            yield batch
+        if budget is None:
+            count_tokens = batch_token_counter(model, memo, tokenizer)
+        else:
+            # the request budget counts sentences the way the user prompt renders
+            # them, along with their delimiter and predicted completion
+            count_prompt_tokens = batch_token_counter(
+                model, memo, tokenizer, sentence_prompt
+            )
+
+            def count_tokens(chunk: list[Sentence]) -> list[int]:
+                return [
+                    budget.sentence_tokens(tokens, budget.glossary_tokens(sentence))
+                    for sentence, tokens in zip(chunk, count_prompt_tokens(chunk))
+                ]
+
+        def counted_sentences() -> Iterator[tuple[Sentence, int]]:
+            remaining = iter(sentences)
+            while chunk := list(islice(remaining, _TOKENIZE_CHUNK)):
+                yield from zip(chunk, count_tokens(chunk))
+
+        if target is not None:
+            return batch_counted_sentences(
+                counted_sentences(), target, _TUNED_PACKING_WINDOW, weight
+            )
+
+        return batch_counted_sentences(
+            counted_sentences(),
+            max_tokens if budget is None else budget.max_batch_tokens,
+            weight=weight,
+        )
 
     return batch_sentences
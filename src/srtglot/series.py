@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .formats import get_reader
+from .incremental import Fingerprint, fingerprint, retime
+from .model import Sentence, TranslatedSubtitle
+from .sentence import DEFAULT_SEGMENTER, Batcher, Segmenter, collect_sentences
+
+
+_EXTENSIONS = (".srt", ".vtt", ".ass", ".ssa")
+
+
+def list_episodes(input_dir: Path) -> list[Path]:
+    return sorted(
+        path
+        for path in input_dir.iterdir()
+        if path.is_file() and path.suffix.lower() in _EXTENSIONS
+    )
+
+
+def output_paths(output_dir: Path, episodes: list[Path]) -> list[Path]:
+    # every episode is written as SRT, e01.srt and e01.vtt would overwrite each
+    # other, also on case-insensitive file systems
+    paths = [output_dir / f"{episode.stem}.srt" for episode in episodes]
+    seen: dict[str, Path] = {}
+    for episode, path in zip(episodes, paths):
+        if (other := seen.setdefault(path.name.casefold(), episode)) != episode:
+            raise ValueError(
+                f"{other.name} and {episode.name} would both be translated to "
+                f"{path.name}"
+            )
+
+    return paths
+
+
+@dataclass(frozen=True)
+class Series:
+    episodes: list[list[Sentence]]
+    distinct: list[Sentence]
+    occurrences: list[list[int]]
+
+    @property
+    def sentences_count(self) -> int:
+        return sum(len(episode) for episode in self.episodes)
+
+    @property
+    def deduplication_ratio(self) -> float:
+        if not self.sentences_count:
+            return 0.0
+
+        return 1 - len(self.distinct) / self.sentences_count
+
+    def render(
+        self, translated: list[list[TranslatedSubtitle]]
+    ) -> list[list[TranslatedSubtitle]]:
+        return [
+            [
+                subtitle
+                for sentence, i in zip(episode, occurrences)
+                for subtitle in retime(sentence, translated[i])
+            ]
+            for episode, occurrences in zip(self.episodes, self.occurrences)
+        ]
+
+    @classmethod
+    def create(cls, episodes: Iterable[Iterable[Sentence]]) -> "Series":
+        index: dict[Fingerprint, int] = {}
+        distinct: list[Sentence] = []
+        all_episodes = []
+        all_occurrences = []
+        for episode in episodes:
+            sentences = list(episode)
+            occurrences = []
+            for sentence in sentences:
+                fp = fingerprint(sentence)
+                if fp not in index:
+                    index[fp] = len(distinct)
+                    distinct.append(sentence)
+                occurrences.append(index[fp])
+
+            all_episodes.append(sentences)
+            all_occurrences.append(occurrences)
+
+        return cls(
+            episodes=all_episodes, distinct=distinct, occurrences=all_occurrences
+        )
+
+    @classmethod
+    def read(
+        cls, inputs: list[Path], segmenter: Segmenter = DEFAULT_SEGMENTER
+    ) -> "Series":
+        return cls.create(
+            collect_sentences(get_reader(input).parse(input), segmenter)
+            for input in inputs
+        )
+
+
+@dataclass(frozen=True)
+class SeriesStats:
+    episodes: int
+    sentences: int
+    distinct: int
+    deduplication_ratio: float
+    # requests of the distinct sentences, of every sentence, and of every
+    # episode translated on its own
+    requests: int
+    all_requests: int
+    episode_requests: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.distinct} distinct of {self.sentences} sentences across "
+            f"{self.episodes} episodes ({self.deduplication_ratio:.1%} "
+            f"deduplicated), {self.requests} requests instead of "
+            f"{self.all_requests} ({self.all_requests - self.requests} saved), "
+            f"{self.episode_requests} one episode at a time"
+        )
+
+    @classmethod
+    def create(cls, series: Series, batcher: Batcher) -> "SeriesStats":
+        def requests(sentences: Iterable[Sentence]) -> int:
+            return sum(1 for _ in batcher(sentences))
+
+        return cls(
+            episodes=len(series.episodes),
+            sentences=series.sentences_count,
+            distinct=len(series.distinct),
+            deduplication_ratio=series.deduplication_ratio,
+            requests=requests(series.distinct),
+            all_requests=requests(s for episode in series.episodes for s in episode),
+            # every episode translated on its own ends with an under-filled batch
+            episode_requests=sum(map(requests, series.episodes)),
+        )
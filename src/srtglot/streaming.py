@@ -0,0 +1,71 @@
+import re
+from dataclasses import dataclass, field
+
+
+_DELIMITER = re.compile(r"\[sentence (\d+)\]")
+
+
+@dataclass
+class CompletionStream:
+    # the sentence being received, by position in the prompt, and its fragments
+    number: int | None = None
+    lines: list[str] = field(default_factory=list)
+    pending: str = ""
+
+    def _line(self, line: str) -> list[tuple[int, list[str]]]:
+        line = line.strip()
+        if not line:
+            return []
+
+        if match := _DELIMITER.fullmatch(line):
+            completed = self._close()
+            self.number = int(match.group(1)) - 1
+            return completed
+
+        if self.number is not None:
+            self.lines.append(line)
+        return []
+
+    def _close(self) -> list[tuple[int, list[str]]]:
+        if self.number is None:
+            return []
+
+        completed = [(self.number, self.lines)]
+        self.number = None
+        self.lines = []
+        return completed
+
+    def feed(self, text: str) -> list[tuple[int, list[str]]]:
+        # a sentence is complete once the delimiter of the next one is received
+        *lines, self.pending = (self.pending + text).split("\n")
+        return [sentence for line in lines for sentence in self._line(line)]
+
+    def close(self) -> list[tuple[int, list[str]]]:
+        completed = self._line(self.pending)
+        self.pending = ""
+        return completed + self._close()
+
+
+@dataclass
+class StreamStats:
+    completions: int = 0
+    first_sentence_seconds: float = 0.0
+    completion_seconds: float = 0.0
+    # sentences kept from streams that broke or ended invalid
+    kept: int = 0
+
+    def record(self, first_sentence: float | None, completion: float) -> None:
+        self.completions += 1
+        self.first_sentence_seconds += (
+            first_sentence if first_sentence is not None else completion
+        )
+        self.completion_seconds += completion
+
+    def __str__(self) -> str:
+        completions = self.completions or 1
+        return (
+            f"{self.completions} completions streamed, first sentence after "
+            f"{self.first_sentence_seconds / completions:.2f}s and full completion "
+            f"after {self.completion_seconds / completions:.2f}s on average, "
+            f"{self.kept} sentences kept from failed completions"
+        )
@@ -0,0 +1,50 @@
+from enum import Enum
+
+from openai.types.shared_params import ResponseFormatJSONSchema
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class CompletionFormat(Enum):
+    TEXT = "text"
+    JSON = "json"
+
+
+class TranslatedSentence(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    number: int
+    fragments: list[str]
+
+
+class Translation(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    sentences: list[TranslatedSentence]
+
+
+def response_format() -> ResponseFormatJSONSchema:
+    return ResponseFormatJSONSchema(
+        type="json_schema",
+        json_schema={
+            "name": "translation",
+            "strict": True,
+            "schema": Translation.model_json_schema(),
+        },
+    )
+
+
+def read_translation(content: str) -> dict[int, list[str]] | None:
+    # fragments by sentence position, None when the content breaks the schema
+    try:
+        translation = Translation.model_validate_json(content)
+    except ValidationError:
+        return None
+
+    return {
+        sentence.number - 1: [
+            fragment.strip().replace("\n", " ")
+            for fragment in sentence.fragments
+            if fragment.strip()
+        ]
+        for sentence in translation.sentences
+    }
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import Generic, Iterable, TypeVar
+
+import numpy as np
+
+from .model import Subtitle, TranslatedSubtitle
+
+
+T = TypeVar("T", Subtitle, TranslatedSubtitle)
+
+
+def _round(times: np.ndarray) -> np.ndarray:
+    return np.rint(times).astype(np.int64)
+
+
+def _retime(cue: T, start: int, end: int) -> T:
+    if isinstance(cue, Subtitle):
+        return Subtitle(start=start, end=end, text=cue.text, markup=cue.markup)
+
+    return TranslatedSubtitle(start=start, end=end, text=cue.text)
+
+
+@dataclass(frozen=True)
+class SubtitleTable(Generic[T]):
+    start: np.ndarray
+    end: np.ndarray
+    cues: list[T]
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def _with_times(self, start: np.ndarray, end: np.ndarray) -> "SubtitleTable[T]":
+        return SubtitleTable(start=start, end=end, cues=self.cues)
+
+    def shift(self, offset: int) -> "SubtitleTable[T]":
+        return self._with_times(self.start + offset, self.end + offset)
+
+    def scale(self, factor: float, origin: int = 0) -> "SubtitleTable[T]":
+        return self._with_times(
+            _round((self.start - origin) * factor + origin),
+            _round((self.end - origin) * factor + origin),
+        )
+
+    def convert_frame_rate(
+        self, source_fps: float, target_fps: float
+    ) -> "SubtitleTable[T]":
+        return self.scale(source_fps / target_fps)
+
+    def stretch(
+        self, source: tuple[int, int], target: tuple[int, int]
+    ) -> "SubtitleTable[T]":
+        if source[0] == source[1]:
+            raise ValueError(f"Source anchors must differ, got {source}")
+
+        factor = (target[1] - target[0]) / (source[1] - source[0])
+        return self.scale(factor, origin=source[0]).shift(target[0] - source[0])
+
+    def clamp(self, minimum: int = 0, maximum: int | None = None) -> "SubtitleTable[T]":
+        return self._with_times(
+            np.clip(self.start, minimum, maximum),
+            np.clip(self.end, minimum, maximum),
+        )
+
+    def fix_overlaps(self, gap: int = 0) -> "SubtitleTable[T]":
+        end = self.end.copy()
+        end[:-1] = np.minimum(end[:-1], self.start[1:] - gap)
+        return self._with_times(self.start, np.maximum(end, self.start))
+
+    def to_cues(self) -> list[T]:
+        return [
+            _retime(cue, start, end)
+            for cue, start, end in zip(
+                self.cues, self.start.tolist(), self.end.tolist()
+            )
+        ]
+
+    @classmethod
+    def create(cls, cues: Iterable[T]) -> "SubtitleTable[T]":
+        cues = list(cues)
+        return cls(
+            start=np.fromiter((cue.start for cue in cues), np.int64, len(cues)),
+            end=np.fromiter((cue.end for cue in cues), np.int64, len(cues)),
+            cues=cues,
+        )
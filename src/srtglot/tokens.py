@@ -0,0 +1,161 @@
+import hashlib
+import marshal
+import os
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable
+
+from .model import Sentence
+
+
+_THREADS = os.cpu_count() or 1
+
+Encoder = Callable[[list[str]], list[int]]
+BatchTokenCounter = Callable[[list[Sentence]], list[int]]
+
+
+class Tokenizer(Enum):
+    TIKTOKEN = "tiktoken"
+    HEURISTIC = "heuristic"
+
+
+_WORD_CLASSES = re.compile(
+    r"(?P<cjk>[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+)"
+    r"|(?P<latin>[A-Za-z\u00c0-\u024f]+(?:'[A-Za-z]+)*)"
+    r"|(?P<digits>\d+)"
+    r"|(?P<letters>[^\W\d_]+)"
+    r"|(?P<symbols>[^\w\s]+)"
+)
+# rough characters per token of each word class for BPE vocabularies, run
+# benchmarks/tokenizer.py to measure the error against tiktoken
+_CHARS_PER_TOKEN = {
+    "cjk": 1.25,
+    "latin": 6,
+    "digits": 3,
+    "letters": 3,
+    "symbols": 3,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    tokens = 0.0
+    for match in _WORD_CLASSES.finditer(text):
+        word, word_class = match.group(), match.lastgroup
+        # every alternative is a named group, one of them matched
+        assert word_class is not None
+        if word_class == "latin":
+            # every latin word is at least one token, contractions add one
+            tokens += 1 + (len(word) - 1) // _CHARS_PER_TOKEN["latin"]
+            tokens += word.count("'")
+        else:
+            tokens += max(1.0, len(word) / _CHARS_PER_TOKEN[word_class])
+
+    return round(tokens)
+
+
+def encoder(model: str, tokenizer: Tokenizer = Tokenizer.TIKTOKEN) -> Encoder:
+    if tokenizer is Tokenizer.HEURISTIC:
+        return lambda texts: [estimate_tokens(text) for text in texts]
+
+    # imported and loaded on first use, the vocabulary takes seconds to load and
+    # is downloaded unless TIKTOKEN_CACHE_DIR holds a snapshot of it
+    encoding = None
+
+    def encode(texts: list[str]) -> list[int]:
+        nonlocal encoding
+        if encoding is None:
+            import tiktoken
+
+            encoding = tiktoken.encoding_for_model(model)
+
+        # tiktoken releases the GIL while encoding, each thread takes a slice
+        return [
+            len(tokens) for tokens in encoding.encode_batch(texts, num_threads=_THREADS)
+        ]
+
+    return encode
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class TokenMemo:
+    counts: dict[bytes, int] = field(default_factory=dict)
+    path: Path | None = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def update(self, counts: dict[bytes, int]) -> None:
+        self.counts.update(counts)
+        if self.path is not None and counts:
+            # append-only: each update is one marshalled record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as stream:
+                marshal.dump(counts, stream)
+
+    @classmethod
+    def load(cls, path: Path) -> "TokenMemo":
+        counts: dict[bytes, int] = {}
+        with open(path, "rb") as stream:
+            while True:
+                try:
+                    counts.update(marshal.load(stream))
+                except (EOFError, ValueError, TypeError):
+                    # end of file, or a record truncated by an interrupted run
+                    break
+
+        return cls(counts=counts, path=path)
+
+    @classmethod
+    def create(
+        cls,
+        cache_dir: Path | None,
+        model: str,
+        tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+    ) -> "TokenMemo":
+        if cache_dir is None:
+            return cls()
+
+        name = f"{model.replace(os.sep, '_')}.{tokenizer.value}.memo"
+        path = cache_dir / "tokens" / name
+        return cls.load(path) if path.exists() else cls(path=path)
+
+
+def text_token_counter(
+    model: str,
+    memo: TokenMemo | None = None,
+    tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+) -> Encoder:
+    encode = encoder(model, tokenizer)
+    memo = memo if memo is not None else TokenMemo()
+
+    def count_tokens(texts: list[str]) -> list[int]:
+        keys = [_digest(text) for text in texts]
+        missing = {
+            key: text for key, text in zip(keys, texts) if key not in memo.counts
+        }
+        if missing:
+            memo.update(dict(zip(missing, encode(list(missing.values())))))
+
+        return [memo.counts[key] for key in keys]
+
+    return count_tokens
+
+
+def batch_token_counter(
+    model: str,
+    memo: TokenMemo | None = None,
+    tokenizer: Tokenizer = Tokenizer.TIKTOKEN,
+    render: Callable[[Sentence], str] = str,
+) -> BatchTokenCounter:
+    count_texts = text_token_counter(model, memo, tokenizer)
+
+    def count_tokens(sentences: list[Sentence]) -> list[int]:
+        return count_texts([render(sentence) for sentence in sentences])
+
+    return count_tokens
@@ -4,11 +4,16 @@ from collections.abc import Callable, Coroutine
 
 from .model import Sentence, TranslatedSubtitle
 from .context import Context, TranslatorError
-from .adaptive import adaptive_map
+from .adaptive import Bisection, adaptive_map
+
+
+# receives each sentence with its translation once it is final
+SentenceListener = Callable[[Sentence, list[TranslatedSubtitle]], None]
 
 
 def translator(
     context: Context,
+    on_sentence: SentenceListener | None = None,
 ) -> Callable[[list[Sentence]], Coroutine[Any, Any, list[list[TranslatedSubtitle]]]]:
     async def translate(sentences: list[Sentence]) -> list[list[TranslatedSubtitle]]:
         from .batch import batch_mapper, batch_fallback_mapper
@@ -17,6 +22,7 @@ def translator(
             return await batch_mapper(
                 context=context,
                 batch=batch,
+                on_sentence=on_sentence,
             )
         
         async def fallback_mapper(sentence: Sentence, exception: TranslatorError) -> list[TranslatedSubtitle]:
@@ -24,13 +30,21 @@ def translator(
                 context=context,
                 sentence=sentence,
                 exception=exception,
+                on_sentence=on_sentence,
             )
 
+        def on_complete(bisection: Bisection) -> None:
+            context.bisections.record(bisection)
+            if context.batch_size is not None:
+                context.batch_size.record(bisection.depth)
+
         return await adaptive_map(
             sentences,
             mapper,
             fallback_mapper,
             TranslatorError,
+            on_complete,
+            lambda e: e.salvaged,
         )
 
     return translate
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from logging import getLogger
+
+
+logger = getLogger(__name__)
+
+# a batch that needed deeper bisections still only divides the size by 4
+_MAX_BACKOFF = 2
+
+
+@dataclass
+class BatchSizeController:
+    target: int
+    min_tokens: int
+    max_tokens: int
+    increment: int
+
+    def __call__(self) -> int:
+        return self.target
+
+    def record(self, depth: int) -> None:
+        # additive increase after a batch translated at once, multiplicative
+        # decrease after one that had to be bisected
+        previous = self.target
+        if depth == 0:
+            self.target = min(self.max_tokens, self.target + self.increment)
+        else:
+            self.target = max(self.min_tokens, self.target >> min(depth, _MAX_BACKOFF))
+
+        if self.target != previous:
+            logger.info(
+                "Batch size %s -> %s tokens after a batch bisected %s times",
+                previous,
+                self.target,
+                depth,
+            )
+
+    @classmethod
+    def create(
+        cls, *, initial: int, min_tokens: int, max_tokens: int
+    ) -> "BatchSizeController":
+        if not 0 < min_tokens <= max_tokens:
+            raise ValueError(
+                f"Invalid batch size bounds: {min_tokens} to {max_tokens} tokens"
+            )
+
+        return cls(
+            target=min(max(initial, min_tokens), max_tokens),
+            min_tokens=min_tokens,
+            max_tokens=max_tokens,
+            increment=max(1, initial // 10),
+        )
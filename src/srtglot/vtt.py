@@ -0,0 +1,76 @@
+import re
+from itertools import chain
+from pathlib import Path
+from typing import Generator, Iterable
+
+from .model import Subtitle
+from .parser import Cue, detect_encoding
+
+
+_TIMESTAMP_SEPARATOR = "-->"
+_TIMESTAMP = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})")
+_SKIPPED_BLOCKS = ("NOTE", "STYLE", "REGION", "WEBVTT")
+# i, b and u have SRT equivalents; voice, class, language, ruby and timestamp
+# tags have none and are dropped while keeping their text.
+_UNSUPPORTED_TAG = re.compile(r"</?(?:v|c|lang|ruby|rt)(?:[\s.][^>]*)?>|<[\d:.]+>")
+_CLASSES = re.compile(r"<([ibu])[\s.][^>]*>")
+
+
+def _to_markup(text: str) -> str:
+    return _CLASSES.sub(r"<\1>", _UNSUPPORTED_TAG.sub("", text))
+
+
+def parse_timestamp(value: str) -> int:
+    match = _TIMESTAMP.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid timestamp: {value}")
+
+    hours, minutes, seconds, millis = (int(part or 0) for part in match.groups())
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+
+def _to_cue(block: list[str]) -> Cue | None:
+    if block[0].split(maxsplit=1)[0] in _SKIPPED_BLOCKS:
+        return None
+
+    if _TIMESTAMP_SEPARATOR not in block[0]:
+        block = block[1:]
+
+    if len(block) < 2 or _TIMESTAMP_SEPARATOR not in block[0]:
+        return None
+
+    start, end = block[0].split(_TIMESTAMP_SEPARATOR, 1)
+    try:
+        return Cue(
+            number=None,
+            start=parse_timestamp(start),
+            end=parse_timestamp((end.split() or [""])[0]),
+            text=_to_markup("\n".join(block[1:])),
+        )
+    except ValueError:
+        return None
+
+
+def read_cues(lines: Iterable[str]) -> Generator[Cue, None, None]:
+    block: list[str] = []
+    for line in chain(lines, [""]):
+        line = line.rstrip()
+        if line:
+            block.append(line)
+            continue
+
+        if block and (cue := _to_cue(block)) is not None:
+            yield cue
+
+        block = []
+
+
+def count_subtitles(input: Path) -> int:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        return sum(1 for _ in read_cues(stream))
+
+
+def parse(input: Path) -> Generator[Subtitle, None, None]:
+    with open(input, "r", encoding=detect_encoding(input)) as stream:
+        for cue in read_cues(stream):
+            yield Subtitle.create(start=cue.start, end=cue.end, text=cue.text)
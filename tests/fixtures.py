@@ -1,7 +1,54 @@
 from pathlib import Path
+from typing import Iterator
+from unittest.mock import AsyncMock, patch
+from openai.types import CompletionUsage
 import pytest
+from srtglot.config import Config
+from srtglot.context import Context
+from srtglot.languages import Language
+from srtglot.tokens import Tokenizer
 
 
 @pytest.fixture
 def srt_file() -> Path:
     return Path(__file__).parent / "hod.srt"
+
+
+def write_srt(path: Path, cues: list[tuple[int, str]]) -> Path:
+    path.write_text(
+        "".join(
+            f"{i + 1}\n00:00:{start:02d},000 --> 00:00:{start + 1:02d},000\n{text}\n\n"
+            for i, (start, text) in enumerate(cues)
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def client() -> Iterator[AsyncMock]:
+    with patch("srtglot.context._create_openai_client") as create_client:
+        create_client.return_value = AsyncMock(name="client")
+        yield create_client.return_value
+
+
+def completion(content: str, usage: CompletionUsage | None = None) -> AsyncMock:
+    choice = AsyncMock(name="choice")
+    choice.message.content = content
+    completion = AsyncMock(name="completion")
+    completion.choices = [choice]
+    completion.usage = usage
+    return completion
+
+
+def translation_context(**options) -> Context:
+    return Context.create(
+        config=Config(
+            model="gpt-4o",
+            target_language=Language.FR,
+            api_key="sk-xxx",
+            input=Path("input.srt"),
+            output=Path("output.srt"),
+            tokenizer=Tokenizer.HEURISTIC,
+            **options,
+        )
+    )
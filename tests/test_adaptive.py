@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from srtglot.adaptive import adaptive_map
+from srtglot.adaptive import Bisection, BisectionStats, adaptive_map
 from unittest.mock import AsyncMock
 
 
@@ -23,15 +24,107 @@ async def test_adaptive_map():
         120,
     ]
 
-    assert mapper.call_count == 6
+    assert mapper.call_count == 7
     assert mapper.call_args_list[0] == (([1, 2, 3, 0, 4, 5, 6],),)
     assert mapper.call_args_list[1] == (([1, 2, 3],),)
     assert mapper.call_args_list[2] == (([0, 4, 5, 6],),)
     assert mapper.call_args_list[3] == (([0, 4],),)
-    assert mapper.call_args_list[4] == (([0],),)
+    assert mapper.call_args_list[4] == (([5, 6],),)
+    assert mapper.call_args_list[5] == (([0],),)
+    assert mapper.call_args_list[6] == (([4],),)
     assert fallback.call_count == 1
     assert fallback.call_args[0][0] == 0
     assert (
         fallback.call_args[0][1].__repr__() == "ZeroDivisionError('division by zero')"
     )
-    assert mapper.call_args_list[5] == (([4, 5, 6],),)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_map_should_report_bisection():
+    mapper = AsyncMock()
+    mapper.side_effect = lambda x: [int(720 / x) for x in x]
+
+    fallback = AsyncMock()
+    fallback.side_effect = lambda x, e: 0
+
+    stats = BisectionStats()
+    bisections = []
+
+    def on_complete(bisection: Bisection) -> None:
+        bisections.append(bisection)
+        stats.record(bisection)
+
+    await adaptive_map(
+        [1, 2, 3, 0, 4, 5, 6], mapper, fallback, ZeroDivisionError, on_complete
+    )
+    await adaptive_map([1, 2], mapper, fallback, ZeroDivisionError, on_complete)
+
+    assert bisections == [
+        Bisection(depth=3, calls=7, failed_calls=4, failed_items=14),
+        Bisection(depth=0, calls=1, failed_calls=0),
+    ]
+    assert str(stats) == (
+        "1 of 2 batches bisected, max depth 3, 4 of 8 calls failed, "
+        "0 of their 14 sentences salvaged (0.0%)"
+    )
+
+
+@pytest.mark.asyncio
+async def test_adaptive_map_should_map_halves_concurrently():
+    in_flight = 0
+    peak = 0
+
+    async def mapper(batch: list[int]) -> list[int]:
+        nonlocal in_flight, peak
+        if len(batch) > 1:
+            raise ValueError(batch)
+
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return batch
+
+    assert await adaptive_map([1, 2, 3, 4], mapper, AsyncMock(), ValueError) == [
+        1,
+        2,
+        3,
+        4,
+    ]
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_map_should_retry_only_what_salvage_did_not_keep():
+    class Rejected(Exception):
+        def __init__(self, kept: dict[int, int]):
+            self.kept = kept
+
+    async def mapper(batch: list[int]) -> list[int]:
+        if 0 in batch:
+            raise Rejected({i: 720 // x for i, x in enumerate(batch) if x and x % 2})
+        return [720 // x for x in batch]
+
+    calls = []
+
+    async def recorded(batch: list[int]) -> list[int]:
+        calls.append(batch)
+        return await mapper(batch)
+
+    fallback = AsyncMock()
+    fallback.side_effect = lambda x, e: 0
+
+    bisections = []
+    assert await adaptive_map(
+        [1, 2, 3, 0, 4, 5, 6],
+        recorded,
+        fallback,
+        Rejected,
+        bisections.append,
+        lambda e: e.kept,
+    ) == [720, 360, 240, 0, 180, 144, 120]
+
+    assert calls == [[1, 2, 3, 0, 4, 5, 6], [2, 0, 4, 6], [2, 0], [4, 6], [2], [0]]
+    assert bisections == [
+        Bisection(depth=3, calls=6, failed_calls=4, failed_items=14, salvaged=3)
+    ]
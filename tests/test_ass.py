@@ -0,0 +1,38 @@
+from pathlib import Path
+from srtglot import ass
+from srtglot.formats import get_reader
+
+
+def test_parse_timestamp():
+    assert ass.parse_timestamp("0:00:01.50") == 1500
+    assert ass.parse_timestamp("1:02:03.04") == 3723040
+
+
+def test_parse(tmp_path: Path):
+    input = tmp_path / "input.ass"
+    input.write_text(
+        "[Script Info]\n"
+        "Title: Episode 1\n\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize\n"
+        "Style: Default,Arial,20\n\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        "Comment: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,Ignored\n"
+        "Dialogue: 0,0:00:01.00,0:00:02.50,Default,,0,0,0,,"
+        "{\\pos(10,20)\\i1}As the{\\i0} first century,\\Nof the {\\b1\\bord2}dynasty\n"
+        "Dialogue: 0,0:00:02.50,0:00:03.00,Default,,0,0,0,,{\\p1}m 0 0 l 100 0\n"
+        "Dialogue: 0,0:00:03.00,0:00:04.00,Default,,0,0,0,,Tom & Jerry.\n"
+    )
+
+    subtitles = [*ass.parse(input)]
+    assert [(sub.start, sub.end) for sub in subtitles] == [(1000, 2500), (3000, 4000)]
+    assert subtitles[0].text_lines == [
+        "As the",
+        "first century,",
+        "of the",
+        "dynasty",
+    ]
+    assert subtitles[0].translate(["A", "B", "C", "D"]).text == "<i>A</i>B\nC<b>D</b>"
+    assert subtitles[1].translate(["Tom & Jerry."]).text == "Tom &amp; Jerry."
+    assert get_reader(input).count_subtitles(input) == 2
@@ -0,0 +1,73 @@
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+from srtglot.budget import RequestBudget
+from srtglot.glossary import Glossary
+from srtglot.model import Sentence, Subtitle
+from srtglot.sentence import sentences_batcher
+
+
+def encode(texts: list[str]) -> list[int]:
+    return [len(text.split()) for text in texts]
+
+
+def budget(max_request_tokens: int) -> RequestBudget:
+    return RequestBudget.create(
+        max_request_tokens=max_request_tokens,
+        system_prompt="Translate these sentences.",
+        encode=encode,
+        predict_output_tokens=lambda tokens: tokens * 2,
+    )
+
+
+def sentence(text: str) -> Sentence:
+    return Sentence([Subtitle.create(start=0, end=1000, text=text)])
+
+
+def test_should_count_system_prompt_delimiters_and_completion():
+    request_budget = budget(100)
+
+    assert request_budget.fixed_tokens == 3 + 9
+    assert request_budget.delimiter_tokens == 2
+    assert request_budget.max_batch_tokens == 88
+    assert request_budget.request_tokens([4, 1]) == 12 + (4 + 2 + 8) + (1 + 2 + 2)
+
+
+def test_should_reject_budget_smaller_than_system_prompt():
+    with pytest.raises(ValueError):
+        budget(12)
+
+
+def test_should_batch_rendered_sentences_within_request_budget():
+    sentences = [sentence("One two\nthree."), sentence("Four."), sentence("Five.")]
+    with patch("srtglot.sentence.batch_token_counter") as batch_token_counter:
+        batch_token_counter.side_effect = lambda *args: (
+            lambda chunk: encode([args[-1](s) for s in chunk])
+        )
+        batches = [
+            *sentences_batcher("gpt-4o", 1000, budget=budget(12 + 20))(sentences)
+        ]
+
+    assert batch_token_counter.call_args.args[-1](sentences[0]) == "One two\nthree."
+    # 3 + 2 + 6 tokens, then 1 + 2 + 2 tokens for each short sentence
+    assert batches == [sentences[:1], sentences[1:]]
+
+
+def test_should_count_glossary_terms_of_each_sentence(tmp_path: Path):
+    (tmp_path / "show.tsv").write_text("Winterfell\tWinterfell\nLord Snow\tSire Snow\n")
+    glossary = Glossary.create([tmp_path / "show.tsv"], encode)
+    request_budget = RequestBudget.create(
+        max_request_tokens=100,
+        system_prompt="Translate these sentences.",
+        encode=encode,
+        predict_output_tokens=lambda tokens: tokens * 2,
+        glossary=glossary,
+    )
+
+    # the glossary header and its message framing
+    assert request_budget.fixed_tokens == 3 + 9 + 7 + 3
+    assert request_budget.glossary_tokens(sentence("Back to Winterfell.")) == 3 + 1
+    assert request_budget.glossary_tokens(sentence("Nothing here.")) == 0
+    assert request_budget.request_tokens([4, 1], [4, 0]) == 22 + (4 + 2 + 8 + 4) + (
+        1 + 2 + 2
+    )
@@ -1,11 +1,9 @@
-from datetime import time
 from pathlib import Path
 import json
 from srtglot.cache import Cache
 from srtglot.model import Sentence, TranslatedSubtitle, Subtitle, Multiline
 from srtglot.languages import Language
 from tempfile import TemporaryDirectory
-from bs4 import BeautifulSoup
 import pytest
 
 
@@ -15,9 +13,8 @@ def sentences() -> list[Sentence]:
         Sentence(
             blocks=[
                 Subtitle(
-                    start=time(),
-                    end=time(),
-                    soup=BeautifulSoup("Hello\nworld!", features="html.parser"),
+                    start=0,
+                    end=0,
                     text=[Multiline(lines=["Hello", "world!"])],
                 ),
             ]
@@ -25,9 +22,8 @@ def sentences() -> list[Sentence]:
         Sentence(
             blocks=[
                 Subtitle(
-                    start=time(),
-                    end=time(),
-                    soup=BeautifulSoup("Hello\nworld 2!", features="html.parser"),
+                    start=0,
+                    end=0,
                     text=[Multiline(lines=["Hello", "world 2!"])],
                 ),
             ]
@@ -51,15 +47,15 @@ async def test_test_should_put_and_get_json_file(sentences: list[Sentence]):
         value = [
             [
                 TranslatedSubtitle(
-                    start="00:00:00,000",
-                    end="00:00:00,000",
+                    start=0,
+                    end=0,
                     text="Hello\nworld!",
                 )
             ],
             [
                 TranslatedSubtitle(
-                    start="00:00:00,000",
-                    end="00:00:00,000",
+                    start=0,
+                    end=0,
                     text="Hello\nworld 2!",
                 )
             ],
@@ -75,8 +71,8 @@ async def test_test_should_put_and_get_json_file(sentences: list[Sentence]):
 
         assert json.loads(value_file_1.read_text()) == [
             {
-                "end": "00:00:00,000",
-                "start": "00:00:00,000",
+                "end": 0,
+                "start": 0,
                 "text": "Hello\nworld 2!",
             }
         ]
@@ -88,8 +84,42 @@ async def test_test_should_put_and_get_json_file(sentences: list[Sentence]):
 
         assert json.loads(value_file_2.read_text()) == [
             {
-                "end": "00:00:00,000",
-                "start": "00:00:00,000",
+                "end": 0,
+                "start": 0,
                 "text": "Hello\nworld!",
             }
         ]
+
+
+@pytest.mark.asyncio
+async def test_should_read_entries_with_legacy_timestamps(sentences: list[Sentence]):
+    with TemporaryDirectory() as tmpdir:
+        cache = Cache.create(cache_dir=Path(tmpdir), language=Language.FR)
+        for sentence in sentences:
+            cache._to_entry_path(sentence).write_text(
+                json.dumps(
+                    [{"start": "00:00:12,178", "end": "00:00:14,848", "text": "Hi"}]
+                )
+            )
+
+        assert await cache.get(sentences) == [
+            [TranslatedSubtitle(start=12178, end=14848, text="Hi")],
+            [TranslatedSubtitle(start=12178, end=14848, text="Hi")],
+        ]
+
+
+@pytest.mark.asyncio
+async def test_should_not_share_entries_across_salts(
+    sentences: list[Sentence], tmp_path: Path
+):
+    value = [[TranslatedSubtitle(start=0, end=0, text="Bonjour")] for _ in sentences]
+    await Cache.create(tmp_path, Language.FR, salt=b"glossary 1").put(sentences, value)
+
+    assert (
+        await Cache.create(tmp_path, Language.FR, salt=b"glossary 2").get(sentences)
+        is None
+    )
+    assert (
+        await Cache.create(tmp_path, Language.FR, salt=b"glossary 1").get(sentences)
+        == value
+    )
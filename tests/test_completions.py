@@ -1,11 +1,11 @@
-from datetime import time
-
 from unittest.mock import MagicMock
-from srtglot.completions import parse_completions, map_to_translated_subtitle
+from srtglot.completions import (
+    map_to_translated_subtitle,
+    parse_completions,
+    parse_structured_completions,
+)
 from srtglot.context import TranslatorError
-from srtglot.model import Multiline, Sentence, Subtitle, TranslatedSubtitle
-
-from bs4 import BeautifulSoup
+from srtglot.model import Markup, Multiline, Sentence, Subtitle, TranslatedSubtitle
 
 
 def test_should_parse_completions():
@@ -93,13 +93,13 @@ def test_should_raise_when_completion_is_empty():
 
 
 def test_should_map_to_translated_subtitles():
-    now = time(0, 0, 12, 178000)
+    now = 12178
     sentence1 = Sentence(
         blocks=[
             Subtitle(
                 start=now,
                 end=now,
-                soup=BeautifulSoup("<i>S1</i>", "html.parser"),
+                markup=Markup(segments=("<i>", "</i>")),
                 text=[
                     Multiline(
                         lines=[
@@ -111,14 +111,10 @@ def test_should_map_to_translated_subtitles():
             Subtitle(
                 start=now,
                 end=now,
-                soup=BeautifulSoup("<i>S2</i><i>S3</i>", "html.parser"),
+                markup=Markup(segments=("<i>", "</i><i>", "</i>")),
                 text=[
-                    Multiline(
-                        lines=[
-                            "A2",
-                            "A3",
-                        ]
-                    ),
+                    Multiline(lines=["A2"]),
+                    Multiline(lines=["A3"]),
                 ],
             ),
         ]
@@ -133,14 +129,108 @@ def test_should_map_to_translated_subtitles():
     assert result == [
         [
             TranslatedSubtitle(
-                start="00:00:12,178",
-                end="00:00:12,178",
+                start=12178,
+                end=12178,
                 text="<i>B1</i>",
             ),
             TranslatedSubtitle(
-                start="00:00:12,178",
-                end="00:00:12,178",
+                start=12178,
+                end=12178,
                 text="<i>B2</i><i>B3</i>",
             ),
         ]
     ]
+
+
+def test_should_expand_completions_of_repeated_sentences():
+    content = """[sentence 1]
+    Quoi ?
+    [sentence 2]
+    Non.
+    """
+
+    sentence = MagicMock(spec=Sentence)
+    sentence.non_empty_text_lines_count = 1
+    assert parse_completions([sentence, sentence], content, [0, 1, 0, 1, 1]) == [
+        ["Quoi ?"],
+        ["Non."],
+        ["Quoi ?"],
+        ["Non."],
+        ["Non."],
+    ]
+
+
+def test_should_salvage_sentences_that_validate():
+    content = """[sentence 1]
+    Bonjour
+    [sentence 3]
+    Au revoir
+    [sentence 2]
+    un
+    deux
+    trois
+    quatre
+    [sentence 4]
+    """
+
+    sentences = [MagicMock(spec=Sentence) for _ in range(4)]
+    for sentence in sentences:
+        sentence.non_empty_text_lines_count = 1
+
+    try:
+        parse_completions(sentences, content, salvage=True)
+        assert False
+    except TranslatorError as e:
+        assert e.parsed == {0: ["Bonjour"], 2: ["Au revoir"]}
+
+    try:
+        parse_completions(sentences[:3], content, [0, 1, 2, 0, 2], salvage=True)
+        assert False
+    except TranslatorError as e:
+        assert e.parsed == {
+            0: ["Bonjour"],
+            2: ["Au revoir"],
+            3: ["Bonjour"],
+            4: ["Au revoir"],
+        }
+
+    try:
+        parse_completions(sentences, content)
+        assert False
+    except TranslatorError as e:
+        assert e.parsed == {}
+
+
+def test_should_parse_structured_completions():
+    content = (
+        '{"sentences": [{"number": 2, "fragments": ["Au", "revoir"]}, '
+        '{"number": 1, "fragments": ["Bonjour ", "", "le\\nmonde"]}]}'
+    )
+
+    sentence = MagicMock(spec=Sentence)
+    sentence.non_empty_text_lines_count = 2
+    assert parse_structured_completions([sentence, sentence], content) == [
+        ["Bonjour", "le monde"],
+        ["Au", "revoir"],
+    ]
+
+
+def test_should_salvage_structured_completions():
+    content = (
+        '{"sentences": [{"number": 1, "fragments": ["Bonjour"]}, '
+        '{"number": 2, "fragments": []}]}'
+    )
+
+    sentence = MagicMock(spec=Sentence)
+    sentence.non_empty_text_lines_count = 1
+    try:
+        parse_structured_completions([sentence, sentence], content, salvage=True)
+        assert False
+    except TranslatorError as e:
+        assert e.parsed == {0: ["Bonjour"]}
+
+    try:
+        parse_structured_completions([sentence], '{"sentences": [{"number": 1}]}')
+        assert False
+    except TranslatorError as e:
+        assert str(e) == "Completion does not match the translation schema"
@@ -0,0 +1,52 @@
+import pytest
+from pathlib import Path
+from srtglot.glossary import Automaton, Glossary, read_glossary
+
+
+def encode(texts: list[str]) -> list[int]:
+    return [len(text.split()) for text in texts]
+
+
+def write_glossary(path: Path, *entries: str) -> Path:
+    path.write_text("\n".join(entries) + "\n")
+    return path
+
+
+def test_should_find_overlapping_keys():
+    automaton = Automaton.create(["he", "she", "his", "hers"])
+
+    assert sorted(automaton.find("ushers")) == [(1, 1), (2, 0), (2, 3)]
+
+
+def test_should_inject_only_matching_terms(tmp_path: Path):
+    glossary = Glossary.create(
+        [
+            write_glossary(
+                tmp_path / "show.tsv",
+                "# characters",
+                "Daenerys\tDaenerys",
+                "King's Landing\tPort-Réal",
+                "Night Watch\tGarde de Nuit",
+                "Lord\tSeigneur",
+            ),
+            write_glossary(tmp_path / "fixes.tsv", "lord\tSire", "竜\tdragon"),
+        ],
+        encode,
+    )
+
+    assert glossary.match(["Back to king's landing.", "Landlord, my LORD!"]) == [
+        ("King's Landing", "Port-Réal"),
+        ("lord", "Sire"),
+    ]
+    assert glossary.match(["Lords of the Watch.", "竜の子"]) == [("竜", "dragon")]
+    assert glossary.match(["Nothing here."]) == []
+
+    assert glossary.stats.requests == 3
+    assert glossary.stats.injected_tokens == 4 + 3 + 3
+
+
+def test_should_reject_entries_without_translation(tmp_path: Path):
+    path = write_glossary(tmp_path / "show.tsv", "Daenerys\tDaenerys", "Drogon")
+
+    with pytest.raises(ValueError, match="show.tsv:2"):
+        read_glossary(path)
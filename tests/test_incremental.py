@@ -0,0 +1,93 @@
+from pathlib import Path
+import pytest
+from click.testing import CliRunner
+from srtglot.cli import main
+from srtglot.formats import get_reader
+from srtglot.incremental import Revision
+from srtglot.model import TranslatedSubtitle
+from srtglot.sentence import collect_sentences
+from fixtures import write_srt
+
+
+def sentences(path: Path):
+    return list(collect_sentences(get_reader(path).parse(path)))
+
+
+def test_should_carry_over_unchanged_sentences(tmp_path: Path):
+    previous_input = write_srt(
+        tmp_path / "previous.srt",
+        [(1, "Hello"), (2, "world."), (3, "Yes."), (4, "Tpyo here.")],
+    )
+    previous_output = write_srt(
+        tmp_path / "previous.fr.srt",
+        [(1, "Bonjour"), (2, "monde."), (3, "Oui."), (4, "Fote.")],
+    )
+    input = write_srt(
+        tmp_path / "input.srt",
+        [(11, "Hello"), (12, "world."), (13, "New scene."), (14, "Typo here.")]
+        + [(15, "Yes.")],
+    )
+
+    revision = Revision.create(
+        sentences(input), previous_input=previous_input, previous_output=previous_output
+    )
+
+    assert revision.carried_count == 2
+    assert revision.translations == [
+        [
+            TranslatedSubtitle(start=11000, end=12000, text="Bonjour"),
+            TranslatedSubtitle(start=12000, end=13000, text="monde."),
+        ],
+        None,
+        None,
+        [TranslatedSubtitle(start=15000, end=16000, text="Oui.")],
+    ]
+
+
+def test_should_pair_moved_sentences_by_timing(tmp_path: Path):
+    previous_input = write_srt(
+        tmp_path / "previous.srt", [(1, "A."), (2, "B."), (3, "C."), (9, "C.")]
+    )
+    previous_output = write_srt(
+        tmp_path / "previous.fr.srt", [(1, "a."), (2, "b."), (3, "c1."), (9, "c2.")]
+    )
+    input = write_srt(tmp_path / "input.srt", [(8, "C."), (10, "A."), (11, "B.")])
+
+    revision = Revision.create(
+        sentences(input), previous_input=previous_input, previous_output=previous_output
+    )
+
+    assert [t[0].text if t is not None else None for t in revision.translations] == [
+        "c2.",
+        "a.",
+        "b.",
+    ]
+
+
+def test_should_reject_unrelated_output(tmp_path: Path):
+    previous_input = write_srt(tmp_path / "previous.srt", [(1, "A."), (2, "B.")])
+    previous_output = write_srt(tmp_path / "previous.fr.srt", [(1, "a.")])
+
+    with pytest.raises(ValueError):
+        Revision.create(
+            sentences(previous_input),
+            previous_input=previous_input,
+            previous_output=previous_output,
+        )
+
+
+def test_should_report_unrelated_output_as_a_cli_error(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-xxx")
+    previous_input = write_srt(tmp_path / "previous.srt", [(1, "A."), (2, "B.")])
+    previous_output = write_srt(tmp_path / "previous.fr.srt", [(1, "a.")])
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(previous_input), "-o", str(tmp_path / "output.srt"), "-t", "fr"]
+        + ["-I", str(previous_input), "-O", str(previous_output)]
+        + ["--no-cache", "--tokenizer", "heuristic"],
+    )
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "is not a translation of" in result.output
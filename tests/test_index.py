@@ -0,0 +1,96 @@
+from pathlib import Path
+from srtglot import parser
+from srtglot.index import SubtitleIndex, index_path
+from srtglot.model import Multiline
+from srtglot.sentence import Segmenter, collect_sentences
+from fixtures import srt_file
+
+
+def test_should_index_every_parsed_cue(srt_file: Path):
+    index = SubtitleIndex.build(srt_file)
+    subtitles = [*parser.parse(srt_file)]
+
+    assert len(index) == len(subtitles) == 690
+    for i in (0, 1, 345, 689):
+        assert [*parser.parse(srt_file, i, i + 1, index=index)] == [subtitles[i]]
+
+
+def test_should_index_sentence_starts(srt_file: Path):
+    index = SubtitleIndex.build(srt_file)
+    sentences = [*collect_sentences(parser.parse(srt_file))]
+
+    assert len(index.sentences) == len(sentences)
+    assert [
+        [*parser.parse(srt_file, r.start, r.stop, index=index)]
+        for r in (index.sentence_range(0, 1), index.sentence_range(10, 12))
+    ] == [
+        sentences[0].blocks,
+        sentences[10].blocks + sentences[11].blocks,
+    ]
+
+
+def test_should_skip_ignored_index_and_bom(tmp_path: Path):
+    srt = tmp_path / "bom.srt"
+    srt.write_bytes(
+        b"\xef\xbb\xbf1\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+        b"9999\n00:00:03,000 --> 00:00:04,000\nAdvertisement\n\n"
+        b"3\r\n00:00:03,000 --> 00:00:04,000\r\n<i>World.</i>"
+    )
+
+    index = SubtitleIndex.build(srt)
+    assert [*index.cues] == [3, 92]
+    assert [*index.sentences] == [0]
+    assert [sub.text for sub in parser.parse(srt, 1, index=index)] == [
+        [Multiline(lines=["World."])]
+    ]
+
+
+def test_should_save_and_reload_index(tmp_path: Path):
+    srt = tmp_path / "input.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello.\n")
+
+    index = SubtitleIndex.create(srt)
+    assert index_path(srt).is_file()
+    assert SubtitleIndex.create(srt) == index
+
+    srt.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nWorld.\n"
+    )
+    assert [*SubtitleIndex.create(srt).cues] == [0, 39]
+    assert [sub.start for sub in parser.parse(srt, 1)] == [3000]
+
+
+def test_should_read_range_without_writing_index(tmp_path: Path):
+    srt = tmp_path / "input.srt"
+    srt.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nWorld.\n"
+    )
+
+    assert [sub.start for sub in parser.parse(srt, 1)] == [3000]
+    assert not index_path(srt).exists()
+
+
+def test_should_not_fail_when_index_cannot_be_saved(tmp_path: Path, monkeypatch):
+    srt = tmp_path / "input.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello.\n")
+
+    def read_only(self, path: Path) -> None:
+        raise PermissionError(path)
+
+    monkeypatch.setattr(SubtitleIndex, "save", read_only)
+    assert [*SubtitleIndex.create(srt).cues] == [0]
+
+
+def test_should_rebuild_index_for_another_segmenter(tmp_path: Path):
+    srt = tmp_path / "input.srt"
+    srt.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nWorld.\n"
+    )
+
+    assert [*SubtitleIndex.create(srt).sentences] == [0]
+    split = Segmenter(max_blocks=1)
+    assert [*SubtitleIndex.create(srt, split).sentences] == [0, 1]
+    assert SubtitleIndex.load(index_path(srt)).is_stale(srt) is True
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from srtglot.languages import Language
+from srtglot.latency import Expansion
+
+
+def test_should_learn_expansion_factor_per_model_and_language(tmp_path: Path):
+    expansion = Expansion.create(tmp_path)
+    assert expansion.factor("gpt-4o", Language.FR) == 1.0
+
+    expansion.observe("gpt-4o", Language.FR, 100, 120)
+    expansion.observe("gpt-4o", Language.FR, 100, 140)
+    expansion.observe("gpt-4o", Language.JA, 100, 80)
+    expansion.save()
+
+    loaded = Expansion.create(tmp_path)
+    assert loaded.factor("gpt-4o", Language.FR) == 1.3
+    assert loaded.factor("gpt-4o", Language.JA) == 0.8
+    assert loaded.factor("gpt-4o-mini", Language.FR) == 1.0
+    assert loaded.predictor("gpt-4o", Language.FR)(10) == 18
+
+
+def test_should_ignore_unreadable_expansion_file(tmp_path: Path):
+    (tmp_path / "expansion.json").write_text("{")
+
+    assert Expansion.create(tmp_path).observed == {}
+    assert Expansion.create(None).path is None
+
+
+def test_should_not_learn_delimiter_tokens(tmp_path: Path):
+    expansion = Expansion.create(tmp_path)
+    expansion.observe("gpt-4o", Language.FR, 100, 120 + 4 * 5, sentences=4)
+
+    assert expansion.factor("gpt-4o", Language.FR) == 1.2
+    assert expansion.predictor("gpt-4o", Language.FR)(25) == 30 + 5
+
+
+def test_should_save_concurrently(tmp_path: Path):
+    expansions = [Expansion.create(tmp_path) for _ in range(16)]
+    for i, expansion in enumerate(expansions):
+        expansion.observe("gpt-4o", Language.FR, 100, 100 + i)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(e.save) for e in expansions]:
+            future.result()
+
+    assert Expansion.create(tmp_path).observed["gpt-4o:FR"][0] == 100
+    assert [*tmp_path.iterdir()] == [tmp_path / "expansion.json"]
@@ -1,6 +1,5 @@
-from datetime import time
 from pathlib import Path
-from srtglot.model import Sentence, Subtitle, Multiline
+from srtglot.model import Markup, Sentence, Subtitle, Multiline, format_timestamp
 from srtglot.parser import parse
 from fixtures import srt_file
 
@@ -20,13 +19,12 @@ def test_should_translate_subtitle(srt_file: Path):
 
 def test_should_return_lines():
     sub = Subtitle(
-        start=time(0, 0, 12, 178000),
-        end=time(0, 0, 14, 848000),
+        start=12178,
+        end=14848,
         text=[
             Multiline(["As the ", "first century"]),
             Multiline(["of the Targaryen dynasty"]),
         ],
-        soup=None,
     )
 
     assert sub.text_lines == ["As the ", "first century", "of the Targaryen dynasty"]
@@ -38,7 +36,6 @@ def test_should_return_sentence_lines():
             Subtitle(
                 start=None,
                 end=None,
-                soup=None,
                 text=[
                     Multiline(
                         lines=[
@@ -56,7 +53,6 @@ def test_should_return_sentence_lines():
             Subtitle(
                 start=None,
                 end=None,
-                soup=None,
                 text=[
                     Multiline(
                         lines=[
@@ -82,7 +78,6 @@ def test_should_return_sentence_length():
             Subtitle(
                 start=None,
                 end=None,
-                soup=None,
                 text=[
                     Multiline(
                         lines=[
@@ -101,7 +96,6 @@ def test_should_return_sentence_length():
             Subtitle(
                 start=None,
                 end=None,
-                soup=None,
                 text=[
                     Multiline(
                         lines=[
@@ -114,3 +108,46 @@ def test_should_return_sentence_length():
         ]
     )
     assert sentence.non_empty_text_lines_count == 5
+
+
+def test_should_create_plain_subtitle_without_markup():
+    sub = Subtitle.create(start=1000, end=2000, text="As the first century\nof the")
+
+    assert sub.markup is None
+    assert sub.text == [Multiline(["As the first century", "of the"])]
+    assert (
+        sub.translate(["AU PREMIER SIÈCLE", "DE LA"]).text == "AU PREMIER SIÈCLE\nDE LA"
+    )
+
+
+def test_should_create_markup_subtitle_with_template():
+    sub = Subtitle.create(start=1000, end=2000, text="<i>Tom</i> & Jerry")
+
+    assert sub.markup == Markup(segments=("<i>", "</i>", ""))
+    assert sub.text_lines == ["Tom", "& Jerry"]
+    assert sub.translate(["TOM", "& JERRY"]).text == "<i>TOM</i>&amp; JERRY"
+
+
+def test_should_translate_multiline_blocks_in_order():
+    sub = Subtitle.create(start=1000, end=2000, text="<i>one\ntwo</i>\n<b>three</b>")
+
+    assert sub.text_lines == ["one", "two", "", "three"]
+    assert sub.translate(["ONE", "TWO", "", "THREE"]).text == (
+        "<i>ONE\nTWO</i>\n<b>THREE</b>"
+    )
+
+
+def test_should_compile_markup():
+    markup, strings = Markup.compile('<font color="#fff">A &amp; B</font>\n<i>C</i>')
+
+    assert strings == ["A & B", "\n", "C"]
+    assert markup == Markup(segments=('<font color="#fff">', "</font>", "<i>", "</i>"))
+    assert markup.render(["X & Y", "", "Z"]) == (
+        '<font color="#fff">X &amp; Y</font>\n<i>Z</i>'
+    )
+
+
+def test_should_format_timestamp():
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(12178) == "00:00:12,178"
+    assert format_timestamp(((25 * 60 + 3) * 60 + 7) * 1000 + 5) == "25:03:07,005"
@@ -1,7 +1,6 @@
 from pathlib import Path
 from srtglot import parser
-from srtglot.model import Subtitle, Multiline
-from datetime import time
+from srtglot.model import Markup, Subtitle, Multiline
 from fixtures import srt_file
 
 
@@ -9,12 +8,57 @@ def test_parse(srt_file: Path):
     subtitles = [*parser.parse(srt_file)]
     assert len(subtitles) == 690
     assert subtitles[0] == Subtitle(
-        start=time(0, 0, 12, 178000),
-        end=time(0, 0, 14, 848000),
+        start=12178,
+        end=14848,
         text=[
             Multiline(lines=["As the first century"]),
             Multiline(lines=[""]),
             Multiline(lines=["of the Targaryen dynasty"]),
         ],
-        soup=subtitles[0].soup,
+        markup=Markup(segments=("<i>", "</i>", "<i>", "</i>")),
     )
+
+
+def test_count_subtitles(srt_file: Path):
+    assert parser.count_subtitles(srt_file) == 690
+
+
+def test_read_cues():
+    lines = [
+        "1\r\n",
+        "00:00:01,000 --> 00:00:02,500 X1:0\r\n",
+        "<i>Hello</i>\r\n",
+        "world\r\n",
+        "\r\n",
+        "\r\n",
+        "00:00:03,000 --> 00:00:04,000\n",
+        "No index\n",
+        "\n",
+        "3\n",
+        "not a timestamp\n",
+        "Invalid\n",
+        "\n",
+        "9999\n",
+        "01:00:00.000 --> 01:00:01.000\n",
+        "Advertisement",
+    ]
+
+    assert [*parser.read_cues(lines)] == [
+        parser.Cue(number=1, start=1000, end=2500, text="<i>Hello</i>\nworld"),
+        parser.Cue(number=None, start=3000, end=4000, text="No index"),
+        parser.Cue(number=9999, start=3600000, end=3601000, text="Advertisement"),
+    ]
+
+
+def test_parse_should_skip_ignored_index_and_bom(tmp_path: Path):
+    srt = tmp_path / "bom.srt"
+    srt.write_bytes(
+        b"\xef\xbb\xbf1\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+        b"9999\n00:00:03,000 --> 00:00:04,000\nAdvertisement\n"
+    )
+
+    subtitles = [*parser.parse(srt)]
+    assert parser.count_subtitles(srt) == 1
+    assert len(subtitles) == 1
+    assert subtitles[0].start == 1000
+    assert subtitles[0].text == [Multiline(lines=["Hello"])]
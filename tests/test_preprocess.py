@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from srtglot.formats import get_reader
+from srtglot.parser import parse
+from srtglot.preprocess import Preprocessed, artifact_path
+from srtglot.sentence import collect_sentences
+from fixtures import srt_file
+
+
+def test_should_save_and_load_preprocessed_input(srt_file: Path, tmp_path: Path):
+    with patch("srtglot.preprocess.batch_token_counter") as token_counter:
+        token_counter.return_value = lambda sentences: [len(str(s)) for s in sentences]
+        preprocessed = Preprocessed.create(
+            srt_file, reader=get_reader(srt_file), model="gpt-4o", cache_dir=tmp_path
+        )
+
+    assert artifact_path(tmp_path, srt_file, "gpt-4o").is_file()
+    assert preprocessed.sentences == [*collect_sentences(parse(srt_file))]
+    assert preprocessed.tokens == [len(str(s)) for s in preprocessed.sentences]
+    assert preprocessed.subtitles_count == 690
+
+    with patch("srtglot.preprocess.batch_token_counter") as token_counter:
+        loaded = Preprocessed.create(
+            srt_file, reader=get_reader(srt_file), model="gpt-4o", cache_dir=tmp_path
+        )
+        token_counter.assert_not_called()
+
+    assert loaded == preprocessed
+
+
+def test_should_key_artifact_by_content_and_model(tmp_path: Path):
+    input = tmp_path / "input.srt"
+    input.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello.\n")
+    path = artifact_path(tmp_path, input, "gpt-4o")
+
+    assert artifact_path(tmp_path, input, "gpt-4o-mini") != path
+    input.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello!\n")
+    assert artifact_path(tmp_path, input, "gpt-4o") != path
+
+
+def test_should_save_concurrently_to_the_same_artifact(srt_file: Path, tmp_path: Path):
+    sentences = [*collect_sentences(parse(srt_file))][:20]
+    preprocessed = Preprocessed(sentences=sentences, tokens=[1] * len(sentences))
+    path = tmp_path / "preprocessed" / "artifact.bin"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(preprocessed.save, path) for _ in range(32)]:
+            future.result()
+
+    assert Preprocessed.load(path) == preprocessed
+    assert [*path.parent.iterdir()] == [path]
+
+
+def test_should_translate_without_a_writable_cache(
+    srt_file: Path, tmp_path: Path, caplog
+):
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("not a directory")
+    with patch("srtglot.preprocess.batch_token_counter") as token_counter:
+        token_counter.return_value = lambda sentences: [len(str(s)) for s in sentences]
+        preprocessed = Preprocessed.create(
+            srt_file, reader=get_reader(srt_file), model="gpt-4o", cache_dir=cache_dir
+        )
+
+    assert preprocessed.sentences == [*collect_sentences(parse(srt_file))]
+    assert "Could not save the preprocessed input" in caplog.text
@@ -1,8 +1,10 @@
 from pathlib import Path
 from unittest.mock import MagicMock
 from srtglot.config import Config
-from srtglot.prompt import get_system_prompt
+from srtglot.model import Multiline, Sentence, Subtitle
+from srtglot.prompt import UserPrompt, get_system_prompt
 from srtglot.languages import Language
+from srtglot.structured import CompletionFormat
 
 
 def test_get_system_prompt():
@@ -15,3 +17,32 @@ def test_get_system_prompt():
         "You will translate input sentences from any language to the French language."
         in system_prompt["content"]
     )
+
+
+def test_should_send_repeated_sentences_once():
+    def sentence(*lines: str) -> Sentence:
+        return Sentence(
+            blocks=[Subtitle(start=0, end=0, text=[Multiline(lines=list(lines))])]
+        )
+
+    what, no, laughs = sentence("What?"), sentence("No."), sentence("[laughs]")
+    batch = [what, no, sentence("What?"), laughs, sentence("No.")]
+
+    prompt = UserPrompt.create_prompt(batch, compacted=True)
+    assert prompt.batch == [what, no, laughs]
+    assert prompt.references == [0, 1, 0, 2, 1]
+    assert prompt.user_message.get("content") == (
+        "[sentence 1]\nWhat?\n[sentence 2]\nNo.\n[sentence 3]\n[laughs]"
+    )
+    assert UserPrompt.create_prompt(batch).references is None
+
+
+def test_get_structured_system_prompt():
+    config = MagicMock(spec=Config)
+    config.target_language = Language.FR
+    config.output_format = CompletionFormat.JSON
+
+    content = get_system_prompt(config)["content"]
+    assert "you will return a JSON object" in content
+    assert '{"sentences": [{"number": 1, "fragments": ["Je suis"' in content
+    assert "[sentence 1]\nJe suis" not in content
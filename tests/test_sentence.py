@@ -1,14 +1,20 @@
+from collections import Counter
 from contextlib import ExitStack
 from pathlib import Path
-import datetime
 from unittest.mock import MagicMock, patch
+from srtglot.languages import Language
 from srtglot.sentence import (
+    Segmenter,
+    SentenceStats,
+    batch_counted_sentences,
     collect_sentences,
+    count_blocks,
     token_counter,
     sentences_batcher,
 )
 from srtglot.parser import parse
 from srtglot.model import Sentence, Subtitle, Multiline
+from srtglot.tokens import TokenMemo
 from fixtures import srt_file
 
 
@@ -16,14 +22,13 @@ def test_token_counter_should_count_token():
     sentence = Sentence(
         blocks=[
             Subtitle(
-                start=datetime.time(0, 0, 12, 178000),
-                end=datetime.time(0, 0, 14, 848000),
+                start=12178,
+                end=14848,
                 text=[
                     Multiline(lines=["As the first century"]),
                     Multiline(lines=[""]),
                     Multiline(lines=["of the Targaryen dynasty."]),
                 ],
-                soup=None,
             )
         ]
     )
@@ -34,8 +39,10 @@ def test_token_counter_should_count_token():
 def test_should_batch_sentences():
     with ExitStack() as stack:
         counter = MagicMock()
-        counter.side_effect = [2, 1, 1, 3, 2, 1]
-        token_counter = stack.enter_context(patch("srtglot.sentence.token_counter"))
+        counter.return_value = [2, 1, 1, 3, 2, 1]
+        token_counter = stack.enter_context(
+            patch("srtglot.sentence.batch_token_counter")
+        )
         token_counter.return_value = counter
 
         s1 = MagicMock()
@@ -55,7 +62,8 @@ def test_should_batch_sentences():
 
 
 def test_should_return_sentences(srt_file: Path):
-    sentences = [*collect_sentences(parse(srt_file))]
+    full_stops = Segmenter(terminators=".", closers="", max_gap=None, max_blocks=None)
+    sentences = [*collect_sentences(parse(srt_file), full_stops)]
     assert len(sentences) == 405
     assert (
         str(sentences[0])
@@ -986,3 +994,140 @@ def test_should_return_sentences(srt_file: Path):
         str(sentences[404])
         == "I, Viserys Targaryen, first of his name, King of the Andals, and the Rhoynar, and the First Men, Lord of the Seven Kingdoms, and Protector of the Realm, do hereby name Rhaenyra Targaryen, Princess of Dragonstone and heir to the Iron Throne."
     )
+
+
+def subtitles(*cues: tuple[int, str]) -> list[Subtitle]:
+    return [
+        Subtitle.create(start=start, end=start + 1000, text=text)
+        for start, text in cues
+    ]
+
+
+def sentences_text(sentences) -> list[str]:
+    return [str(sentence) for sentence in sentences]
+
+
+def test_should_end_sentences_on_any_terminator(srt_file: Path):
+    sentences = [*collect_sentences(parse(srt_file))]
+
+    assert len(sentences) == 512
+    assert str(sentences[14]) == "Dohaerās, Syrax!"
+    assert SentenceStats.create(sentences) == SentenceStats(
+        count=512, mean_blocks=690 / 512, median_blocks=1, p95_blocks=3, max_blocks=9
+    )
+
+
+def test_should_count_sentence_stats_while_streaming(srt_file: Path):
+    sizes: Counter[int] = Counter()
+    sentences = [*count_blocks(collect_sentences(parse(srt_file)), sizes)]
+
+    assert SentenceStats.from_sizes(sizes) == SentenceStats.create(sentences)
+    assert SentenceStats.from_sizes(Counter()) == SentenceStats(
+        count=0, mean_blocks=0.0, median_blocks=0, p95_blocks=0, max_blocks=0
+    )
+
+
+def test_should_use_source_language_terminators():
+    cues = subtitles((0, "你好。"), (1000, "Really?"), (2000, "«Oui.»"), (3000, "Bye"))
+
+    assert sentences_text(
+        collect_sentences(cues, Segmenter.create(language=Language.ZH))
+    ) == ["你好。", "Really?", "«Oui.»", "Bye"]
+    assert sentences_text(
+        collect_sentences(cues, Segmenter.create(language=Language.EN))
+    ) == ["你好。 Really?", "«Oui.»", "Bye"]
+
+
+def test_should_end_sentences_on_pauses_and_caps():
+    cues = subtitles((0, "one"), (1000, "two"), (5000, "three"), (6000, "four"))
+
+    assert sentences_text(collect_sentences(cues)) == ["one two", "three four"]
+    assert sentences_text(
+        collect_sentences(cues, Segmenter(max_gap=None, max_blocks=3))
+    ) == ["one two three", "four"]
+    assert sentences_text(
+        collect_sentences(
+            cues,
+            Segmenter(
+                max_gap=None,
+                max_tokens=7,
+                count_tokens=lambda texts: [len(text) for text in texts],
+            ),
+        )
+    ) == ["one two", "three", "four"]
+
+
+def test_should_count_cue_tokens_in_memoized_chunks():
+    cues = subtitles((0, "one two"), (1000, "three"), (2000, "one two"))
+    memo = TokenMemo()
+    encode = MagicMock(side_effect=lambda texts: [len(t.split()) for t in texts])
+
+    with patch("srtglot.tokens.encoder", return_value=encode):
+        segmenter = Segmenter.create(
+            max_gap=None, max_tokens=2, model="gpt-4o", memo=memo
+        )
+        assert sentences_text(collect_sentences(cues, segmenter)) == [
+            "one two",
+            "three",
+            "one two",
+        ]
+        assert sentences_text(collect_sentences(cues, segmenter)) == [
+            "one two",
+            "three",
+            "one two",
+        ]
+
+    encode.assert_called_once_with(["one two", "three"])
+    assert len(memo) == 2
+
+
+def test_should_only_end_greek_sentences_on_semicolons():
+    cues = subtitles((0, "for i in x;"), (1000, "done."))
+
+    assert sentences_text(collect_sentences(cues)) == ["for i in x; done."]
+    assert sentences_text(
+        collect_sentences(cues, Segmenter.create(language=Language.EL))
+    ) == ["for i in x;", "done."]
+
+
+def test_should_give_oversized_sentences_their_own_batch():
+    s1, s2, s3 = MagicMock(), MagicMock(), MagicMock()
+
+    assert [*batch_counted_sentences([(s1, 9), (s2, 1), (s3, 1)], 4)] == [
+        [s1],
+        [s2, s3],
+    ]
+
+
+def test_should_balance_batches_without_adding_requests():
+    sentences = [MagicMock() for _ in range(6)]
+    counted = [(sentence, 1) for sentence in sentences]
+
+    assert [*batch_counted_sentences(counted, 5)] == [sentences[:3], sentences[3:]]
+    assert [*batch_counted_sentences(counted, 5, window=2)] == [
+        sentences[:3],
+        sentences[3:],
+    ]
+
+
+def test_should_balance_batches_by_weight():
+    sentences = [MagicMock() for _ in range(5)]
+    counted = list(zip(sentences, [2, 1, 1, 1, 1]))
+
+    assert [*batch_counted_sentences(counted, 4)] == [sentences[:2], sentences[2:]]
+    assert [
+        *batch_counted_sentences(
+            counted, 4, weight=lambda tokens: 6 if tokens == 2 else tokens
+        )
+    ] == [sentences[:1], sentences[1:]]
+
+
+def test_should_read_tuned_batch_size_for_each_window():
+    caps = iter([2, 2, 4, 4, 4, 4])
+    counted = [(i, 1) for i in range(8)]
+
+    assert [*batch_counted_sentences(counted, lambda: next(caps), window=2)] == [
+        [0, 1],
+        [2, 3, 4],
+        [5, 6, 7],
+    ]
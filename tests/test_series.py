@@ -0,0 +1,109 @@
+from pathlib import Path
+import pytest
+from srtglot.model import TranslatedSubtitle
+from srtglot.sentence import sentences_batcher
+from srtglot.series import Series, SeriesStats, list_episodes, output_paths
+from srtglot.tokens import Tokenizer
+from fixtures import write_srt
+
+
+def test_should_list_episodes(tmp_path: Path):
+    write_srt(tmp_path / "e02.srt", [(1, "A.")])
+    write_srt(tmp_path / "e01.vtt", [(1, "A.")])
+    (tmp_path / "notes.txt").write_text("")
+
+    assert list_episodes(tmp_path) == [tmp_path / "e01.vtt", tmp_path / "e02.srt"]
+
+
+def test_should_name_outputs_after_episodes(tmp_path: Path):
+    assert output_paths(tmp_path, [Path("e01.vtt"), Path("e02.srt")]) == [
+        tmp_path / "e01.srt",
+        tmp_path / "e02.srt",
+    ]
+
+
+def test_should_reject_episodes_with_the_same_output(tmp_path: Path):
+    with pytest.raises(ValueError, match="e01.srt and E01.vtt"):
+        output_paths(tmp_path, [Path("e01.srt"), Path("E01.vtt")])
+
+
+def test_should_deduplicate_sentences_across_episodes(tmp_path: Path):
+    series = Series.read(
+        [
+            write_srt(tmp_path / "e01.srt", [(1, "Previously."), (2, "Hello.")]),
+            write_srt(tmp_path / "e02.srt", [(5, "Previously."), (6, "Bye.")]),
+        ]
+    )
+
+    assert series.sentences_count == 4
+    assert len(series.distinct) == 3
+    assert series.occurrences == [[0, 1], [0, 2]]
+    assert series.deduplication_ratio == 0.25
+
+
+def test_should_render_episodes_with_their_own_timings(tmp_path: Path):
+    series = Series.read(
+        [
+            write_srt(tmp_path / "e01.srt", [(1, "Previously."), (2, "Hello.")]),
+            write_srt(tmp_path / "e02.srt", [(5, "Previously.")]),
+        ]
+    )
+    translated = [
+        [TranslatedSubtitle(start=1000, end=2000, text="Précédemment.")],
+        [TranslatedSubtitle(start=2000, end=3000, text="Bonjour.")],
+    ]
+
+    assert series.render(translated) == [
+        [
+            TranslatedSubtitle(start=1000, end=2000, text="Précédemment."),
+            TranslatedSubtitle(start=2000, end=3000, text="Bonjour."),
+        ],
+        [TranslatedSubtitle(start=5000, end=6000, text="Précédemment.")],
+    ]
+
+
+def test_should_pack_sentences_of_small_files_together(tmp_path: Path):
+    series = Series.read(
+        [
+            write_srt(tmp_path / f"clip{i}.srt", [(1, f"Clip {i}."), (2, "Buy now.")])
+            for i in range(6)
+        ]
+    )
+    batcher = sentences_batcher("gpt-4o", 20, tokenizer=Tokenizer.HEURISTIC)
+
+    batches = list(batcher(series.distinct))
+    assert len(batches) < len(series.episodes)
+
+    translated = [
+        [TranslatedSubtitle(start=1000, end=2000, text=str(sentence).upper())]
+        for batch in batches
+        for sentence in batch
+    ]
+    assert [
+        [subtitle.text for subtitle in episode] for episode in series.render(translated)
+    ] == [[f"CLIP {i}.", "BUY NOW."] for i in range(6)]
+
+
+def test_should_report_requests_saved_across_episodes(tmp_path: Path):
+    series = Series.read(
+        [
+            write_srt(tmp_path / "e01.srt", [(1, "Previously."), (2, "Hello.")]),
+            write_srt(tmp_path / "e02.srt", [(5, "Previously."), (6, "Bye.")]),
+        ]
+    )
+    batcher = sentences_batcher("gpt-4o", 7, tokenizer=Tokenizer.HEURISTIC)
+
+    stats = SeriesStats.create(series, batcher)
+    assert stats == SeriesStats(
+        episodes=2,
+        sentences=4,
+        distinct=3,
+        deduplication_ratio=0.25,
+        requests=1,
+        all_requests=2,
+        episode_requests=2,
+    )
+    assert str(stats) == (
+        "3 distinct of 4 sentences across 2 episodes (25.0% deduplicated), "
+        "1 requests instead of 2 (1 saved), 2 one episode at a time"
+    )
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import pytest
+from srtglot.cli import _Arrivals, _translate_batches
+from srtglot.model import Multiline, Sentence, Subtitle
+from srtglot.streaming import CompletionStream
+from srtglot.translator import translator
+from fixtures import translation_context
+
+
+def test_should_emit_sentences_once_complete():
+    stream = CompletionStream()
+
+    assert stream.feed("[sentence 1]\nBon") == []
+    assert stream.feed("jour\n\nle monde\n[sent") == []
+    assert stream.feed("ence 2]\nAu revoir") == [(0, ["Bonjour", "le monde"])]
+    assert stream.close() == [(1, ["Au revoir"])]
+    assert stream.close() == []
+
+
+def make_sentence(*lines: str) -> Sentence:
+    return Sentence(
+        blocks=[
+            Subtitle(
+                start=i * 1000,
+                end=i * 1000 + 500,
+                text=[Multiline(lines=[line])],
+            )
+            for i, line in enumerate(lines)
+        ]
+    )
+
+
+class FakeStreamingServer:
+    # serves each request with the next scripted list of content deltas, as
+    # server-sent events in the chat completion chunk format
+    def __init__(self, responses: list[list[str | asyncio.Event]]):
+        self.responses = responses
+        self.requests: list[dict] = []
+
+    @staticmethod
+    def _event(payload: dict) -> bytes:
+        return f"data: {json.dumps(payload)}\n\n".encode()
+
+    def _chunk(self, content: str) -> bytes:
+        return self._event(
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [
+                    {"index": 0, "delta": {"content": content}, "finish_reason": None}
+                ],
+            }
+        )
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(
+            int(line.split(b":")[1])
+            for line in head.split(b"\r\n")
+            if line.lower().startswith(b"content-length:")
+        )
+        self.requests.append(json.loads(await reader.readexactly(length)))
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+            b"connection: close\r\n\r\n"
+        )
+        for delta in self.responses.pop(0):
+            if isinstance(delta, asyncio.Event):
+                await asyncio.wait_for(delta.wait(), timeout=5)
+                continue
+
+            writer.write(self._chunk(delta))
+            await writer.drain()
+
+        usage = {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60}
+        writer.write(
+            self._event(
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": "gpt-4o",
+                    "choices": [],
+                    "usage": usage,
+                }
+            )
+        )
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+        writer.close()
+
+
+async def serve(server: FakeStreamingServer, monkeypatch) -> asyncio.Server:
+    listening = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listening.sockets[0].getsockname()[1]
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    return listening
+
+
+@pytest.mark.asyncio
+async def test_should_emit_sentences_before_the_stream_ends(monkeypatch):
+    hello, goodbye = make_sentence("Hello", "world"), make_sentence("Goodbye")
+    emitted = asyncio.Event()
+    server = FakeStreamingServer(
+        [["[sentence 1]\nBonjour\n", "monde\n[sentence 2]\n", emitted, "Au revoir"]]
+    )
+    listening = await serve(server, monkeypatch)
+
+    received = []
+
+    def on_sentence(sentence, subtitles):
+        received.append((sentence, [subtitle.text for subtitle in subtitles]))
+        emitted.set()
+
+    context = translation_context(stream=True, salvage=True, max_attempts=1)
+    async with listening:
+        result = await translator(context, on_sentence)([hello, goodbye])
+
+    # the first sentence was handed on while the server waited for it
+    assert received == [(hello, ["Bonjour", "monde"]), (goodbye, ["Au revoir"])]
+    assert [[s.text for s in subtitles] for subtitles in result] == [
+        ["Bonjour", "monde"],
+        ["Au revoir"],
+    ]
+    assert server.requests[0]["stream"] is True
+    assert context.streams.completions == 1
+
+
+@pytest.mark.asyncio
+async def test_should_keep_sentences_received_before_a_failure(monkeypatch):
+    sentences = [make_sentence("Hello"), make_sentence("What?"), make_sentence("No")]
+    server = FakeStreamingServer(
+        [
+            [
+                "[sentence 1]\nBonjour\n[sentence 2]\nQuoi ?\n",
+                "[sentence 3]\nun\ndeux\ntrois\nquatre\n",
+            ],
+            ["[sentence 1]\nNon"],
+        ]
+    )
+    listening = await serve(server, monkeypatch)
+
+    context = translation_context(stream=True, salvage=True, max_attempts=1)
+    async with listening:
+        result = await translator(context)(sentences)
+
+    assert [subtitles[0].text for subtitles in result] == ["Bonjour", "Quoi ?", "Non"]
+    assert len(server.requests) == 2
+    assert server.requests[1]["messages"][-1]["content"] == "[sentence 1]\nNo"
+    assert context.streams.kept == 2
+    assert context.bisections.salvaged == 2
+
+
+@pytest.mark.asyncio
+async def test_should_retry_every_sentence_of_a_failed_stream_without_salvage(
+    monkeypatch,
+):
+    hello, what = make_sentence("Hello"), make_sentence("What?")
+    server = FakeStreamingServer(
+        [
+            ["[sentence 1]\nBonjour\n", "[sentence 2]\nun\ndeux\ntrois\nquatre\n"],
+            ["[sentence 1]\nOui"],
+            ["[sentence 1]\nOui"],
+        ]
+    )
+    listening = await serve(server, monkeypatch)
+
+    received = []
+    context = translation_context(stream=True, max_attempts=1)
+    async with listening:
+        result = await translator(
+            context, lambda sentence, subtitles: received.append(sentence)
+        )([hello, what])
+
+    # the valid first sentence was neither handed on nor kept from the failure
+    assert [subtitles[0].text for subtitles in result] == ["Oui", "Oui"]
+    assert len(server.requests) == 3
+    assert sorted(map(id, received)) == sorted(map(id, [hello, what]))
+    assert context.streams.kept == 0
+
+
+@pytest.mark.asyncio
+async def test_should_output_streamed_sentences_before_their_batch_completes():
+    hello, goodbye = make_sentence("Hello"), make_sentence("Goodbye")
+    arrivals = _Arrivals()
+    completed = asyncio.Event()
+
+    async def translate(batch):
+        first = [subtitle.translate(["Bonjour"]) for subtitle in hello.blocks]
+        arrivals.put(hello, first)
+        await completed.wait()
+        return [
+            first,
+            [subtitle.translate(["Au revoir"]) for subtitle in goodbye.blocks],
+        ]
+
+    translated = _translate_batches(
+        translate, iter([[hello, goodbye]]), 1, lambda _: None, arrivals=arrivals
+    )
+
+    assert [s.text for s in await anext(translated)] == ["Bonjour"]
+    completed.set()
+    assert [[s.text for s in subtitles] async for subtitles in translated] == [
+        ["Au revoir"]
+    ]
+    assert arrivals.translated == {}
@@ -0,0 +1,60 @@
+from srtglot.model import Multiline, Subtitle, TranslatedSubtitle
+from srtglot.table import SubtitleTable
+
+
+def table() -> SubtitleTable[TranslatedSubtitle]:
+    return SubtitleTable.create(
+        [
+            TranslatedSubtitle(start=1000, end=3500, text="A"),
+            TranslatedSubtitle(start=3000, end=4000, text="B"),
+            TranslatedSubtitle(start=5000, end=6000, text="C"),
+        ]
+    )
+
+
+def times(table: SubtitleTable) -> list[tuple[int, int]]:
+    return [(cue.start, cue.end) for cue in table.to_cues()]
+
+
+def test_should_round_trip_subtitles():
+    subtitles = [
+        Subtitle(start=1000, end=2000, text=[Multiline(lines=["Hello"])]),
+        Subtitle(start=3000, end=4000, text=[Multiline(lines=["world."])]),
+    ]
+
+    assert SubtitleTable.create(subtitles).to_cues() == subtitles
+
+
+def test_should_shift_and_clamp():
+    shifted = table().shift(-2000)
+    assert times(shifted) == [(-1000, 1500), (1000, 2000), (3000, 4000)]
+    assert times(shifted.clamp(maximum=3500)) == [
+        (0, 1500),
+        (1000, 2000),
+        (3000, 3500),
+    ]
+
+
+def test_should_convert_frame_rate():
+    assert times(table().convert_frame_rate(25, 24000 / 1001)) == [
+        (1043, 3649),
+        (3128, 4171),
+        (5214, 6256),
+    ]
+
+
+def test_should_stretch_between_anchors():
+    assert times(table().stretch((1000, 5000), (2000, 10000))) == [
+        (2000, 7000),
+        (6000, 8000),
+        (10000, 12000),
+    ]
+
+
+def test_should_fix_overlaps():
+    assert times(table().fix_overlaps(gap=100)) == [
+        (1000, 2900),
+        (3000, 4000),
+        (5000, 6000),
+    ]
+    assert [cue.text for cue in table().fix_overlaps().to_cues()] == ["A", "B", "C"]
@@ -0,0 +1,81 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from srtglot.model import Sentence, Subtitle
+from srtglot.tokens import TokenMemo, Tokenizer, batch_token_counter, estimate_tokens
+
+
+def sentence(text: str) -> Sentence:
+    return Sentence([Subtitle.create(start=0, end=1000, text=text)])
+
+
+def encoding() -> MagicMock:
+    encoding = MagicMock()
+    encoding.encode_batch.side_effect = lambda texts, **_: [t.split() for t in texts]
+    return encoding
+
+
+def test_should_count_tokens_once_per_distinct_sentence():
+    with patch("tiktoken.encoding_for_model") as encoding_for_model:
+        encoding_for_model.return_value = encoding()
+        count_tokens = batch_token_counter("gpt-4o")
+        hello, bye = sentence("Hello there."), sentence("Bye.")
+
+        assert count_tokens([hello, bye, hello]) == [2, 1, 2]
+        assert count_tokens([bye, sentence("See you soon.")]) == [1, 3]
+
+    assert encoding_for_model.return_value.encode_batch.call_args_list[0].args == (
+        ["Hello there.", "Bye."],
+    )
+    assert encoding_for_model.return_value.encode_batch.call_args_list[1].args == (
+        ["See you soon."],
+    )
+
+
+def test_should_persist_token_memo(tmp_path: Path):
+    with patch("tiktoken.encoding_for_model") as encoding_for_model:
+        encoding_for_model.return_value = encoding()
+        batch_token_counter("gpt-4o", TokenMemo.create(tmp_path, "gpt-4o"))(
+            [sentence("Hello there.")]
+        )
+        batch_token_counter("gpt-4o", TokenMemo.create(tmp_path, "gpt-4o"))(
+            [sentence("Bye.")]
+        )
+
+        memo = TokenMemo.create(tmp_path, "gpt-4o")
+        encoding_for_model.return_value = encoding()
+        counts = batch_token_counter("gpt-4o", memo)(
+            [sentence("Bye."), sentence("Hello there.")]
+        )
+
+    assert counts == [1, 2]
+    assert len(memo) == 2
+    encoding_for_model.return_value.encode_batch.assert_not_called()
+    assert len(TokenMemo.create(tmp_path, "gpt-4o-mini")) == 0
+
+
+def test_should_ignore_truncated_memo_record(tmp_path: Path):
+    memo = TokenMemo.create(tmp_path, "gpt-4o")
+    memo.update({b"a": 1})
+    memo.update({b"b": 2})
+    assert memo.path is not None
+    memo.path.write_bytes(memo.path.read_bytes()[:-3])
+
+    assert TokenMemo.create(tmp_path, "gpt-4o").counts == {b"a": 1}
+
+
+def test_should_estimate_tokens_by_word_class():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello there, it's me!") == 7
+    assert estimate_tokens("Internationalization 2024") == 5
+    assert estimate_tokens("你好，世界。") == 5
+    assert estimate_tokens("Привет, мир.") == 5
+
+
+def test_should_count_heuristic_tokens_without_tiktoken():
+    with patch("tiktoken.encoding_for_model") as encoding_for_model:
+        counts = batch_token_counter("gpt-4o", tokenizer=Tokenizer.HEURISTIC)(
+            [sentence("Hello there."), sentence("Bye.")]
+        )
+
+    assert counts == [3, 2]
+    encoding_for_model.assert_not_called()
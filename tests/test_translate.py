@@ -1,13 +1,13 @@
-import datetime
+import json
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
-from srtglot.model import Multiline, Sentence, Subtitle, TranslatedSubtitle
-from srtglot.translator import Context, translator
+from srtglot.model import Markup, Multiline, Sentence, Subtitle, TranslatedSubtitle
+from srtglot.translator import translator
 from srtglot.prompt import UserPrompt
-from srtglot.languages import Language
-from srtglot.config import Config
-from bs4 import BeautifulSoup
+from srtglot.structured import CompletionFormat
+from openai.types import CompletionUsage
 import pytest
+from fixtures import client, completion, translation_context
 
 
 def format_translated(sentences: list[list[TranslatedSubtitle]]) -> str:
@@ -28,7 +28,6 @@ def test__to_prompt_input():
                 Subtitle(
                     start=None,
                     end=None,
-                    soup=None,
                     text=[
                         Multiline(
                             lines=["Hello", "world", "\n", "How", "are", "you", "?"]
@@ -50,52 +49,41 @@ def sentence() -> Sentence:
     return Sentence(
         blocks=[
             Subtitle(
-                start=datetime.time(),
-                end=datetime.time(),
-                soup=BeautifulSoup(
-                    "<i>Hello</i><i>world</i>\n<i>How</i><i>are</i><i>you?</i>",
-                    "html.parser",
+                start=0,
+                end=0,
+                markup=Markup(
+                    segments=(
+                        "<i>",
+                        "</i><i>",
+                        "</i>",
+                        "<i>",
+                        "</i><i>",
+                        "</i><i>",
+                        "</i>",
+                    )
                 ),
-                text=[Multiline(lines=["Hello", "world", "", "How", "are", "you?"])],
+                text=[
+                    Multiline(lines=[line])
+                    for line in ["Hello", "world", "", "How", "are", "you?"]
+                ],
             )
         ]
     )
 
 
-def create_context() -> Context:
-    return Context.create(
-        config=Config(
-            model="gpt-4o",
-            target_language=Language.EN,
-            max_tokens=100,
-            api_key="sk-xxx",
-            max_attempts=3,
-            input=Path("input.srt"),
-            output=Path("output.srt"),
-        )
-    )
-
-
 @pytest.mark.asyncio
-async def test_should_get_llm_completions_when_cache_is_missing(sentence: Sentence):
-    with patch("srtglot.context._create_openai_client") as create_client:
-        client = AsyncMock(name="client")
-        create_client.return_value = client
-
-        choice = AsyncMock(name="choice")
-        choice.message.content = "[sentence 1]\nBonjour\nmonde\nComment\nça\nva?"
-
-        completion = AsyncMock(name="completion")
-        completion.choices = [choice]
-        client.chat.completions.create.return_value = completion
-
-        translate = translator(create_context())
+async def test_should_get_llm_completions_when_cache_is_missing(
+    sentence: Sentence, client: AsyncMock
+):
+    client.chat.completions.create.return_value = completion(
+        "[sentence 1]\nBonjour\nmonde\nComment\nça\nva?"
+    )
 
-        result = await translate([sentence])
-        assert (
-            format_translated(result)
-            == "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>"
-        )
+    result = await translator(translation_context())([sentence])
+    assert (
+        format_translated(result)
+        == "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>"
+    )
 
 
 @pytest.mark.asyncio
@@ -108,8 +96,8 @@ async def test_should_get_llm_completions_from_cache_when_cache_is_present(
             return [
                 [
                     TranslatedSubtitle(
-                        start="00:00:00,000",
-                        end="00:00:00,000",
+                        start=0,
+                        end=0,
                         text="Bonjour\nmonde\nComment\nça\nva?",
                     )
                 ]
@@ -117,6 +105,140 @@ async def test_should_get_llm_completions_from_cache_when_cache_is_present(
 
         cache.return_value.get = AsyncMock(side_effect=async_get)
 
-        translate = translator(create_context())
+        translate = translator(translation_context())
         result = await translate([sentence])
         assert format_translated(result) == "Bonjour\nmonde\nComment\nça\nva?"
+
+
+@pytest.mark.asyncio
+async def test_should_translate_repeated_sentences_once(
+    client: AsyncMock, sentence: Sentence
+):
+    client.chat.completions.create.return_value = completion(
+        "[sentence 1]\nBonjour\nmonde\nComment\nça\nva?"
+    )
+
+    context = translation_context(compact_prompts=True)
+    result = await translator(context)([sentence, Sentence(sentence.blocks)])
+
+    assert format_translated(result[:1]) == format_translated(result[1:])
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    assert messages[1]["content"].count("[sentence") == 1
+    assert context.prompt_savings.sentences == 1
+    assert context.prompt_savings.prompt_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_should_send_matching_glossary_terms(
+    client: AsyncMock, sentence: Sentence, tmp_path: Path
+):
+    glossary = tmp_path / "show.tsv"
+    glossary.write_text("world\tmonde\ndragon\tdragon\n")
+    client.chat.completions.create.return_value = completion(
+        "[sentence 1]\nBonjour\nmonde\nComment\nça\nva?"
+    )
+
+    await translator(translation_context(glossary=(glossary,)))([sentence])
+
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    assert len(messages) == 3
+    assert messages[1]["content"].endswith("\nworld => monde")
+
+
+@pytest.fixture
+def other() -> Sentence:
+    return Sentence(
+        blocks=[Subtitle(start=0, end=0, text=[Multiline(lines=["Goodbye"])])]
+    )
+
+
+@pytest.mark.asyncio
+async def test_should_retry_only_sentences_that_were_not_salvaged(
+    client: AsyncMock, sentence: Sentence, other: Sentence
+):
+    client.chat.completions.create.side_effect = [
+        completion("[sentence 1]\nBonjour\nmonde\nComment\nça\nva?\n[sentence 2]\n"),
+        completion("[sentence 1]\nAu revoir"),
+    ]
+
+    context = translation_context(salvage=True)
+    result = await translator(context)([sentence, other])
+
+    assert format_translated(result) == (
+        "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>\nAu revoir"
+    )
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    assert messages[1]["content"] == "[sentence 1]\nGoodbye"
+    assert context.bisections.salvaged == 1
+
+
+@pytest.mark.asyncio
+async def test_should_repair_offending_sentences_before_bisecting(
+    client: AsyncMock, sentence: Sentence, other: Sentence
+):
+    usage = CompletionUsage(prompt_tokens=80, completion_tokens=20, total_tokens=100)
+    rejected = "[sentence 1]\nBonjour\nmonde\nComment\nça\nva?\n[sentence 2]\n"
+    client.chat.completions.create.side_effect = [
+        completion(rejected, usage),
+        completion("[sentence 2]\nAu revoir", usage),
+    ]
+
+    context = translation_context(repair=True)
+    result = await translator(context)([sentence, other])
+
+    assert format_translated(result) == (
+        "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>\nAu revoir"
+    )
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    assert messages[-2] == {"role": "assistant", "content": rejected}
+    assert "Translate again only [sentence 2]," in messages[-1]["content"]
+    assert context.bisections.bisected == 0
+    assert str(context.repairs) == (
+        "1 of 1 rejected completions repaired, 2.0 requests and 200 tokens "
+        "per rejected batch before bisection"
+    )
+
+
+@pytest.mark.asyncio
+async def test_should_not_repair_when_every_sentence_validated(
+    client: AsyncMock, sentence: Sentence, other: Sentence
+):
+    usage = CompletionUsage(prompt_tokens=80, completion_tokens=20, total_tokens=100)
+    client.chat.completions.create.return_value = completion(
+        "Sure, here it is:\n[sentence 1]\nBonjour\nmonde\nComment\nça\nva?\n"
+        "[sentence 2]\nAu revoir",
+        usage,
+    )
+
+    context = translation_context(repair=True)
+    result = await translator(context)([sentence, other])
+
+    assert format_translated(result) == (
+        "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>\nAu revoir"
+    )
+    assert client.chat.completions.create.call_count == 1
+    assert str(context.repairs) == (
+        "1 of 1 rejected completions repaired, 1.0 requests and 100 tokens "
+        "per rejected batch before bisection"
+    )
+
+
+@pytest.mark.asyncio
+async def test_should_request_structured_completions(
+    client: AsyncMock, sentence: Sentence
+):
+    fragments = ["Bonjour", "monde", "Comment", "ça", "va?"]
+    client.chat.completions.create.return_value = completion(
+        json.dumps({"sentences": [{"number": 1, "fragments": fragments}]})
+    )
+
+    context = translation_context(output_format=CompletionFormat.JSON)
+    result = await translator(context)([sentence])
+
+    assert (
+        format_translated(result)
+        == "<i>Bonjour</i><i>monde</i>\n<i>Comment</i><i>ça</i><i>va?</i>"
+    )
+    kwargs = client.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["response_format"]["json_schema"]["strict"]
@@ -0,0 +1,91 @@
+import asyncio
+from logging import getLogger
+from unittest.mock import MagicMock
+import pytest
+from rich.logging import RichHandler
+from srtglot.cli import _translate_batches
+from srtglot.tuning import BatchSizeController
+from fixtures import translation_context
+
+
+def test_should_grow_additively_and_shrink_multiplicatively():
+    controller = BatchSizeController.create(initial=100, min_tokens=20, max_tokens=120)
+    assert controller() == 100
+
+    controller.record(0)
+    assert controller() == 110
+    controller.record(0)
+    controller.record(0)
+    assert controller() == 120
+
+    controller.record(1)
+    assert controller() == 60
+    controller.record(5)
+    assert controller() == 20
+    controller.record(1)
+    assert controller() == 20
+
+
+def test_should_reject_invalid_bounds():
+    with pytest.raises(ValueError):
+        BatchSizeController.create(initial=100, min_tokens=200, max_tokens=100)
+
+    with pytest.raises(ValueError):
+        BatchSizeController.create(initial=100, min_tokens=0, max_tokens=100)
+
+    assert (
+        BatchSizeController.create(initial=500, min_tokens=20, max_tokens=100)() == 100
+    )
+
+
+def test_should_not_grow_past_the_request_budget():
+    context = translation_context(max_request_tokens=2000, tune_batch_size=True)
+
+    assert context.budget is not None and context.batch_size is not None
+    for _ in range(50):
+        context.batch_size.record(0)
+
+    assert context.batch_size() == context.budget.max_batch_tokens < 2000
+
+
+def test_should_reject_a_request_budget_below_the_minimum_batch_size():
+    with pytest.raises(ValueError, match="below the minimum batch size"):
+        translation_context(
+            max_request_tokens=900, min_batch_tokens=800, tune_batch_size=True
+        )
+
+
+def test_should_print_batch_size_decisions(caplog):
+    context = translation_context(tune_batch_size=True)
+    logger = getLogger("srtglot.tuning")
+
+    assert any(isinstance(handler, RichHandler) for handler in logger.handlers)
+    assert context.batch_size is not None
+    context.batch_size.record(1)
+    assert "after a batch bisected 1 times" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_should_form_fewer_batches_ahead_of_results():
+    formed = 0
+    completed = asyncio.Event()
+
+    def batches():
+        nonlocal formed
+        for i in range(20):
+            formed += 1
+            yield [MagicMock(name=f"sentence {i}")]
+
+    async def translate(batch):
+        await completed.wait()
+        return [[]]
+
+    translated = _translate_batches(translate, batches(), 2, lambda _: None, None, 1)
+    first = asyncio.create_task(anext(translated))
+    await asyncio.sleep(0)
+
+    # the running window and the next one, one batch per worker each
+    assert formed == 4
+    completed.set()
+    await first
+    assert len([_ async for _ in translated]) == 19
@@ -0,0 +1,35 @@
+from pathlib import Path
+from srtglot import vtt
+from srtglot.formats import get_reader
+from srtglot.model import Markup, Multiline
+
+
+def test_parse_timestamp():
+    assert vtt.parse_timestamp("00:01.500") == 1500
+    assert vtt.parse_timestamp("01:02:03.004") == 3723004
+
+
+def test_parse(tmp_path: Path):
+    input = tmp_path / "input.vtt"
+    input.write_text(
+        "WEBVTT - Episode 1\n"
+        "Kind: captions\n\n"
+        "NOTE this is a comment\n"
+        "spanning --> two lines\n\n"
+        "STYLE\n"
+        "::cue { color: white }\n\n"
+        "intro\n"
+        "00:01.000 --> 00:02.500 align:start position:10%\n"
+        "<v Daemon>As the <i.loud>first</i> century\n"
+        "of the <00:01.500>dynasty</v>\n\n"
+        "00:00:03.000 --> 00:00:04.000\n"
+        "Tom &amp; Jerry.\n"
+    )
+
+    subtitles = [*vtt.parse(input)]
+    assert [(sub.start, sub.end) for sub in subtitles] == [(1000, 2500), (3000, 4000)]
+    assert subtitles[0].text_lines == ["As the", "first", "century", "of the dynasty"]
+    assert subtitles[0].markup == Markup(segments=("", "<i>", "</i>", ""))
+    assert subtitles[1].text == [Multiline(lines=["Tom & Jerry."])]
+    assert subtitles[1].translate(["Tom & Jerry."]).text == "Tom &amp; Jerry."
+    assert get_reader(input).count_subtitles(input) == 2